@@ -0,0 +1,97 @@
+"""
+Shared helpers for benchmark scripts
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+
+def git_revision() -> Optional[str]:
+    """Current commit, if run from a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where it cannot be read"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux
+        return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        # peak_wset is the Windows peak working set; other platforms only report current RSS
+        return round(getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024), 1)
+    return None
+
+
+def run_metadata(args: Dict) -> Dict:
+    """Context stored alongside results so runs can be compared"""
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'args': args
+    }
+
+
+def write_results(path: str, results: Dict):
+    """Write results JSON, creating the directory"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str) -> Dict:
+    """Read a results JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float],
+            higher_is_better: Dict[str, bool]) -> List[Dict]:
+    """Per-metric change versus a baseline (positive `regression_pct` is worse)"""
+    rows = []
+    for metric, better_high in higher_is_better.items():
+        if current.get(metric) is None or not baseline.get(metric):
+            continue
+        change = (current[metric] - baseline[metric]) / baseline[metric] * 100
+        rows.append({
+            'metric': metric,
+            'baseline': baseline[metric],
+            'current': current[metric],
+            'change_pct': round(change, 1),
+            'regression_pct': round(-change if better_high else change, 1)
+        })
+    return rows
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Pipeline Benchmark - Load-test create_content_package against the fake model backend
+
+Each scenario (concurrency x platform mix x error rate) runs in a fresh
+process so peak RSS and event-loop lag are not shared between scenarios.
+With --cassette the model calls come from a recorded run instead (see
+testing.cassette), replayed with their recorded latencies. With
+--compare the run exits non-zero when a scenario regresses past the
+thresholds versus the baseline.
+
+    python benchmarks/pipeline_bench.py --concurrency 1,4,16 --packages 32 \\
+        --mix blog --mix blog,linkedin,twitter --error-rate 0,0.1 \\
+        --output benchmarks/results/pipeline.json --compare benchmarks/results/baseline.json
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare, load_results, peak_rss_mb, run_metadata, write_results
+
+# Metrics checked by --compare, and whether higher is better
+COMPARED_METRICS = {
+    'packages_per_hour': True,
+    'p50_latency_seconds': False,
+    'p99_latency_seconds': False,
+    'model_calls_per_package': False,
+    'peak_rss_mb': False,
+    'event_loop_p99_lag_seconds': False
+}
+
+# Which threshold (see main) applies to each compared metric
+THRESHOLD_OF_METRIC = {
+    'packages_per_hour': 'max_slowdown',
+    'p50_latency_seconds': 'max_slowdown',
+    'p99_latency_seconds': 'max_slowdown',
+    'model_calls_per_package': 'max_overhead',
+    'peak_rss_mb': 'max_overhead',
+    'event_loop_p99_lag_seconds': 'max_lag_growth'
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _scenario_name(scenario: Dict) -> str:
+    if scenario.get('cassette'):
+        name = f"c{scenario['concurrency']}-{'+'.join(scenario['platforms'])}-replay"
+    else:
+        name = f"c{scenario['concurrency']}-{'+'.join(scenario['platforms'])}-err{scenario['error_rate']:g}"
+    # The default executor keeps the names of earlier baselines
+    if scenario.get('cpu_executor', 'thread') != 'thread':
+        name += f"-{scenario['cpu_executor']}"
+    return name
+
+
+async def _run(scenario: Dict) -> Dict:
+    from orchestrator import ContentFactoryOrchestrator
+    from testing import FakeGeminiClient, ReplayClient
+    
+    # Per-package INFO logging would dominate the measurements
+    logging.getLogger('orchestrator').setLevel(logging.ERROR)
+    logging.getLogger('utils.loop_monitor').setLevel(logging.ERROR)
+    
+    if scenario.get('cassette'):
+        # Recorded responses and latencies from a captured run
+        client = ReplayClient.load(scenario['cassette'], replay_latency=True, time_scale=scenario['time_scale'])
+    else:
+        client = FakeGeminiClient.realistic(
+            seed=scenario['seed'],
+            time_scale=scenario['time_scale'],
+            rate_limit_rate=scenario['error_rate'] * 0.7,
+            unavailable_rate=scenario['error_rate'] * 0.3,
+            retry_delay=scenario['retry_delay']
+        )
+    
+    with tempfile.TemporaryDirectory(prefix='bench-memory-') as memory_path:
+        orchestrator = ContentFactoryOrchestrator(
+            api_key=None,
+            primary_model='gemini-2.5-flash',
+            client=client,
+            memory_path=memory_path,
+            step_delay=scenario['step_delay']
+        )
+        orchestrator.retry_delay = scenario['retry_delay']
+        await orchestrator.initialize()
+        
+        semaphore = asyncio.Semaphore(scenario['concurrency'])
+        latencies: List[float] = []
+        stage_totals: Dict[str, List[float]] = {}
+        failures = 0
+        
+        async def one(index: int):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await orchestrator.create_content_package(
+                        topic=f"Benchmark topic {index % 8}",
+                        session_id=f"bench-{index}",
+                        platforms=list(scenario['platforms'])
+                    )
+                except Exception:
+                    failures += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+                for stage, timing in result['metrics']['timings'].items():
+                    stage_totals.setdefault(stage, []).append(timing['total_seconds'])
+        
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(scenario['packages'])))
+        wall = time.perf_counter() - wall_start
+        
+        loop_stats = orchestrator.loop_monitor.get_stats()
+        await orchestrator.cleanup()
+    
+    completed = len(latencies)
+    return {
+        'name': _scenario_name(scenario),
+        'scenario': scenario,
+        'completed': completed,
+        'failed': failures,
+        'wall_seconds': round(wall, 3),
+        'packages_per_hour': round(completed / wall * 3600, 1) if wall else 0.0,
+        'p50_latency_seconds': round(_percentile(latencies, 50), 3),
+        'p99_latency_seconds': round(_percentile(latencies, 99), 3),
+        'mean_latency_seconds': round(statistics.mean(latencies), 3) if latencies else 0.0,
+        'stages': {
+            stage: {
+                'mean_seconds': round(statistics.mean(values), 3),
+                'p99_seconds': round(_percentile(values, 99), 3)
+            }
+            for stage, values in sorted(stage_totals.items())
+        },
+        'model_calls_per_package': round(len(client.calls) / max(1, scenario['packages']), 2),
+        'model_call_errors': sum(1 for call in client.calls if call.status != 'ok'),
+        'peak_rss_mb': peak_rss_mb(),
+        'event_loop_max_lag_seconds': loop_stats['max_lag_seconds'],
+        'event_loop_p99_lag_seconds': loop_stats['p99_lag_seconds'],
+        'event_loop_blocks': loop_stats['blocks']
+    }
+
+
+def run_scenario(scenario: Dict) -> Dict:
+    """Run one scenario in this process and return its measurements"""
+    os.environ.setdefault('LOG_DIR', tempfile.mkdtemp(prefix='bench-logs-'))
+    os.environ.setdefault('TRACING_EXPORTER', 'none')
+    os.environ['LOOP_MONITOR'] = 'true'
+    os.environ['CPU_EXECUTOR'] = scenario.get('cpu_executor', 'thread')
+    return asyncio.run(_run(scenario))
+
+
+def build_scenarios(args) -> List[Dict]:
+    """Cross product of the requested dimensions"""
+    concurrency = [int(value) for value in args.concurrency.split(',')]
+    # A cassette fixes the error pattern to whatever was recorded
+    error_rates = [0.0] if args.cassette else [float(value) for value in args.error_rate.split(',')]
+    mixes = [tuple(mix.split(',')) for mix in (args.mix or ['blog'])]
+    
+    return [
+        {
+            'concurrency': level,
+            'platforms': mix,
+            'error_rate': error_rate,
+            'packages': args.packages,
+            'time_scale': args.time_scale,
+            'step_delay': args.step_delay,
+            'retry_delay': args.retry_delay,
+            'seed': args.seed,
+            'cassette': args.cassette,
+            'cpu_executor': args.cpu_executor
+        }
+        for level, mix, error_rate in itertools.product(concurrency, mixes, error_rates)
+    ]
+
+
+def find_regressions(results: List[Dict], baseline: Dict, thresholds: Dict[str, float]) -> List[Dict]:
+    """Scenario metrics that regressed beyond their threshold (in percent, keyed as THRESHOLD_OF_METRIC)"""
+    previous = {scenario['name']: scenario for scenario in baseline.get('scenarios', [])}
+    
+    regressions = []
+    for result in results:
+        if result['name'] not in previous:
+            continue
+        for row in compare(result, previous[result['name']], COMPARED_METRICS):
+            if row['regression_pct'] > thresholds[THRESHOLD_OF_METRIC[row['metric']]]:
+                regressions.append({'name': result['name'], **row})
+    return regressions
+
+
+def _format_mb(value: Optional[float]) -> str:
+    return 'n/a' if value is None else f"{value:.1f}"
+
+
+def print_report(results: List[Dict]):
+    """Human-readable summary"""
+    print(f"{'scenario':<40} {'pkg/h':>10} {'p50 s':>8} {'p99 s':>8} {'calls':>6} {'rss MB':>8} {'lag p99':>8}")
+    for result in results:
+        print(
+            f"{result['name']:<40} {result['packages_per_hour']:>10.1f} "
+            f"{result['p50_latency_seconds']:>8.3f} {result['p99_latency_seconds']:>8.3f} "
+            f"{result['model_calls_per_package']:>6.1f} {_format_mb(result['peak_rss_mb']):>8} "
+            f"{result['event_loop_p99_lag_seconds']:>8.3f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the content pipeline against the fake model backend")
+    parser.add_argument('--concurrency', default='1,4', help="Comma-separated concurrency levels")
+    parser.add_argument('--mix', action='append', help="Comma-separated platforms; repeat for several mixes")
+    parser.add_argument('--error-rate', default='0', help="Comma-separated fraction of model calls failing with 429/503")
+    parser.add_argument('--packages', type=int, default=8, help="Packages per scenario")
+    parser.add_argument('--time-scale', type=float, default=0.02, help="Multiplier on simulated or recorded model latency")
+    parser.add_argument('--step-delay', type=float, default=0.0, help="Orchestrator pause between steps")
+    parser.add_argument('--retry-delay', type=float, default=0.05, help="Orchestrator base retry delay")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cassette', help="Replay a recorded cassette instead of the fake backend")
+    parser.add_argument('--cpu-executor', choices=['process', 'thread', 'inline'], default='thread',
+                        help="Where the pipeline runs CPU-bound scoring (see utils.cpu_executor)")
+    parser.add_argument('--output', default='benchmarks/results/pipeline.json')
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=25.0,
+                        help="Allowed throughput drop or latency growth in percent")
+    parser.add_argument('--max-overhead', type=float, default=10.0,
+                        help="Allowed growth of model calls per package and peak RSS in percent")
+    parser.add_argument('--max-lag-growth', type=float, default=100.0,
+                        help="Allowed growth of p99 event-loop lag in percent")
+    parser.add_argument('--in-process', action='store_true', help="Run scenarios in this process (faster, shared RSS)")
+    args = parser.parse_args(argv)
+    
+    scenarios = build_scenarios(args)
+    results = []
+    
+    if args.in_process:
+        results = [run_scenario(scenario) for scenario in scenarios]
+    else:
+        context = multiprocessing.get_context('spawn')
+        for scenario in scenarios:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results.append(pool.submit(run_scenario, scenario).result())
+    
+    print_report(results)
+    write_results(args.output, {'meta': run_metadata(vars(args)), 'scenarios': results})
+    print(f"\nResults written to {args.output}")
+    
+    if not args.compare:
+        return 0
+    
+    baseline_results = load_results(args.compare)
+    baseline = {result['name']: result for result in baseline_results['scenarios']}
+    for result in results:
+        if result['name'] not in baseline:
+            continue
+        print(f"\n{result['name']} vs baseline")
+        for row in compare(result, baseline[result['name']], COMPARED_METRICS):
+            print(f"  {row['metric']:<30} {row['baseline']:>10} -> {row['current']:>10} ({row['change_pct']:+.1f}%)")
+    
+    thresholds = {
+        'max_slowdown': args.max_slowdown,
+        'max_overhead': args.max_overhead,
+        'max_lag_growth': args.max_lag_growth
+    }
+    regressions = find_regressions(results, baseline_results, thresholds)
+    print()
+    for row in regressions:
+        print(f"REGRESSION {row['name']} {row['metric']}: {row['baseline']} -> {row['current']} "
+              f"({row['regression_pct']:+.1f}% worse)")
+    if regressions:
+        return 1
+    
+    print("No regressions versus baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
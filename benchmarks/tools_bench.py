@@ -0,0 +1,290 @@
+"""
+Tools Benchmark - Micro-benchmarks for the text-analysis tools
+
+Every public method of SEOAnalyzer, BrandVoiceMatcher, ReadabilityScorer
+and ContentValidator is timed over inputs drawn from examples/sample_output,
+from a single tweet up to a ~5,000-word post. Reports ops/sec and the peak
+bytes allocated by one call, and exits non-zero when a case regresses past
+the thresholds versus a stored baseline. The committed baseline lives in
+benchmarks/baselines/tools.json; a missing baseline is an error so the
+gate cannot pass without comparing anything.
+
+Throughput is compared as `relative_ops`, each case's ops/sec divided by
+that of a fixed pure-Python calibration workload timed in the same run,
+so a baseline recorded on one machine still holds on a faster or slower
+one. Allocation is deterministic and compared as is. Cases that look
+slower are re-measured on their own once and only count if the slowdown
+holds, since the fastest cases swing by a third between full runs.
+
+    python benchmarks/tools_bench.py --update-baseline
+    python benchmarks/tools_bench.py --max-slowdown 25 --max-alloc-growth 25
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import Counter
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import ROOT, compare, load_results, run_metadata, write_results
+
+SAMPLE_DIR = os.path.join(ROOT, 'examples', 'sample_output')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baselines', 'tools.json')
+
+# Metrics checked against the baseline, and whether higher is better
+COMPARED_METRICS = {
+    'relative_ops': True,
+    'peak_alloc_bytes': False
+}
+
+KEYWORD = 'cybersecurity'
+# The SEO agent typically returns a dozen or more secondary keywords
+SECONDARY_KEYWORDS = [
+    'AI', 'machine learning', 'threat detection', 'data privacy', 'cloud security', 'ransomware',
+    'zero trust', 'compliance', 'automation', 'small business', 'best practices', 'remote work',
+    'encryption', 'incident response'
+]
+
+BRAND_VOICE = {
+    'tone': 'professional',
+    'avoid': ['jargon', 'buzzwords', 'hyperbole'],
+    'preferences': {'sentence_length': 'medium'}
+}
+
+
+def _read(pattern: str) -> List[str]:
+    texts = []
+    for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, pattern))):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read().strip()
+        if text:
+            texts.append(text)
+    return texts
+
+
+def load_corpus(long_words: int = 5000) -> Dict[str, str]:
+    """Representative inputs by size, from the stored sample packages"""
+    twitter = '\n\n'.join(_read('twitter_*.txt'))
+    tweets = re.findall(r'Tweet \d+/\d+:\s*\n(.+)', twitter)
+    linkedin = _read('linkedin_*.txt')
+    emails = _read('email_*.txt')
+    blogs = _read('blog_*.md')
+    
+    # Longest blogs first, repeated until the long input reaches `long_words`
+    words = []
+    ordered = sorted(blogs, key=len, reverse=True)
+    while len(words) < long_words and ordered:
+        for blog in ordered:
+            words.extend(blog.split(' '))
+    
+    return {
+        'tweet': tweets[0] if tweets else twitter[:280],
+        'linkedin': min(linkedin, key=lambda text: abs(len(text.split()) - 250)),
+        'email': min(emails, key=lambda text: abs(len(text.split()) - 400)),
+        'blog': min(blogs, key=lambda text: abs(len(text.split()) - 1800)),
+        'long': ' '.join(words[:long_words])
+    }
+
+
+def _title(text: str) -> str:
+    match = re.search(r'^#\s+(.+)$', text, re.MULTILINE)
+    return match.group(1).strip() if match else text.split('\n', 1)[0][:60]
+
+
+def build_cases(corpus: Dict[str, str]) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, zero-argument callable) for every method and input size"""
+    from tools.brand_voice_matcher import BrandVoiceMatcher
+    from tools.readability_scorer import ReadabilityScorer
+    from tools.seo_analyzer import SEOAnalyzer
+    from utils.validators import ContentValidator
+    
+    cases = []
+    for size, text in corpus.items():
+        title = _title(text)
+        meta = ' '.join(text.split()[:25])
+        cases.extend([
+            (f'seo.analyze_keyword_density[{size}]', lambda t=text: SEOAnalyzer.analyze_keyword_density(t, KEYWORD)),
+            (f'seo.analyze_keywords[{size}]',
+             lambda t=text: SEOAnalyzer.analyze_keywords(t, KEYWORD, SECONDARY_KEYWORDS)),
+            (f'seo.analyze_headers[{size}]', lambda t=text: SEOAnalyzer.analyze_headers(t, KEYWORD)),
+            (f'seo.calculate_overall_seo_score[{size}]',
+             lambda t=text, ti=title, m=meta: SEOAnalyzer.calculate_overall_seo_score(t, ti, m, KEYWORD)),
+            (f'brand_voice.analyze_tone[{size}]',
+             lambda t=text: BrandVoiceMatcher.analyze_tone(t, BRAND_VOICE['tone'])),
+            (f'brand_voice.check_avoided_words[{size}]',
+             lambda t=text: BrandVoiceMatcher.check_avoided_words(t, BRAND_VOICE['avoid'])),
+            (f'brand_voice.analyze_sentence_structure[{size}]',
+             lambda t=text: BrandVoiceMatcher.analyze_sentence_structure(t, BRAND_VOICE['preferences'])),
+            (f'brand_voice.calculate_overall_match[{size}]',
+             lambda t=text: BrandVoiceMatcher.calculate_overall_match(t, BRAND_VOICE)),
+            (f'readability.calculate_scores[{size}]', lambda t=text: ReadabilityScorer.calculate_scores(t)),
+            (f'readability.calculate_statistics[{size}]', lambda t=text: ReadabilityScorer.calculate_statistics(t)),
+            (f'validator.validate_blog_post[{size}]', lambda t=text: ContentValidator.validate_blog_post(t)),
+            (f'validator.validate_social_post[{size}]',
+             lambda t=text: ContentValidator.validate_social_post(t, 'linkedin')),
+            (f'validator.validate_email[{size}]', lambda t=text: ContentValidator.validate_email(t)),
+            (f'validator.validate_video_script[{size}]', lambda t=text: ContentValidator.validate_video_script(t)),
+        ])
+    
+    # Input-independent and whole-package methods
+    cases.extend([
+        ('seo.analyze_title', lambda: SEOAnalyzer.analyze_title(_title(corpus['blog']), KEYWORD)),
+        ('seo.analyze_meta_description',
+         lambda: SEOAnalyzer.analyze_meta_description(' '.join(corpus['blog'].split()[:25]), KEYWORD)),
+        ('readability.get_reading_level', lambda: ReadabilityScorer.get_reading_level(62.5)),
+        ('validator.validate_all_content', lambda: ContentValidator.validate_all_content({
+            'blog': corpus['blog'],
+            'linkedin': corpus['linkedin'],
+            'twitter': corpus['tweet'],
+            'email': corpus['email']
+        })),
+    ])
+    return cases
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> Dict:
+    """Best-of-`repeat` throughput and the peak allocation of a single call"""
+    func()  # warm caches and lazy imports before timing
+    
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=loops)) / loops
+    
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    func()
+    after, peak = tracemalloc.get_traced_memory()
+    if not already_tracing:
+        tracemalloc.stop()
+    
+    return {
+        'ops_per_sec': round(1 / best, 1) if best else 0.0,
+        'mean_us': round(best * 1e6, 2),
+        'peak_alloc_bytes': max(0, peak - before),
+        'retained_bytes': max(0, after - before)
+    }
+
+
+def calibration_ops(text: str, min_time: float = 0.2, repeat: int = 5) -> float:
+    """Ops/sec of a fixed tokenize-and-count workload, as a measure of this machine's speed"""
+    return measure(lambda: Counter(re.findall(r'\w+', text.lower())), min_time, repeat)['ops_per_sec']
+
+
+def run(pattern: Optional[str] = None, min_time: float = 0.2, repeat: int = 5,
+        long_words: int = 5000) -> List[Dict]:
+    """Measure every case whose name contains `pattern`
+
+    The calibration workload is timed before and after the cases and the
+    faster reading kept, so a slow start (frequency scaling, a busy
+    neighbour) does not skew every case.
+    """
+    corpus = load_corpus(long_words)
+    before = calibration_ops(corpus['blog'], min_time, repeat)
+    results = []
+    for name, func in build_cases(corpus):
+        if pattern and pattern not in name:
+            continue
+        results.append({'name': name, **measure(func, min_time, repeat)})
+    calibration = max(before, calibration_ops(corpus['blog'], min_time, repeat))
+    
+    for result in results:
+        result['relative_ops'] = round(result['ops_per_sec'] / calibration, 6) if calibration else 0.0
+    return results
+
+
+def find_regressions(results: List[Dict], baseline: Dict, max_slowdown: float,
+                     max_alloc_growth: float) -> List[Dict]:
+    """Cases whose relative throughput or allocation regressed beyond the thresholds (in percent)"""
+    limits = {'relative_ops': max_slowdown, 'peak_alloc_bytes': max_alloc_growth}
+    previous = {case['name']: case for case in baseline.get('cases', [])}
+    
+    regressions = []
+    for result in results:
+        if result['name'] not in previous:
+            continue
+        for row in compare(result, previous[result['name']], COMPARED_METRICS):
+            if row['regression_pct'] > limits[row['metric']]:
+                regressions.append({'name': result['name'], **row})
+    return regressions
+
+
+def print_report(results: List[Dict]):
+    """Human-readable summary"""
+    print(f"{'case':<52} {'ops/sec':>12} {'mean us':>10} {'peak KB':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<52} {result['ops_per_sec']:>12.1f} "
+            f"{result['mean_us']:>10.1f} {result['peak_alloc_bytes'] / 1024:>10.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the text-analysis tools")
+    parser.add_argument('--filter', help="Only run cases whose name contains this string")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Seconds per timing batch")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing batches per case (best is kept)")
+    parser.add_argument('--long-words', type=int, default=5000, help="Word count of the longest input")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline results JSON")
+    parser.add_argument('--update-baseline', action='store_true', help="Write this run as the new baseline")
+    parser.add_argument('--max-slowdown', type=float, default=25.0,
+                        help="Allowed drop of calibrated ops/sec in percent (single runs vary by up to ~20%%)")
+    parser.add_argument('--max-alloc-growth', type=float, default=25.0, help="Allowed peak allocation growth in percent")
+    parser.add_argument('--output', default='benchmarks/results/tools.json')
+    args = parser.parse_args(argv)
+    
+    started = time.perf_counter()
+    results = run(args.filter, args.min_time, args.repeat, args.long_words)
+    print_report(results)
+    print(f"\n{len(results)} cases in {time.perf_counter() - started:.1f}s")
+    
+    payload = {'meta': run_metadata(vars(args)), 'cases': results}
+    write_results(args.output, payload)
+    
+    if args.update_baseline:
+        write_results(args.baseline, payload)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 2
+    
+    baseline = load_results(args.baseline)
+    regressions = find_regressions(results, baseline, args.max_slowdown, args.max_alloc_growth)
+    slow = sorted({row['name'] for row in regressions if row['metric'] == 'relative_ops'})
+    if slow:
+        print(f"Re-measuring {len(slow)} slower case(s) on their own")
+        retried = {}
+        for name in slow:
+            retried.update({result['name']: result for result in run(name, args.min_time, args.repeat,
+                                                                      args.long_words) if result['name'] == name})
+        results = [
+            retried[result['name']]
+            if result['name'] in retried and retried[result['name']]['relative_ops'] > result['relative_ops']
+            else result
+            for result in results
+        ]
+        regressions = find_regressions(results, baseline, args.max_slowdown, args.max_alloc_growth)
+    for row in regressions:
+        print(f"REGRESSION {row['name']} {row['metric']}: {row['baseline']} -> {row['current']} "
+              f"({row['regression_pct']:+.1f}% worse)")
+    if regressions:
+        return 1
+    
+    print("No regressions versus baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -59,17 +59,17 @@ Output Format (JSON):
             Dictionary with learned patterns and insights
         """
         
-        content_history = self.memory_bank.get('content_history', [])
+        history_stats = self.memory_bank.get_history_stats('content_history')
         
-        if len(content_history) < 5:
+        if history_stats.count < 5:
             return {
                 "patterns": [],
                 "insights": "Not enough data yet (minimum 5 content pieces needed)",
-                "data_points": len(content_history)
+                "data_points": history_stats.count
             }
         
         history_summary = []
-        for item in content_history[-20:]:
+        for item in self.memory_bank.get_history('content_history', limit=20):
             history_summary.append({
                 'topic': item.get('topic', ''),
                 'metrics': item.get('metrics', {}),
@@ -81,6 +81,9 @@ Output Format (JSON):
 Content History:
 {json.dumps(history_summary, indent=2)}
 
+Aggregates Across All {history_stats.count} Pieces:
+{json.dumps(history_stats.summary()['metrics'], indent=2)}
+
 Tasks:
 1. Identify patterns in successful content
 2. Determine optimal content characteristics
@@ -112,7 +115,7 @@ Return analysis in JSON format."""
                 analysis_data = {
                     "patterns": [],
                     "insights": result_text,
-                    "data_points": len(content_history)
+                    "data_points": history_stats.count
                 }
             
             self.memory_bank.set('learned_patterns', analysis_data)
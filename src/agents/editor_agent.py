@@ -3,18 +3,22 @@ Editor Agent - Improves content quality
 Grammar, readability, brand voice consistency
 """
 
-from typing import Dict
+from typing import Dict, Optional
 from google import genai
 from google.genai import types
-import textstat
+
+from tools.readability_scorer import ReadabilityScorer
+from utils.cpu_executor import CPUExecutor
 
 
 class EditorAgent:
     """Agent responsible for editing and improving content"""
     
-    def __init__(self, client: genai.Client, model: str):
+    def __init__(self, client: genai.Client, model: str, executor: Optional[CPUExecutor] = None):
         self.client = client
         self.model = model
+        # Scores off the event loop when set (see utils.cpu_executor)
+        self.executor = executor
         
         self.system_instruction = """You are a professional Content Editor and Copy Editor.
 
@@ -81,7 +85,11 @@ Provide the edited version."""
             
             # Calculate readability score
             try:
-                readability_score = textstat.flesch_reading_ease(edited_content)
+                if self.executor is not None:
+                    scores = await self.executor.run(ReadabilityScorer.calculate_scores, edited_content)
+                else:
+                    scores = ReadabilityScorer.calculate_scores(edited_content)
+                readability_score = scores['flesch_reading_ease']
                 readability_score = min(100, max(0, readability_score))
             except:
                 readability_score = 85
@@ -2,18 +2,28 @@
 Research Agent - Deep, Expert-Level Research
 """
 
-from typing import Dict
+from typing import Dict, List, Optional
 from google import genai
 from google.genai import types
+import asyncio
 import json
 
+from memory.research_index import ResearchIndex
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
 
 class ResearchAgent:
     """Agent responsible for deep, expert-level research"""
     
-    def __init__(self, client: genai.Client, model: str):
+    def __init__(self, client: genai.Client, model: str, research_index: Optional[ResearchIndex] = None,
+                 prior_limit: int = 8):
         self.client = client
         self.model = model
+        # Past research to build on (see memory.research_index); new results are added to it
+        self.research_index = research_index
+        self.prior_limit = prior_limit
         
         self.system_instruction = """You are an EXPERT RESEARCHER and industry analyst.
 
@@ -35,9 +45,47 @@ Research focus:
 
 Prioritize SPECIFIC, ACTIONABLE information over generic facts."""
     
+    async def _prior_research(self, topic: str) -> List[Dict]:
+        """Most relevant earlier findings and sources for `topic` (none if the index fails)"""
+        if self.research_index is None or self.prior_limit <= 0:
+            return []
+        try:
+            # Reading the index file and scoring run off the event loop
+            return await asyncio.to_thread(self.research_index.search, topic, limit=self.prior_limit)
+        except Exception as e:
+            logger.warning(f"Research index search failed, researching without prior findings: {str(e)}")
+            return []
+    
+    async def _index_research(self, topic: str, research_data: Dict):
+        """Add a result to the research index; a failure only costs future reuse"""
+        if self.research_index is None:
+            return
+        try:
+            # May wait on the index file lock, so it stays off the event loop
+            await asyncio.to_thread(self.research_index.add_research, topic, research_data)
+        except Exception as e:
+            logger.warning(f"Could not add research on '{topic}' to the index: {str(e)}")
+    
+    @staticmethod
+    def _prior_research_prompt(prior: List[Dict]) -> str:
+        """Prompt section listing earlier findings, so searching can focus on what is missing"""
+        lines = []
+        for item in prior:
+            line = f"- [{item['kind']}, {item['topic']}, {(item.get('timestamp') or '')[:10]}] {item['text']}"
+            if item.get('url'):
+                line += f" ({item['url']})"
+            lines.append(line)
+        return f"""
+
+Prior research from earlier briefs (reuse what is still current, cite its sources,
+and spend searches on gaps, newer developments and anything that needs re-checking):
+""" + '\n'.join(lines)
+    
     async def research(self, topic: str, session_id: str) -> Dict:
         """Conduct deep research"""
         
+        prior = await self._prior_research(topic)
+        
         prompt = f"""Conduct EXPERT-LEVEL research on: {topic}
 
 Search for:
@@ -59,6 +107,8 @@ Provide structured research in JSON format:
   "real_examples": ["Example with details"],
   "sources": [{{"title": "...", "url": "...", "relevance": "..."}}]
 }}"""
+        if prior:
+            prompt += self._prior_research_prompt(prior)
 
         try:
             response = self.client.models.generate_content(
@@ -89,7 +139,9 @@ Provide structured research in JSON format:
                     "sources": []
                 }
             
-            return research_data
-            
         except Exception as e:
-            raise Exception(f"Research agent error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Research agent error: {str(e)}")
+        
+        await self._index_research(topic, research_data)
+        
+        return research_data
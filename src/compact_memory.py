@@ -0,0 +1,52 @@
+"""
+Content Factory AI - Memory Compaction Command
+"""
+
+import argparse
+from dotenv import load_dotenv
+from memory.memory_bank import MemoryBank
+from memory.retention import RetentionPolicy
+from utils.logger import setup_logger
+
+load_dotenv()
+logger = setup_logger(__name__)
+
+
+def parse_limit(value: str):
+    """Parse a window size, where 'none' disables the window"""
+    return None if value.lower() == 'none' else int(value)
+
+
+def main():
+    """Compact stored history according to a retention policy"""
+    
+    defaults = RetentionPolicy.from_env()
+    
+    parser = argparse.ArgumentParser(description="Compact Content Factory memory")
+    parser.add_argument('--storage-path', default='./memory', help="Memory directory")
+    parser.add_argument('--key', default='content_history', help="History key to compact")
+    parser.add_argument('--keep-entries', type=parse_limit, default=defaults.full_entries,
+                        help="Newest entries to keep with full artifacts ('none' to disable)")
+    parser.add_argument('--keep-days', type=parse_limit, default=defaults.full_days,
+                        help="Days of entries to keep with full artifacts ('none' to disable)")
+    parser.add_argument('--summarize-after-days', type=parse_limit, default=defaults.summarize_after_days,
+                        help="Roll entries older than this into daily summaries ('none' to disable)")
+    args = parser.parse_args()
+    
+    policy = RetentionPolicy(
+        full_entries=args.keep_entries,
+        full_days=args.keep_days,
+        summarize_after_days=args.summarize_after_days
+    )
+    
+    memory_bank = MemoryBank(storage_path=args.storage_path)
+    report = memory_bank.compact(args.key, policy)
+    
+    logger.info(
+        f"Compacted {args.key}: {report['full']} full, "
+        f"{report['metrics_only']} metrics-only, {report['summarized']} summarized"
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
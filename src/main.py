@@ -19,17 +19,43 @@ async def main():
     logger.info("Starting Content Factory AI (Rate Limited)")
     
     api_key = os.getenv('GOOGLE_API_KEY')
-    if not api_key:
-        logger.error("GOOGLE_API_KEY not found")
-        return
+    client = None
+    cassette_mode = os.getenv('CASSETTE_MODE', '').lower()
+    cassette_path = os.getenv('CASSETTE_PATH', './cassettes/run.json.gz')
     
-    logger.info("API key validated")
-    logger.info("Waiting 60 seconds to avoid rate limits...")
-    time.sleep(60)  # Wait 1 minute to reset rate limits
+    if cassette_mode == 'replay':
+        # Serve a recorded run back; no key or rate-limit wait needed
+        from testing import ReplayClient
+        client = ReplayClient.load(
+            cassette_path,
+            replay_latency=os.getenv('CASSETTE_REPLAY_LATENCY', 'false').lower() in ('1', 'true', 'yes'),
+            time_scale=float(os.getenv('CASSETTE_TIME_SCALE', '1.0'))
+        )
+        logger.info(f"Replaying model calls from {cassette_path}")
+    elif os.getenv('FAKE_GEMINI', '').lower() in ('1', 'true', 'yes'):
+        # Offline run against the fake client; no key or rate-limit wait needed
+        from testing import FakeGeminiClient
+        client = FakeGeminiClient.realistic(time_scale=float(os.getenv('FAKE_GEMINI_TIME_SCALE', '0.1')))
+        logger.info("Using offline fake Gemini client")
+    else:
+        if not api_key:
+            logger.error("GOOGLE_API_KEY not found")
+            return
+        
+        logger.info("API key validated")
+        logger.info("Waiting 60 seconds to avoid rate limits...")
+        time.sleep(60)  # Wait 1 minute to reset rate limits
+        
+        if cassette_mode == 'record':
+            from google import genai
+            from testing import RecordingClient
+            client = RecordingClient(genai.Client(api_key=api_key))
+            logger.info(f"Recording model calls to {cassette_path}")
     
     orchestrator = ContentFactoryOrchestrator(
         api_key=api_key,
-        primary_model='gemini-2.0-flash-exp'  # Use original model
+        primary_model='gemini-2.0-flash-exp',  # Use original model
+        client=client
     )
     
     await orchestrator.initialize()
@@ -67,6 +93,10 @@ async def main():
     
     finally:
         await orchestrator.cleanup()
+        
+        if cassette_mode == 'record':
+            client.save(cassette_path)
+            logger.info(f"Saved {len(client.cassette.entries)} recorded calls to {cassette_path}")
 
 
 if __name__ == "__main__":
@@ -4,9 +4,22 @@ Content Factory AI - Memory and State Management
 
 from .memory_bank import MemoryBank
 from .session_service import SessionService, Session
+from .sqlite_session_service import SQLiteSessionService, SQLiteSession
+from .history_stats import HistoryStats, load_history_stats
+from .retention import RetentionPolicy
+from .near_duplicates import NearDuplicateIndex, DuplicateContentError
+from .research_index import ResearchIndex
 
 __all__ = [
     'MemoryBank',
     'SessionService',
     'Session',
+    'SQLiteSessionService',
+    'SQLiteSession',
+    'HistoryStats',
+    'load_history_stats',
+    'RetentionPolicy',
+    'NearDuplicateIndex',
+    'DuplicateContentError',
+    'ResearchIndex',
 ]
\ No newline at end of file
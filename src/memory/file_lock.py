@@ -0,0 +1,106 @@
+"""
+File Lock - Cross-process advisory locking for shared storage files
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Optional
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLockTimeout(TimeoutError):
+    """Raised when a file lock cannot be acquired in time"""
+
+
+class FileLock:
+    """Exclusive lock backed by a sidecar lock file
+
+    Re-entrant within a process: nested acquisitions only take the OS lock
+    once, so methods holding the lock can call each other freely.
+    """
+    
+    def __init__(self, path: str, timeout: float = 30.0, poll_interval: float = 0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+    
+    def acquire(self):
+        """Acquire the lock, waiting up to `timeout` seconds"""
+        self._thread_lock.acquire()
+        
+        if self._depth > 0:
+            self._depth += 1
+            return
+        
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        
+        while True:
+            try:
+                self._lock_fd(fd)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    self._thread_lock.release()
+                    raise FileLockTimeout(f"Timed out waiting for lock: {self.path}")
+                time.sleep(self.poll_interval)
+        
+        self._fd = fd
+        self._depth = 1
+    
+    def release(self):
+        """Release one level of the lock"""
+        if self._depth == 0:
+            return
+        
+        self._depth -= 1
+        
+        if self._depth == 0:
+            try:
+                self._unlock_fd(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        
+        self._thread_lock.release()
+    
+    @property
+    def is_locked(self) -> bool:
+        """Whether this process currently holds the lock"""
+        return self._depth > 0
+    
+    @staticmethod
+    def _lock_fd(fd: int):
+        """Try to take a non-blocking exclusive OS lock"""
+        if sys.platform == 'win32':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    
+    @staticmethod
+    def _unlock_fd(fd: int):
+        """Release the OS lock"""
+        if sys.platform == 'win32':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
\ No newline at end of file
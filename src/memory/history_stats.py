@@ -0,0 +1,179 @@
+"""
+History Stats - Running aggregates over content history
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime
+
+from utils.histogram import LogHistogram
+
+
+class HistoryStats:
+    """Aggregates maintained incrementally as history entries are appended
+
+    Tracks overall counts plus count/sum/min/max/percentiles for every
+    numeric field in an entry's `metrics`, and per-topic and per-day
+    rollups. Reads never touch the history itself.
+    """
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self.count: int = data.get('count', 0)
+        self.first_timestamp: Optional[str] = data.get('first_timestamp')
+        self.last_timestamp: Optional[str] = data.get('last_timestamp')
+        self._metrics: Dict[str, LogHistogram] = {
+            name: LogHistogram.from_dict(snapshot)
+            for name, snapshot in data.get('metrics', {}).items()
+        }
+        self._topics: Dict[str, Dict] = data.get('topics', {})
+        self._days: Dict[str, Dict] = data.get('days', {})
+
+    @staticmethod
+    def _numeric_metrics(entry: Dict) -> Dict[str, float]:
+        """Numeric metric values of a history entry"""
+        metrics = entry.get('metrics', {}) if isinstance(entry, dict) else {}
+        return {
+            name: float(value)
+            for name, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+
+    @staticmethod
+    def _rollup_add(rollup: Dict, values: Dict[str, float]):
+        """Add one entry to a count/sums rollup"""
+        rollup['count'] = rollup.get('count', 0) + 1
+        sums = rollup.setdefault('sums', {})
+        for name, value in values.items():
+            sums[name] = sums.get(name, 0.0) + value
+
+    @staticmethod
+    def _rollup_summary(rollup: Dict) -> Dict:
+        """Count and per-metric means of a rollup"""
+        count = rollup.get('count', 0)
+        return {
+            'count': count,
+            'averages': {
+                name: total / count for name, total in rollup.get('sums', {}).items()
+            } if count else {}
+        }
+
+    def add(self, entry: Any):
+        """Fold one history entry into the aggregates"""
+        self.count += 1
+        values = self._numeric_metrics(entry)
+
+        for name, value in values.items():
+            if name not in self._metrics:
+                self._metrics[name] = LogHistogram()
+            self._metrics[name].add(value)
+
+        timestamp = entry.get('timestamp') if isinstance(entry, dict) else None
+        timestamp = timestamp or datetime.now().isoformat()
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+        topic = entry.get('topic') if isinstance(entry, dict) else None
+        if topic:
+            self._rollup_add(self._topics.setdefault(topic, {}), values)
+
+        self._rollup_add(self._days.setdefault(timestamp[:10], {}), values)
+
+    def add_daily_summary(self, summary: Dict):
+        """Fold one retention daily summary (see compact_history) into the aggregates
+
+        Counts and sums are exact; each metric's percentiles see the day's
+        average once per summarized entry.
+        """
+        count = summary.get('count', 0)
+        day = summary.get('date')
+        if not count or not day:
+            return
+
+        self.count += count
+        sums = {name: float(total) for name, total in summary.get('sums', {}).items()}
+        for name, total in sums.items():
+            if name not in self._metrics:
+                self._metrics[name] = LogHistogram()
+            self._metrics[name].add(total / count, count)
+
+        if self.first_timestamp is None or day < self.first_timestamp:
+            self.first_timestamp = day
+        if self.last_timestamp is None or day > self.last_timestamp:
+            self.last_timestamp = day
+
+        rollup = self._days.setdefault(day, {})
+        rollup['count'] = rollup.get('count', 0) + count
+        day_sums = rollup.setdefault('sums', {})
+        for name, total in sums.items():
+            day_sums[name] = day_sums.get(name, 0.0) + total
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Any], daily_summaries: Optional[Iterable[Dict]] = None) -> 'HistoryStats':
+        """Build aggregates from an existing history and the daily summaries compacted out of it"""
+        stats = cls()
+        for summary in daily_summaries or []:
+            stats.add_daily_summary(summary)
+        for entry in entries:
+            stats.add(entry)
+        return stats
+
+    def metric(self, name: str) -> Dict:
+        """Count, sum, mean, min/max and percentiles for one metric"""
+        histogram = self._metrics.get(name)
+        if histogram is None:
+            return LogHistogram().summary()
+        return histogram.summary()
+
+    def metric_names(self) -> List[str]:
+        """Metrics seen so far"""
+        return sorted(self._metrics)
+
+    def topic(self, topic: str) -> Dict:
+        """Rollup for one topic"""
+        return self._rollup_summary(self._topics.get(topic, {}))
+
+    def topics(self) -> Dict[str, Dict]:
+        """Rollups for all topics"""
+        return {name: self._rollup_summary(rollup) for name, rollup in self._topics.items()}
+
+    def day(self, day: str) -> Dict:
+        """Rollup for one day (YYYY-MM-DD)"""
+        return self._rollup_summary(self._days.get(day, {}))
+
+    def days(self) -> Dict[str, Dict]:
+        """Rollups for all days, oldest first"""
+        return {name: self._rollup_summary(self._days[name]) for name in sorted(self._days)}
+
+    def summary(self) -> Dict:
+        """Overall aggregates"""
+        return {
+            'count': self.count,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'metrics': {name: self.metric(name) for name in self.metric_names()}
+        }
+
+    def to_dict(self) -> Dict:
+        """Serializable state"""
+        return {
+            'count': self.count,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'metrics': {name: histogram.to_dict() for name, histogram in self._metrics.items()},
+            'topics': self._topics,
+            'days': self._days
+        }
+
+
+def load_history_stats(storage_path: str = './memory', key: str = 'content_history') -> HistoryStats:
+    """Read aggregates for a history key without loading the history"""
+    stats_file = os.path.join(storage_path, 'history_stats.json')
+    try:
+        with open(stats_file, 'r') as f:
+            return HistoryStats(json.load(f).get(key))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return HistoryStats()
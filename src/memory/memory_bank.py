@@ -4,62 +4,286 @@ Memory Bank - Long-term memory storage for agents
 
 import json
 import os
-from typing import Any, Dict, List, Optional
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
+from .file_lock import FileLock
+from .history_stats import HistoryStats
+from .near_duplicates import NearDuplicateIndex
+from .retention import RetentionPolicy, compact_history
+
 
 class MemoryBank:
-    """Persistent storage for agent memory"""
+    """Persistent storage for agent memory
+
+    Safe to share between processes: every write takes a cross-process
+    lock, merges with whatever is on disk, and atomically replaces the file.
+    Reads only re-parse the file when another process has changed it.
+    
+    Histories listed in `tracked_histories` also get running aggregates
+    (see HistoryStats), kept in a small companion history_stats.json, and
+    a near-duplicate index of their topics and texts (see
+    NearDuplicateIndex), whose signatures are appended to
+    near_duplicates.jsonl and only rewritten when a history is replaced.
+    With a `retention_policy`, `compact()` bounds how much of each history
+    stays in memory.json; `compact_on_startup` runs it from the constructor.
+    """
     
-    def __init__(self, storage_path: str = './memory'):
+    def __init__(self, storage_path: str = './memory', lock_timeout: float = 30.0,
+                 tracked_histories: Tuple[str, ...] = ('content_history',),
+                 retention_policy: Optional[RetentionPolicy] = None,
+                 compact_on_startup: bool = False):
         self.storage_path = storage_path
         self.memory_file = os.path.join(storage_path, 'memory.json')
+        self.stats_file = os.path.join(storage_path, 'history_stats.json')
+        self.duplicates_file = os.path.join(storage_path, 'near_duplicates.jsonl')
+        self.lock_file = self.memory_file + '.lock'
+        self.tracked_histories = tracked_histories
+        self.retention_policy = retention_policy
+        self._lock = FileLock(self.lock_file, timeout=lock_timeout)
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._stats_signature: Optional[Tuple[int, int, int]] = None
+        self._duplicates: Dict[str, NearDuplicateIndex] = {}
+        self._duplicates_file_id: Optional[int] = None
+        self._duplicates_offset = 0
         self._ensure_storage_exists()
         self._memory = self._load_memory()
+        self._stats = self._load_stats()
+        self._refresh_duplicates()
+        self._ensure_history_stats()
+        
+        if compact_on_startup and retention_policy is not None:
+            for key in self.tracked_histories:
+                self.compact(key)
     
     def _ensure_storage_exists(self):
         """Create storage directory if it doesn't exist"""
         os.makedirs(self.storage_path, exist_ok=True)
         
         if not os.path.exists(self.memory_file):
-            with open(self.memory_file, 'w') as f:
-                json.dump({}, f)
+            with self._lock:
+                if not os.path.exists(self.memory_file):
+                    self._write_file(self.memory_file, {})
+    
+    @staticmethod
+    def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+        """Cheap change marker for a file (inode, mtime, size)"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
     
     def _load_memory(self) -> Dict:
         """Load memory from disk"""
         try:
             with open(self.memory_file, 'r') as f:
+                stat = os.fstat(f.fileno())
+                self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._signature = self._file_signature(self.memory_file)
+            return {}
+    
+    def _load_stats(self) -> Dict:
+        """Load history aggregates from disk"""
+        try:
+            with open(self.stats_file, 'r') as f:
+                stat = os.fstat(f.fileno())
+                self._stats_signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
+            self._stats_signature = self._file_signature(self.stats_file)
             return {}
     
+    def _refresh(self):
+        """Reload memory only if another process changed the file"""
+        if self._file_signature(self.memory_file) != self._signature:
+            self._memory = self._load_memory()
+    
+    def _refresh_stats(self):
+        """Reload aggregates only if another process changed them"""
+        if self._file_signature(self.stats_file) != self._stats_signature:
+            self._stats = self._load_stats()
+    
+    def _refresh_duplicates(self):
+        """Index near-duplicate records appended since the last read (all of them if the file was replaced)"""
+        try:
+            stat = os.stat(self.duplicates_file)
+        except FileNotFoundError:
+            self._duplicates, self._duplicates_file_id, self._duplicates_offset = {}, None, 0
+            return
+        
+        if stat.st_ino != self._duplicates_file_id or stat.st_size < self._duplicates_offset:
+            self._duplicates, self._duplicates_file_id, self._duplicates_offset = {}, stat.st_ino, 0
+        if stat.st_size == self._duplicates_offset:
+            return
+        
+        with open(self.duplicates_file, 'rb') as f:
+            f.seek(self._duplicates_offset)
+            data = f.read()
+        # A line still being written by another process is picked up next time
+        complete = data.rfind(b'\n') + 1
+        for line in data[:complete].splitlines():
+            try:
+                record = json.loads(line)
+                index = self._duplicates.setdefault(record['key'], NearDuplicateIndex())
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            if record.get('entry'):
+                index.add_stored(record['entry'])
+        self._duplicates_offset += complete
+    
+    def _ensure_history_stats(self):
+        """Build aggregates and near-duplicate indexes for tracked histories that predate them"""
+        missing = [
+            key for key in self.tracked_histories
+            if isinstance(self._memory.get(key), list) and (key not in self._stats or key not in self._duplicates)
+        ]
+        if not missing:
+            return
+        
+        with self._lock:
+            self._refresh()
+            self._refresh_stats()
+            self._refresh_duplicates()
+            for key in missing:
+                if key not in self._stats:
+                    self._stats[key] = HistoryStats.from_entries(
+                        self._memory.get(key, []), self._memory.get(f'{key}_daily')
+                    ).to_dict()
+                if key not in self._duplicates:
+                    self._duplicates[key] = NearDuplicateIndex.from_entries(self._memory.get(key, []))
+            self._save_stats()
+            self._save_duplicates()
+    
+    def _write_file(self, path: str, data: Dict, indent: Optional[int] = 2):
+        """Atomically replace `path` with `data`"""
+        self._write_text(path, json.dumps(data, indent=indent))
+    
+    def _write_text(self, path: str, text: str):
+        """Atomically replace `path` with `text`"""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.storage_path, prefix='.memory-', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
     def _save_memory(self):
-        """Save memory to disk"""
-        with open(self.memory_file, 'w') as f:
-            json.dump(self._memory, f, indent=2)
+        """Save memory to disk (caller must hold the lock)"""
+        self._write_file(self.memory_file, self._memory)
+        self._signature = self._file_signature(self.memory_file)
+    
+    def _save_stats(self):
+        """Save history aggregates to disk (caller must hold the lock)"""
+        self._write_file(self.stats_file, self._stats, indent=None)
+        self._stats_signature = self._file_signature(self.stats_file)
+    
+    def _save_duplicates(self):
+        """Rewrite every near-duplicate index to disk (caller must hold the lock)"""
+        # A bare key record marks an index with no entries, so it is not rebuilt on the next start
+        lines = []
+        for key, index in self._duplicates.items():
+            lines.append(json.dumps({'key': key}) + '\n')
+            lines.extend(json.dumps({'key': key, 'entry': stored}) + '\n' for stored in index.stored_entries())
+        self._write_text(self.duplicates_file, ''.join(lines))
+        stat = os.stat(self.duplicates_file)
+        self._duplicates_file_id, self._duplicates_offset = stat.st_ino, stat.st_size
+    
+    def _append_duplicate(self, key: str, entry: Any):
+        """Index one history entry and append its signatures (caller must hold the lock)"""
+        self._refresh_duplicates()
+        if key not in self._duplicates:
+            self._duplicates[key] = NearDuplicateIndex()
+            records = [{'key': key}]
+        else:
+            records = []
+        stored = self._duplicates[key].add(entry)
+        if stored is not None:
+            records.append({'key': key, 'entry': stored})
+        if not records:
+            return
+        
+        with open(self.duplicates_file, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+        stat = os.stat(self.duplicates_file)
+        self._duplicates_file_id, self._duplicates_offset = stat.st_ino, stat.st_size
+    
+    def _set_stats(self, key: str, stats: Optional[HistoryStats]):
+        """Replace or drop aggregates for a tracked history (caller must hold the lock)"""
+        if key not in self.tracked_histories:
+            return
+        
+        self._refresh_stats()
+        if stats is None:
+            self._stats.pop(key, None)
+        else:
+            self._stats[key] = stats.to_dict()
+        self._save_stats()
+    
+    def _set_duplicates(self, key: str, index: Optional[NearDuplicateIndex]):
+        """Replace or drop the near-duplicate index of a tracked history (caller must hold the lock)"""
+        if key not in self.tracked_histories:
+            return
+        
+        self._refresh_duplicates()
+        if index is None:
+            self._duplicates.pop(key, None)
+        else:
+            self._duplicates[key] = index
+        self._save_duplicates()
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get value from memory"""
+        self._refresh()
         return self._memory.get(key, default)
     
     def set(self, key: str, value: Any):
         """Set value in memory"""
-        self._memory[key] = value
-        self._save_memory()
+        with self._lock:
+            self._refresh()
+            self._memory[key] = value
+            self._save_memory()
+            
+            if key in self.tracked_histories:
+                entries = value if isinstance(value, list) else [value]
+                self._set_stats(key, HistoryStats.from_entries(entries, self._memory.get(f'{key}_daily')))
+                self._set_duplicates(key, NearDuplicateIndex.from_entries(entries))
     
     def append_to_history(self, key: str, value: Any):
         """Append value to a list in memory"""
-        if key not in self._memory:
-            self._memory[key] = []
-        
-        if not isinstance(self._memory[key], list):
-            self._memory[key] = [self._memory[key]]
-        
-        self._memory[key].append(value)
-        self._save_memory()
+        with self._lock:
+            self._refresh()
+            
+            if key not in self._memory:
+                self._memory[key] = []
+            
+            if not isinstance(self._memory[key], list):
+                self._memory[key] = [self._memory[key]]
+            
+            self._memory[key].append(value)
+            self._save_memory()
+            
+            if key in self.tracked_histories:
+                self._refresh_stats()
+                stats = HistoryStats(self._stats.get(key))
+                stats.add(value)
+                self._set_stats(key, stats)
+                
+                self._append_duplicate(key, value)
     
     def get_history(self, key: str, limit: Optional[int] = None) -> List:
         """Get history list with optional limit"""
+        self._refresh()
         history = self._memory.get(key, [])
         
         if limit:
@@ -68,15 +292,72 @@ class MemoryBank:
     
     def delete(self, key: str):
         """Delete key from memory"""
-        if key in self._memory:
-            del self._memory[key]
-            self._save_memory()
+        with self._lock:
+            self._refresh()
+            if key in self._memory:
+                del self._memory[key]
+                self._save_memory()
+                self._set_stats(key, None)
+                self._set_duplicates(key, None)
     
     def clear_all(self):
         """Clear all memory"""
-        self._memory = {}
-        self._save_memory()
+        with self._lock:
+            self._memory = {}
+            self._save_memory()
+            self._stats = {}
+            self._save_stats()
+            self._duplicates = {}
+            self._save_duplicates()
+    
+    def compact(self, key: str = 'content_history', policy: Optional[RetentionPolicy] = None) -> Dict:
+        """Apply the retention policy to a history
+        
+        Old entries become metrics-only records and very old ones are
+        rolled into daily summaries stored under `<key>_daily`. Running
+        aggregates are left untouched, and rebuilding them folds the daily
+        summaries back in, so totals still cover everything.
+        """
+        policy = policy or self.retention_policy or RetentionPolicy()
+        
+        with self._lock:
+            self._refresh()
+            history = self._memory.get(key, [])
+            
+            if not isinstance(history, list):
+                return {'full': 0, 'metrics_only': 0, 'summarized': 0, 'changed': False}
+            
+            daily_key = f'{key}_daily'
+            compacted, daily, report = compact_history(
+                history, policy, self._memory.get(daily_key, [])
+            )
+            
+            report['changed'] = compacted != history
+            if report['changed']:
+                self._memory[key] = compacted
+                if daily:
+                    self._memory[daily_key] = daily
+                self._save_memory()
+            
+            return report
+    
+    def get_history_stats(self, key: str = 'content_history') -> HistoryStats:
+        """Get precomputed aggregates for a tracked history"""
+        self._refresh_stats()
+        return HistoryStats(self._stats.get(key))
+    
+    def find_near_duplicates(self, key: str = 'content_history', topic: Optional[str] = None,
+                             content: Optional[Dict[str, str]] = None, topic_threshold: float = 0.7,
+                             content_threshold: float = 0.5) -> Dict[str, List[Dict]]:
+        """Earlier entries of a tracked history whose topic or platform texts are near duplicates"""
+        self._refresh_duplicates()
+        index = self._duplicates.get(key) or NearDuplicateIndex()
+        return {
+            'topic': index.query_topic(topic, topic_threshold) if topic else [],
+            'content': index.query_content(content, content_threshold) if content else []
+        }
     
     def get_all(self) -> Dict:
         """Get all memory"""
+        self._refresh()
         return self._memory.copy()
\ No newline at end of file
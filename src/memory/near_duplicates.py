@@ -0,0 +1,184 @@
+"""
+Near Duplicates - MinHash/LSH index over generated content history
+"""
+
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Signature length and LSH banding: 16 bands of 4 rows catch pairs above ~0.5 Jaccard
+NUM_PERM = 64
+BANDS = 16
+
+# Largest prime below 2**32; a * x stays inside uint64 for 32-bit a and x
+_PRIME = np.uint64(4294967291)
+
+# Fixed seed so signatures stored on disk stay comparable across processes
+_RNG = np.random.RandomState(20240601)
+_A = _RNG.randint(1, 2 ** 32 - 5, size=NUM_PERM, dtype=np.uint64)
+_B = _RNG.randint(0, 2 ** 32 - 5, size=NUM_PERM, dtype=np.uint64)
+
+# Shorter texts (error placeholders, stubs) are neither indexed nor checked
+MIN_CONTENT_WORDS = 20
+
+_WORD = re.compile(r'\w+')
+# Words that say nothing about what a topic is about
+_TOPIC_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'for', 'from', 'how', 'in', 'is', 'of', 'on', 'or', 'the', 'to', 'what',
+    'why', 'with', 'your'
+})
+
+
+class DuplicateContentError(RuntimeError):
+    """Raised when a package is a near duplicate of one already in history"""
+
+
+def topic_shingles(topic: str) -> Set[str]:
+    """Content words of a topic (numbers such as years and list sizes dropped)"""
+    return {
+        word for word in _WORD.findall(topic.lower()) if word not in _TOPIC_STOPWORDS and not word.isdigit()
+    }
+
+
+def content_shingles(text: str, size: int = 3) -> Set[str]:
+    """Overlapping word `size`-grams of a text (none for texts under MIN_CONTENT_WORDS words)"""
+    words = _WORD.findall(text.lower())
+    if len(words) < max(size, MIN_CONTENT_WORDS):
+        return set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(shingles: Iterable[str]) -> Optional[np.ndarray]:
+    """MinHash signature of a shingle set, or None for an empty set"""
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64
+    )
+    if not len(hashes):
+        return None
+    permuted = (np.outer(hashes, _A) % _PRIME + _B) % _PRIME
+    return permuted.min(axis=0)
+
+
+class NearDuplicateIndex:
+    """Locality-sensitive index of topic and per-platform content signatures
+
+    Every history entry contributes a MinHash signature of its topic and
+    one of each platform text. Signatures are split into bands and each
+    band is hashed into a bucket, so a lookup only compares the entries
+    that share a bucket with the query. Only signatures are kept, so the
+    index still covers entries whose text was compacted away.
+    """
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self._entries: List[Dict] = []
+        self._signatures: Dict[str, List[Tuple[int, np.ndarray]]] = {}
+        self._buckets: Dict[str, Dict[Tuple[int, bytes], List[int]]] = {}
+        for stored in data.get('entries', []):
+            self.add_stored(stored)
+
+    @property
+    def count(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, rows.tobytes()) for band, rows in enumerate(np.split(signature, BANDS))]
+
+    def _insert(self, kind: str, entry_id: int, signature: np.ndarray):
+        signatures = self._signatures.setdefault(kind, [])
+        position = len(signatures)
+        signatures.append((entry_id, signature))
+        buckets = self._buckets.setdefault(kind, {})
+        for key in self._bands(signature):
+            buckets.setdefault(key, []).append(position)
+
+    def add_stored(self, stored: Dict):
+        """Index one entry in its stored form (see `add` and `to_dict`)"""
+        entry_id = len(self._entries)
+        self._entries.append(stored)
+        for kind, signature in stored.get('signatures', {}).items():
+            self._insert(kind, entry_id, np.array(signature, dtype=np.uint64))
+
+    def add(self, entry: Any) -> Optional[Dict]:
+        """Index one history entry by its topic and each platform text; returns its stored form"""
+        if not isinstance(entry, dict):
+            return None
+
+        signatures = {}
+        topic_signature = minhash(topic_shingles(entry.get('topic') or ''))
+        if topic_signature is not None:
+            signatures['topic'] = topic_signature
+        for platform, text in (entry.get('content') or {}).items():
+            signature = minhash(content_shingles(text)) if isinstance(text, str) else None
+            if signature is not None:
+                signatures[f'content:{platform}'] = signature
+
+        entry_id = len(self._entries)
+        stored = {
+            'topic': entry.get('topic'),
+            'timestamp': entry.get('timestamp'),
+            'signatures': {kind: signature.tolist() for kind, signature in signatures.items()}
+        }
+        self._entries.append(stored)
+        for kind, signature in signatures.items():
+            self._insert(kind, entry_id, signature)
+        return stored
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Any]) -> 'NearDuplicateIndex':
+        """Build the index for an existing history"""
+        index = cls()
+        for entry in entries:
+            index.add(entry)
+        return index
+
+    def _query(self, kind: str, signature: Optional[np.ndarray], threshold: float) -> List[Dict]:
+        if signature is None or kind not in self._signatures:
+            return []
+
+        buckets = self._buckets[kind]
+        candidates = sorted({
+            position for key in self._bands(signature) for position in buckets.get(key, ())
+        })
+        if not candidates:
+            return []
+
+        signatures = self._signatures[kind]
+        stacked = np.stack([signatures[position][1] for position in candidates])
+        similarities = (stacked == signature).mean(axis=1)
+
+        matches = []
+        for position, similarity in zip(candidates, similarities):
+            if similarity >= threshold:
+                entry = self._entries[signatures[position][0]]
+                matches.append({
+                    'topic': entry['topic'],
+                    'timestamp': entry['timestamp'],
+                    'similarity': round(float(similarity), 3)
+                })
+        return sorted(matches, key=lambda match: match['similarity'], reverse=True)
+
+    def query_topic(self, topic: str, threshold: float = 0.7) -> List[Dict]:
+        """Earlier entries whose topic is at least `threshold` similar (estimated Jaccard)"""
+        return self._query('topic', minhash(topic_shingles(topic)), threshold)
+
+    def query_content(self, content: Dict[str, str], threshold: float = 0.5) -> List[Dict]:
+        """Earlier entries with a platform text at least `threshold` similar to the same platform here"""
+        matches = []
+        for platform, text in content.items():
+            if not isinstance(text, str):
+                continue
+            for match in self._query(f'content:{platform}', minhash(content_shingles(text)), threshold):
+                matches.append({**match, 'platform': platform})
+        return sorted(matches, key=lambda match: match['similarity'], reverse=True)
+
+    def stored_entries(self) -> List[Dict]:
+        """Every entry in its stored form, oldest first"""
+        return list(self._entries)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form (signatures only; buckets are rebuilt on load)"""
+        return {'entries': self._entries}
@@ -0,0 +1,210 @@
+"""
+Research Index - Persistent BM25 retrieval over past research briefs and sources
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from .file_lock import FileLock
+
+_WORD = re.compile(r'\w+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+# Words too common to say anything about relevance
+STOPWORDS = frozenset({
+    'a', 'about', 'after', 'all', 'also', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'but', 'by', 'can',
+    'do', 'for', 'from', 'has', 'have', 'how', 'in', 'into', 'is', 'it', 'its', 'more', 'most', 'not', 'of',
+    'on', 'or', 'our', 'than', 'that', 'the', 'their', 'them', 'there', 'these', 'they', 'this', 'to', 'was',
+    'were', 'what', 'when', 'which', 'who', 'why', 'will', 'with', 'you', 'your'
+})
+
+# Brief passages are cut at sentence boundaries to about this many words
+PASSAGE_WORDS = 80
+
+# Research fields indexed as one document per item, and the kind each is stored as
+_ITEM_FIELDS = (('key_insights', 'insight'), ('statistics', 'statistic'), ('real_examples', 'example'))
+
+
+def index_terms(text: str) -> List[str]:
+    """Lowercase words of `text` without stopwords"""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def _passages(brief: str) -> List[str]:
+    """Brief split into passages of whole sentences of about PASSAGE_WORDS words"""
+    passages = []
+    for paragraph in re.split(r'\n\s*\n', brief):
+        current: List[str] = []
+        words = 0
+        for sentence in _SENTENCE_END.split(paragraph.strip()):
+            if current and words + len(sentence.split()) > PASSAGE_WORDS:
+                passages.append(' '.join(current))
+                current, words = [], 0
+            if sentence:
+                current.append(sentence)
+                words += len(sentence.split())
+        if current:
+            passages.append(' '.join(current))
+    return passages
+
+
+class ResearchIndex:
+    """BM25 index over every research brief, insight, statistic, example and source
+
+    Documents are appended to research_index.jsonl under `storage_path`
+    and the inverted index is kept in memory. Instances sharing the file
+    read only what other processes appended since their last look, so
+    adding and searching stay incremental. Repeated items (the same
+    source found for two topics) are stored once. One instance may be
+    used from several threads; reads and writes of the in-memory index
+    take a thread lock.
+    """
+
+    def __init__(self, storage_path: str = './memory', k1: float = 1.5, b: float = 0.75,
+                 lock_timeout: float = 30.0):
+        self.storage_path = storage_path
+        self.index_file = os.path.join(storage_path, 'research_index.jsonl')
+        self.k1 = k1
+        self.b = b
+        self._lock = FileLock(self.index_file + '.lock', timeout=lock_timeout)
+        # Guards the in-memory index; taken inside the file lock, never around it
+        self._index_lock = threading.RLock()
+        os.makedirs(storage_path, exist_ok=True)
+        self._reset()
+        self._refresh()
+
+    def _reset(self):
+        self._documents: List[Dict] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        self._seen: Set[Tuple[str, str]] = set()
+        self._file_id: Optional[int] = None
+        self._offset = 0
+
+    @property
+    def count(self) -> int:
+        with self._index_lock:
+            return len(self._documents)
+
+    @staticmethod
+    def _identity(document: Dict) -> Tuple[str, str]:
+        return document['kind'], (document.get('url') or document['text']).strip().lower()
+
+    def _index(self, document: Dict):
+        doc_id = len(self._documents)
+        terms = Counter(index_terms(f"{document['text']} {document.get('topic') or ''}"))
+        self._documents.append(document)
+        self._lengths.append(sum(terms.values()))
+        self._total_length += self._lengths[-1]
+        self._seen.add(self._identity(document))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+
+    def _refresh(self):
+        """Index documents appended to the file since the last read"""
+        with self._index_lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        try:
+            stat = os.stat(self.index_file)
+        except FileNotFoundError:
+            if self._offset:
+                self._reset()
+            return
+
+        if stat.st_ino != self._file_id or stat.st_size < self._offset:
+            self._reset()
+            self._file_id = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.index_file, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # A line still being written by another process is picked up next time
+        complete = data.rfind(b'\n') + 1
+        for line in data[:complete].splitlines():
+            try:
+                self._index(json.loads(line))
+            except (json.JSONDecodeError, KeyError):
+                continue
+        self._offset += complete
+
+    @staticmethod
+    def _documents_of(topic: str, research: Dict, timestamp: str) -> List[Dict]:
+        """Documents for one research result"""
+        documents = [
+            {'topic': topic, 'kind': 'brief', 'text': passage, 'timestamp': timestamp}
+            for passage in _passages(str(research.get('brief') or ''))
+        ]
+        for field, kind in _ITEM_FIELDS:
+            for item in research.get(field) or []:
+                if item:
+                    documents.append({'topic': topic, 'kind': kind, 'text': str(item), 'timestamp': timestamp})
+        for source in research.get('sources') or []:
+            if isinstance(source, dict):
+                text = ' - '.join(str(source[key]) for key in ('title', 'relevance') if source.get(key))
+                url = source.get('url')
+            else:
+                text, url = str(source), None
+            if text or url:
+                documents.append({
+                    'topic': topic, 'kind': 'source', 'text': text or url, 'url': url, 'timestamp': timestamp
+                })
+        return documents
+
+    def add_research(self, topic: str, research: Dict, timestamp: Optional[str] = None) -> int:
+        """Index one research result; returns how many new documents it added"""
+        documents = self._documents_of(topic, research, timestamp or datetime.now().isoformat())
+
+        with self._lock, self._index_lock:
+            self._refresh_locked()
+            new = []
+            batch: Set[Tuple[str, str]] = set()
+            for document in documents:
+                identity = self._identity(document)
+                if identity not in self._seen and identity not in batch and document['text'].strip():
+                    batch.add(identity)
+                    new.append(document)
+            if not new:
+                return 0
+
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(document) + '\n' for document in new))
+            self._refresh_locked()
+        return len(new)
+
+    def search(self, query: str, limit: int = 8, kinds: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+        """Best BM25 matches for `query`, each document with its `score`"""
+        with self._index_lock:
+            self._refresh_locked()
+            return self._search_locked(query, limit, kinds)
+
+    def _search_locked(self, query: str, limit: int, kinds: Optional[Tuple[str, ...]]) -> List[Dict]:
+        if not self._documents:
+            return []
+
+        total = len(self._documents)
+        average_length = self._total_length / total or 1
+        scores: Dict[int, float] = {}
+        for term in set(index_terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        if kinds is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if self._documents[doc_id]['kind'] in kinds}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{**self._documents[doc_id], 'score': round(score, 3)} for doc_id, score in best]
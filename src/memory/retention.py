@@ -0,0 +1,146 @@
+"""
+Retention - History retention, compaction and downsampling policy
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+
+class RetentionPolicy:
+    """How much of a history to keep at full fidelity
+
+    Entries inside the newest `full_entries` or the last `full_days` days
+    keep their full artifacts. Older entries are reduced to metrics-only
+    records, and entries older than `summarize_after_days` are rolled up
+    into one summary per day. A window set to None is disabled.
+    """
+    
+    def __init__(self, full_entries: Optional[int] = 50, full_days: Optional[int] = None,
+                 summarize_after_days: Optional[int] = 180):
+        self.full_entries = full_entries
+        self.full_days = full_days
+        self.summarize_after_days = summarize_after_days
+    
+    @classmethod
+    def from_env(cls) -> 'RetentionPolicy':
+        """Build a policy from MEMORY_KEEP_FULL_ENTRIES / MEMORY_KEEP_FULL_DAYS / MEMORY_SUMMARIZE_AFTER_DAYS"""
+        def read(name: str, default: Optional[int]) -> Optional[int]:
+            value = os.getenv(name)
+            if value is None or value == '':
+                return default
+            if value.lower() == 'none':
+                return None
+            return int(value)
+        
+        return cls(
+            full_entries=read('MEMORY_KEEP_FULL_ENTRIES', 50),
+            full_days=read('MEMORY_KEEP_FULL_DAYS', None),
+            summarize_after_days=read('MEMORY_SUMMARIZE_AFTER_DAYS', 180)
+        )
+    
+    def to_dict(self) -> Dict:
+        """Policy settings"""
+        return {
+            'full_entries': self.full_entries,
+            'full_days': self.full_days,
+            'summarize_after_days': self.summarize_after_days
+        }
+
+
+def _entry_time(entry: Any) -> Optional[datetime]:
+    """Timestamp of a history entry, if it has a parseable one"""
+    if not isinstance(entry, dict):
+        return None
+    try:
+        return datetime.fromisoformat(entry.get('timestamp', ''))
+    except (TypeError, ValueError):
+        return None
+
+
+def _metrics_only(entry: Dict) -> Dict:
+    """Strip a history entry down to its metrics"""
+    return {
+        'topic': entry.get('topic', ''),
+        'metrics': entry.get('metrics', {}),
+        'timestamp': entry.get('timestamp', ''),
+        'compacted': 'metrics_only'
+    }
+
+
+def _add_to_daily(daily: Dict[str, Dict], entry: Dict):
+    """Fold an entry into its day's summary"""
+    day = entry.get('timestamp', '')[:10]
+    summary = daily.setdefault(day, {'date': day, 'count': 0, 'topics': [], 'sums': {}})
+    summary['count'] += 1
+    
+    topic = entry.get('topic')
+    if topic and topic not in summary['topics']:
+        summary['topics'].append(topic)
+    
+    for name, value in entry.get('metrics', {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            summary['sums'][name] = summary['sums'].get(name, 0.0) + value
+
+
+def compact_history(history: List, policy: RetentionPolicy, daily_summaries: Optional[List[Dict]] = None,
+                    now: Optional[datetime] = None) -> Tuple[List, List[Dict], Dict]:
+    """Apply a retention policy to a history list
+
+    Returns the compacted history, the updated daily summaries and a
+    report with how many entries ended up in each tier.
+    """
+    now = now or datetime.now()
+    full_cutoff = now - timedelta(days=policy.full_days) if policy.full_days is not None else None
+    summary_cutoff = (
+        now - timedelta(days=policy.summarize_after_days)
+        if policy.summarize_after_days is not None else None
+    )
+    first_full_index = (
+        max(0, len(history) - policy.full_entries) if policy.full_entries is not None else len(history)
+    )
+    keep_everything = policy.full_entries is None and policy.full_days is None
+    
+    # Copies, so the caller's summaries only change if it stores the result
+    daily = {
+        summary['date']: {**summary, 'topics': list(summary.get('topics', [])), 'sums': dict(summary.get('sums', {}))}
+        for summary in (daily_summaries or [])
+    }
+    kept = []
+    report = {'full': 0, 'metrics_only': 0, 'summarized': 0}
+    
+    for index, entry in enumerate(history):
+        timestamp = _entry_time(entry)
+        
+        if not isinstance(entry, dict) or timestamp is None:
+            kept.append(entry)
+            report['full'] += 1
+            continue
+        
+        is_full = (
+            keep_everything
+            or index >= first_full_index
+            or (full_cutoff is not None and timestamp >= full_cutoff)
+        )
+
+        if summary_cutoff is not None and timestamp < summary_cutoff and not is_full:
+            _add_to_daily(daily, entry)
+            report['summarized'] += 1
+            continue
+
+        if is_full or entry.get('compacted'):
+            kept.append(entry)
+            report['full' if is_full else 'metrics_only'] += 1
+        else:
+            kept.append(_metrics_only(entry))
+            report['metrics_only'] += 1
+    
+    summaries = []
+    for day in sorted(daily):
+        summary = daily[day]
+        summary['averages'] = {
+            name: round(total / summary['count'], 2) for name, total in summary['sums'].items()
+        }
+        summaries.append(summary)
+    
+    return kept, summaries, report
\ No newline at end of file
@@ -3,79 +3,241 @@ Session Service - Manages session state for agent workflows
 """
 
 from typing import Any, Dict, Optional
+from collections import OrderedDict
 from datetime import datetime
+import sys
+import threading
+import time
 import uuid
+import weakref
+
+
+def approx_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Approximate bytes held by a value, following containers"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    
+    size = sys.getsizeof(value)
+    
+    if isinstance(value, dict):
+        size += sum(approx_size(k, _seen) + approx_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item, _seen) for item in value)
+    
+    return size
 
 
 class Session:
-    """Represents a session with state management"""
+    """Represents a session with state management
+    
+    A session created by a SessionService reports every use back to it,
+    so reads and writes through the session keep it recently used.
+    """
     
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, service: Optional['SessionService'] = None):
         self.session_id = session_id
+        self._service = weakref.ref(service) if service is not None else None
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
+        self.last_accessed = time.monotonic()
+        self.approx_bytes = 0
         self._state: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+    
+    def touch(self):
+        """Mark session as recently used"""
+        self.last_accessed = time.monotonic()
+        service = self._service() if self._service is not None else None
+        if service is not None:
+            service._mark_used(self)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get value from session state"""
+        self.touch()
         return self._state.get(key, default)
     
     def set(self, key: str, value: Any):
         """Set value in session state"""
+        size = approx_size(value)
+        self.approx_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
         self._state[key] = value
         self.updated_at = datetime.now()
+        self.touch()
     
     def delete(self, key: str):
         """Delete key from session state"""
         if key in self._state:
             del self._state[key]
+            self.approx_bytes -= self._sizes.pop(key, 0)
             self.updated_at = datetime.now()
+            self.touch()
     
     def get_all(self) -> Dict[str, Any]:
         """Get all session state"""
+        self.touch()
         return self._state.copy()
     
     def clear(self):
         """Clear all session state"""
         self._state = {}
+        self._sizes = {}
+        self.approx_bytes = 0
         self.updated_at = datetime.now()
+        self.touch()
     
     def get_duration(self) -> float:
         """Get session duration in seconds"""
         return (self.updated_at - self.created_at).total_seconds()
+    
+    def idle_seconds(self) -> float:
+        """Seconds since the session was last used"""
+        return time.monotonic() - self.last_accessed
 
 
 class SessionService:
-    """Manages multiple sessions (InMemorySessionService)"""
+    """Manages multiple sessions (InMemorySessionService)
+
+    Bounded for long-running processes: sessions idle for longer than
+    `ttl_seconds` expire, and once `max_sessions` is reached the least
+    recently used session is evicted. Pass `sweep_interval` (or call
+    `start_sweeper`) to reap expired sessions from a background thread.
+    """
+    
+    durable = False
+    
+    def __init__(self, ttl_seconds: Optional[float] = 3600, max_sessions: Optional[int] = 1000,
+                 sweep_interval: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: 'OrderedDict[str, Session]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop: Optional[threading.Event] = None
+        self._expired_count = 0
+        self._evicted_count = 0
+        
+        if sweep_interval:
+            self.start_sweeper(sweep_interval)
     
-    def __init__(self):
-        self._sessions: Dict[str, Session] = {}
+    def _is_expired(self, session: Session) -> bool:
+        """Whether a session has been idle past the TTL"""
+        return self.ttl_seconds is not None and session.idle_seconds() > self.ttl_seconds
     
     def create_session(self, session_id: Optional[str] = None) -> Session:
         """Create new session"""
         if session_id is None:
             session_id = str(uuid.uuid4())
         
-        if session_id in self._sessions:
-            return self._sessions[session_id]
-        
-        session = Session(session_id)
-        self._sessions[session_id] = session
-        return session
+        with self._lock:
+            existing = self.get_session(session_id)
+            if existing is not None:
+                return existing
+            
+            self.reap_expired()
+            
+            if self.max_sessions is not None:
+                while len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self._evicted_count += 1
+            
+            session = Session(session_id, self)
+            self._sessions[session_id] = session
+            return session
+    
+    def _mark_used(self, session: Session):
+        """Move a session that was just used to the most recently used end"""
+        with self._lock:
+            if self._sessions.get(session.session_id) is session:
+                self._sessions.move_to_end(session.session_id)
     
     def get_session(self, session_id: str) -> Optional[Session]:
         """Get existing session"""
-        return self._sessions.get(session_id)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            
+            if self._is_expired(session):
+                del self._sessions[session_id]
+                self._expired_count += 1
+                return None
+            
+            session.touch()
+            return session
     
     def end_session(self, session_id: str):
         """End and remove session"""
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        with self._lock:
+            if session_id in self._sessions:
+                del self._sessions[session_id]
     
     def get_all_sessions(self) -> Dict[str, Session]:
         """Get all active sessions"""
-        return self._sessions.copy()
+        with self._lock:
+            self.reap_expired()
+            return dict(self._sessions)
     
     def clear_all_sessions(self):
         """Clear all sessions"""
-        self._sessions = {}
\ No newline at end of file
+        with self._lock:
+            self._sessions = OrderedDict()
+    
+    def reap_expired(self) -> int:
+        """Remove sessions idle past the TTL, returning how many were removed"""
+        if self.ttl_seconds is None:
+            return 0
+        
+        with self._lock:
+            expired = [sid for sid, session in self._sessions.items() if self._is_expired(session)]
+            for session_id in expired:
+                del self._sessions[session_id]
+            self._expired_count += len(expired)
+            return len(expired)
+    
+    def total_bytes(self) -> int:
+        """Approximate bytes held across all sessions"""
+        with self._lock:
+            return sum(session.approx_bytes for session in self._sessions.values())
+    
+    def get_stats(self) -> Dict:
+        """Session counts and memory accounting"""
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'approx_bytes': self.total_bytes(),
+                'expired': self._expired_count,
+                'evicted': self._evicted_count,
+                'max_sessions': self.max_sessions,
+                'ttl_seconds': self.ttl_seconds
+            }
+    
+    def start_sweeper(self, interval: float = 60.0):
+        """Reap expired sessions every `interval` seconds on a daemon thread"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        
+        stop = threading.Event()
+        service_ref = weakref.ref(self)
+        
+        def sweep():
+            while not stop.wait(interval):
+                service = service_ref()
+                if service is None:
+                    return
+                service.reap_expired()
+                del service
+        
+        self._sweeper_stop = stop
+        self._sweeper = threading.Thread(target=sweep, name='session-sweeper', daemon=True)
+        self._sweeper.start()
+    
+    def stop_sweeper(self):
+        """Stop the background sweeper"""
+        if self._sweeper_stop is not None:
+            self._sweeper_stop.set()
+        self._sweeper = None
+        self._sweeper_stop = None
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""
+SQLite Session Service - Durable sessions shared across processes and restarts
+"""
+
+from typing import Any, Dict, Optional
+from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from .session_service import Session, SessionService
+
+
+def _encode_default(value: Any) -> Any:
+    """JSON fallback for values the stdlib encoder does not handle"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot store {type(value).__name__} in a durable session")
+
+
+def _decode_hook(obj: Dict) -> Any:
+    """Restore values tagged by _encode_default"""
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+def encode_value(value: Any) -> str:
+    """Compact serialized form of a session value"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_encode_default)
+
+
+def decode_value(data: str) -> Any:
+    """Inverse of encode_value"""
+    return json.loads(data, object_hook=_decode_hook)
+
+
+class SQLiteSession(Session):
+    """Session whose state lives in SQLite, one row per key
+
+    Every read goes to the database, so progress written by one process
+    is visible to any other process holding the same session id.
+    """
+    
+    def __init__(self, session_id: str, service: 'SQLiteSessionService', created_at: float):
+        self.session_id = session_id
+        self.created_at = datetime.fromtimestamp(created_at)
+        self._service = service
+        self._last_touch = 0.0
+    
+    @property
+    def updated_at(self) -> datetime:
+        """Last write time, as seen by any process"""
+        row = self._service._query_one(
+            "SELECT updated_at FROM sessions WHERE session_id = ?", (self.session_id,)
+        )
+        return datetime.fromtimestamp(row[0]) if row else self.created_at
+    
+    @property
+    def last_accessed(self) -> float:
+        """Last access time (wall clock)"""
+        row = self._service._query_one(
+            "SELECT last_accessed FROM sessions WHERE session_id = ?", (self.session_id,)
+        )
+        return row[0] if row else 0.0
+    
+    @property
+    def approx_bytes(self) -> int:
+        """Serialized size of the stored state"""
+        row = self._service._query_one(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM session_state WHERE session_id = ?",
+            (self.session_id,)
+        )
+        return row[0] if row else 0
+    
+    def touch(self):
+        """Mark session as recently used (throttled to one write per second)"""
+        now = time.time()
+        if now - self._last_touch < 1.0:
+            return
+        self._last_touch = now
+        self._service._execute(
+            "UPDATE sessions SET last_accessed = ? WHERE session_id = ?", (now, self.session_id)
+        )
+    
+    def _mark_updated(self):
+        """Record a state change"""
+        now = time.time()
+        self._last_touch = now
+        self._service._execute(
+            "UPDATE sessions SET updated_at = ?, last_accessed = ? WHERE session_id = ?",
+            (now, now, self.session_id)
+        )
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get value from session state"""
+        self.touch()
+        row = self._service._query_one(
+            "SELECT value FROM session_state WHERE session_id = ? AND key = ?",
+            (self.session_id, key)
+        )
+        return decode_value(row[0]) if row else default
+    
+    def set(self, key: str, value: Any):
+        """Set value in session state
+        
+        A session evicted or reaped while still in use is re-created, so a
+        running pipeline keeps its progress as with the in-memory backend.
+        """
+        data = encode_value(value)
+        now = time.time()
+        conn = self._service._connection()
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at, updated_at, last_accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (self.session_id, self.created_at.timestamp(), now, now)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO session_state (session_id, key, value) VALUES (?, ?, ?)",
+                (self.session_id, key, data)
+            )
+            conn.execute(
+                "UPDATE sessions SET updated_at = ?, last_accessed = ? WHERE session_id = ?",
+                (now, now, self.session_id)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._last_touch = now
+    
+    def delete(self, key: str):
+        """Delete key from session state"""
+        deleted = self._service._execute(
+            "DELETE FROM session_state WHERE session_id = ? AND key = ?", (self.session_id, key)
+        )
+        if deleted:
+            self._mark_updated()
+    
+    def get_all(self) -> Dict[str, Any]:
+        """Get all session state"""
+        self.touch()
+        rows = self._service._query_all(
+            "SELECT key, value FROM session_state WHERE session_id = ?", (self.session_id,)
+        )
+        return {key: decode_value(value) for key, value in rows}
+    
+    def clear(self):
+        """Clear all session state"""
+        self._service._execute("DELETE FROM session_state WHERE session_id = ?", (self.session_id,))
+        self._mark_updated()
+    
+    def idle_seconds(self) -> float:
+        """Seconds since the session was last used"""
+        return time.time() - self.last_accessed
+
+
+class SQLiteSessionService(SessionService):
+    """Durable SessionService backed by a local SQLite database
+
+    Same API as SessionService, but sessions survive restarts and can be
+    shared between processes, e.g. a web front end that enqueues a package
+    and a worker that runs it. TTL and max-session limits apply across
+    every process using the same database. Writes may wait up to 30 s for
+    another process's write lock, so async callers should run them off
+    the event loop (the orchestrator uses CPUExecutor.run_light).
+    """
+    
+    durable = True
+    
+    def __init__(self, db_path: str = './memory/sessions.db', ttl_seconds: Optional[float] = 86400,
+                 max_sessions: Optional[int] = 10000, sweep_interval: Optional[float] = None):
+        self.db_path = db_path
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach the sweeper's and pool threads' too
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._init_schema()
+        super().__init__(ttl_seconds=ttl_seconds, max_sessions=max_sessions, sweep_interval=sweep_interval)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (reopened if close() ran since this thread last used one)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn not in self._connections:
+            # Only this thread uses it, but close() may close it from another
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.add(conn)
+        return conn
+    
+    def _init_schema(self):
+        """Create tables if needed"""
+        conn = self._connection()
+        conn.execute("""CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            last_accessed REAL NOT NULL
+        )""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS session_state (
+            session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (session_id, key)
+        ) WITHOUT ROWID""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_accessed ON sessions(last_accessed)")
+    
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a write statement, returning affected rows"""
+        return self._connection().execute(sql, params).rowcount
+    
+    def _query_one(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        """Fetch one row"""
+        return self._connection().execute(sql, params).fetchone()
+    
+    def _query_all(self, sql: str, params: tuple = ()) -> list:
+        """Fetch all rows"""
+        return self._connection().execute(sql, params).fetchall()
+    
+    def _expiry_cutoff(self) -> Optional[float]:
+        """Sessions last accessed before this time are expired"""
+        return time.time() - self.ttl_seconds if self.ttl_seconds is not None else None
+    
+    def create_session(self, session_id: Optional[str] = None) -> Session:
+        """Create new session"""
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+        
+        existing = self.get_session(session_id)
+        if existing is not None:
+            return existing
+        
+        self.reap_expired()
+        now = time.time()
+        conn = self._connection()
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.max_sessions is not None:
+                count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+                overflow = count - self.max_sessions + 1
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM sessions WHERE session_id IN "
+                        "(SELECT session_id FROM sessions ORDER BY last_accessed LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._evicted_count += overflow
+            
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at, updated_at, last_accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, now, now, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        
+        return self.get_session(session_id)
+    
+    def get_session(self, session_id: str) -> Optional[Session]:
+        """Get existing session"""
+        row = self._query_one(
+            "SELECT created_at, last_accessed FROM sessions WHERE session_id = ?", (session_id,)
+        )
+        if row is None:
+            return None
+        
+        cutoff = self._expiry_cutoff()
+        if cutoff is not None and row[1] < cutoff:
+            self._execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._expired_count += 1
+            return None
+        
+        session = SQLiteSession(session_id, self, row[0])
+        session.touch()
+        return session
+    
+    def end_session(self, session_id: str):
+        """End and remove session"""
+        self._execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    def get_all_sessions(self) -> Dict[str, Session]:
+        """Get all active sessions"""
+        self.reap_expired()
+        rows = self._query_all("SELECT session_id, created_at FROM sessions ORDER BY last_accessed")
+        return {session_id: SQLiteSession(session_id, self, created_at) for session_id, created_at in rows}
+    
+    def clear_all_sessions(self):
+        """Clear all sessions"""
+        self._execute("DELETE FROM sessions")
+    
+    def reap_expired(self) -> int:
+        """Remove sessions idle past the TTL, returning how many were removed"""
+        cutoff = self._expiry_cutoff()
+        if cutoff is None:
+            return 0
+        
+        removed = self._execute("DELETE FROM sessions WHERE last_accessed < ?", (cutoff,))
+        self._expired_count += removed
+        return removed
+    
+    def total_bytes(self) -> int:
+        """Serialized bytes held across all sessions"""
+        return self._query_one("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM session_state")[0]
+    
+    def get_stats(self) -> Dict:
+        """Session counts and storage accounting"""
+        return {
+            'active_sessions': self._query_one("SELECT COUNT(*) FROM sessions")[0],
+            'approx_bytes': self.total_bytes(),
+            'expired': self._expired_count,
+            'evicted': self._evicted_count,
+            'max_sessions': self.max_sessions,
+            'ttl_seconds': self.ttl_seconds
+        }
+    
+    def close(self):
+        """Stop the sweeper and close the connections of every thread"""
+        self.stop_sweeper()
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
\ No newline at end of file
@@ -4,11 +4,14 @@ With retry logic and quality improvements
 """
 
 import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional
 from datetime import datetime
 from google import genai
 from google.genai import types
 import time
+import os
 
 from agents.research_agent import ResearchAgent
 from agents.blog_writer_agent import BlogWriterAgent
@@ -21,9 +24,19 @@ from agents.email_agent import EmailAgent
 from agents.video_script_agent import VideoScriptAgent
 
 from memory.memory_bank import MemoryBank
+from memory.near_duplicates import DuplicateContentError
+from memory.research_index import ResearchIndex
+from memory.retention import RetentionPolicy
 from memory.session_service import SessionService
-from utils.logger import setup_logger
-from utils.metrics import MetricsCollector
+from memory.sqlite_session_service import SQLiteSessionService
+from utils.content_scoring import score_content_package
+from utils.cpu_executor import CPUExecutor
+from utils.logger import log_context, setup_logger
+from utils.loop_monitor import LoopMonitor
+from utils.metrics import MetricsCollector, metric_key
+from utils.profiling import PackageProfile, should_profile
+from utils.prometheus import PrometheusExporter, counter_ratio
+from utils.tracing import TracedClient, error_status, get_current_span, setup_tracing, span, stage_span
 
 logger = setup_logger(__name__)
 
@@ -33,15 +46,26 @@ class ContentFactoryOrchestrator:
     Production-ready orchestrator with retry logic
     """
     
-    def __init__(self, api_key: str, primary_model: str):
+    # Profiles kept for save_outputs to write (oldest dropped first)
+    MAX_KEPT_PROFILES = 16
+    
+    def __init__(self, api_key: Optional[str], primary_model: str, client=None,
+                 memory_path: str = './memory', step_delay: float = 2.0):
         self.api_key = api_key
         self.primary_model = primary_model
+        self.step_delay = step_delay  # pause between model calls to stay under rate limits
         
-        if not api_key or len(api_key) < 20:
+        # An injected client (e.g. testing.FakeGeminiClient) needs no API key
+        if client is None and (not api_key or len(api_key) < 20):
             raise ValueError("Invalid API key. Please check your .env file.")
         
+        setup_tracing()
+        self.metrics = MetricsCollector()
+        
         try:
-            self.client = genai.Client(api_key=api_key)
+            if client is None:
+                client = genai.Client(api_key=api_key)
+            self.client = TracedClient(client, metrics=self.metrics)
         except Exception as e:
             raise ValueError(f"Failed to initialize Gemini client: {str(e)}")
         
@@ -55,9 +79,47 @@ class ContentFactoryOrchestrator:
         self.email_agent = None
         self.video_agent = None
         
-        self.memory_bank = MemoryBank(storage_path='./memory')
-        self.session_service = SessionService()
-        self.metrics = MetricsCollector()
+        self.memory_bank = MemoryBank(
+            storage_path=memory_path,
+            retention_policy=RetentionPolicy.from_env(),
+            compact_on_startup=os.getenv('MEMORY_COMPACT_ON_STARTUP', '').lower() in ('1', 'true', 'yes')
+        )
+        # Past briefs and sources, searched before each new research call
+        self.research_index = ResearchIndex(storage_path=memory_path)
+        if os.getenv('SESSION_BACKEND', 'memory').lower() == 'sqlite':
+            self.session_service = SQLiteSessionService(
+                db_path=os.getenv('SESSION_DB_PATH', os.path.join(memory_path, 'sessions.db')),
+                sweep_interval=60
+            )
+        else:
+            self.session_service = SessionService(
+                ttl_seconds=3600,
+                max_sessions=1000,
+                sweep_interval=60
+            )
+        
+        self.metrics_exporter = PrometheusExporter(self.metrics, gauges={
+            'active_sessions': lambda: self.session_service.get_stats()['active_sessions'],
+            'cache_hit_ratio': counter_ratio(self.metrics, 'model_cache_hits', 'model_calls')
+        })
+        if os.getenv('METRICS_PORT'):
+            self.metrics_exporter.start_http_server(int(os.getenv('METRICS_PORT')))
+        if os.getenv('METRICS_TEXTFILE'):
+            self.metrics_exporter.start_textfile_writer(os.getenv('METRICS_TEXTFILE'))
+        
+        self.loop_monitor = LoopMonitor(
+            self.metrics,
+            block_threshold=float(os.getenv('LOOP_BLOCK_THRESHOLD', '0.25'))
+        )
+        
+        # Readability, SEO scoring, validation and history writes run here instead of on the loop
+        self.cpu = CPUExecutor.from_env(metrics=self.metrics)
+        self._profiles: 'OrderedDict[str, PackageProfile]' = OrderedDict()
+        
+        # Near-duplicate checks against content history: 'flag' logs them, 'skip' stops the package
+        self.duplicate_action = os.getenv('DUPLICATE_ACTION', 'flag').lower()
+        self.duplicate_topic_threshold = float(os.getenv('DUPLICATE_TOPIC_THRESHOLD') or 0.7)
+        self.duplicate_content_threshold = float(os.getenv('DUPLICATE_CONTENT_THRESHOLD') or 0.5)
         
         # Retry settings
         self.max_retries = 3
@@ -76,6 +138,10 @@ class ContentFactoryOrchestrator:
                 if "503" in error_msg or "UNAVAILABLE" in error_msg or "429" in error_msg:
                     if attempt < self.max_retries - 1:
                         delay = self.retry_delay * (attempt + 1)
+                        self.metrics.increment_counter(metric_key('retries', status=error_status(e)))
+                        current_span = get_current_span()
+                        current_span.set_attribute('retry.attempts', attempt + 1)
+                        current_span.add_event('retry', {'attempt': attempt + 1, 'delay_seconds': delay, 'error': error_msg[:200]})
                         logger.warning(f"API overloaded, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})")
                         await asyncio.sleep(delay)
                         continue
@@ -89,9 +155,14 @@ class ContentFactoryOrchestrator:
         """Initialize all agents"""
         logger.info("Initializing agents...")
         
+        if os.getenv('LOOP_MONITOR', 'true').lower() not in ('0', 'false', 'no'):
+            self.loop_monitor.start()
+        
         self.research_agent = ResearchAgent(
             client=self.client,
-            model=self.primary_model
+            model=self.primary_model,
+            research_index=self.research_index,
+            prior_limit=int(os.getenv('RESEARCH_PRIOR_LIMIT', '8'))
         )
         
         self.blog_writer = BlogWriterAgent(
@@ -116,7 +187,8 @@ class ContentFactoryOrchestrator:
         
         self.editor = EditorAgent(
             client=self.client,
-            model=self.primary_model
+            model=self.primary_model,
+            executor=self.cpu
         )
         
         self.seo_agent = SEOAgent(
@@ -169,195 +241,289 @@ class ContentFactoryOrchestrator:
         self,
         topic: str,
         session_id: str,
-        platforms: List[str] = None
+        platforms: List[str] = None,
+        profile: Optional[bool] = None
     ) -> Dict:
         """
         Create content with retry logic and quality checks
+        
+        With `profile` (or PROFILE_PACKAGES / PROFILE_RATE) the package gets a
+        sampling CPU profile, plus an allocation snapshot with PROFILE_MEMORY,
+        summarized under result['profile']; save_outputs writes the flamegraph.
         """
+        self.metrics.adjust_gauge('packages_in_flight', 1)
+        status = 'failed'
+        package_profile = None
+        if should_profile(profile):
+            package_profile = PackageProfile(
+                session_id,
+                memory=os.getenv('PROFILE_MEMORY', '').lower() in ('1', 'true', 'yes')
+            )
+        if package_profile is not None:
+            package_profile.start()
+        
+        try:
+            with log_context(session_id=session_id), span('content_package', **{
+                'content_factory.session_id': session_id,
+                'content_factory.topic': topic,
+                'content_factory.platforms': ','.join(platforms or ['blog'])
+            }):
+                with self.metrics.scope(session_id) as package_metrics:
+                    result = await self._run_pipeline(topic, session_id, platforms, package_metrics)
+            status = 'complete'
+            if package_profile is not None:
+                package_profile.stop()
+                # Callers serialize the result, so it carries the summary; save_outputs writes the flamegraph
+                result['profile'] = package_profile.summary()
+                self._profiles[session_id] = package_profile
+                while len(self._profiles) > self.MAX_KEPT_PROFILES:
+                    self._profiles.popitem(last=False)
+            return result
+        finally:
+            if package_profile is not None:
+                package_profile.stop()
+            self.metrics.adjust_gauge('packages_in_flight', -1)
+            self.metrics.increment_counter(metric_key('packages', status=status))
+    
+    def _check_duplicates(self, stage: str, topic: Optional[str] = None,
+                          content: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Near duplicates of this topic or draft in content history, flagged or raised per DUPLICATE_ACTION"""
+        found = self.memory_bank.find_near_duplicates(
+            'content_history', topic=topic, content=content,
+            topic_threshold=self.duplicate_topic_threshold,
+            content_threshold=self.duplicate_content_threshold
+        )
+        duplicates = found['topic'] + found['content']
+        if duplicates:
+            self.metrics.increment_counter(metric_key('near_duplicates', stage=stage))
+            best = duplicates[0]
+            message = (f"Near duplicate at {stage}: '{best['topic']}' ({best['timestamp']}), "
+                       f"similarity {best['similarity']}")
+            if self.duplicate_action == 'skip':
+                raise DuplicateContentError(message)
+            logger.warning(message)
+        return duplicates
+    
+    @asynccontextmanager
+    async def _stage(self, name: str):
+        """Time and trace one pipeline stage"""
+        with stage_span(name):
+            async with self.metrics.timer(name):
+                yield
+    
+    async def _run_pipeline(
+        self,
+        topic: str,
+        session_id: str,
+        platforms: Optional[List[str]],
+        package_metrics: MetricsCollector
+    ) -> Dict:
+        """Run every stage for one package inside its metrics scope"""
         
         start_time = datetime.now()
-        session = self.session_service.create_session(session_id)
-        session.set('topic', topic)
-        session.set('start_time', start_time)
+        session = await self._session_call(self.session_service.create_session, session_id)
+        await self._session_call(session.set, 'topic', topic)
+        await self._session_call(session.set, 'start_time', start_time)
+        await self._session_call(session.set, 'platforms', platforms or ['blog'])
+        await self._session_call(session.set, 'stage', 'research')
         
         logger.info(f"Starting content package creation for: {topic}")
         
         brand_voice = self.memory_bank.get('brand_voice')
         
         try:
+            # Cheap local check before paying for research
+            duplicates = self._check_duplicates('topic', topic=topic)
+            
             # STEP 1: RESEARCH with retry
             logger.info("Step 1: Research Agent working...")
-            self.metrics.start_timer('research')
-            
-            research_result = await self._retry_with_backoff(
-                self.research_agent.research,
-                topic=topic,
-                session_id=session_id
-            )
-            
-            self.metrics.stop_timer('research')
+            async with self._stage('research'):
+                research_result = await self._retry_with_backoff(
+                    self.research_agent.research,
+                    topic=topic,
+                    session_id=session_id
+                )
             research_brief = research_result['brief']
             sources = research_result.get('sources', [])
             
-            session.set('research_brief', research_brief)
-            session.set('sources', sources)
+            await self._session_call(session.set, 'research_brief', research_brief)
+            await self._session_call(session.set, 'sources', sources)
             
             logger.info(f"Research complete: {len(sources)} sources found")
             
             # Add delay to avoid rate limiting
-            await asyncio.sleep(2)
+            await asyncio.sleep(self.step_delay)
             
             # STEP 2: CONTENT CREATION
             logger.info("Step 2: Creating content...")
-            self.metrics.start_timer('content_creation')
-            
-            if platforms is None:
-                platforms = ['blog']
-            
-            content = {}
+            await self._session_call(session.set, 'stage', 'content_creation')
+            async with self._stage('content_creation'):
+                if platforms is None:
+                    platforms = ['blog']
+                
+                content = {}
+                
+                # Create blog with retry
+                if 'blog' in platforms:
+                    logger.info("Creating blog post...")
+                    content['blog'] = await self._retry_with_backoff(
+                        self._create_blog,
+                        research_brief, brand_voice, session_id
+                    )
+                    await asyncio.sleep(self.step_delay)
+                
+                # Create other platforms with retry (sequential to avoid overload)
+                if 'linkedin' in platforms:
+                    logger.info("Creating LinkedIn posts...")
+                    try:
+                        content['linkedin'] = await self._retry_with_backoff(
+                            self._create_linkedin,
+                            research_brief, brand_voice, session_id
+                        )
+                        await asyncio.sleep(self.step_delay)
+                    except Exception as e:
+                        logger.error(f"LinkedIn creation failed: {str(e)}")
+                        content['linkedin'] = "Error: Could not generate LinkedIn content"
+                
+                if 'twitter' in platforms:
+                    logger.info("Creating Twitter threads...")
+                    try:
+                        content['twitter'] = await self._retry_with_backoff(
+                            self._create_twitter,
+                            research_brief, brand_voice, session_id
+                        )
+                        await asyncio.sleep(self.step_delay)
+                    except Exception as e:
+                        logger.error(f"Twitter creation failed: {str(e)}")
+                        content['twitter'] = "Error: Could not generate Twitter content"
+                
+                if 'email' in platforms:
+                    logger.info("Creating email newsletter...")
+                    try:
+                        content['email'] = await self._retry_with_backoff(
+                            self._create_email,
+                            research_brief, brand_voice, session_id
+                        )
+                        await asyncio.sleep(self.step_delay)
+                    except Exception as e:
+                        logger.error(f"Email creation failed: {str(e)}")
+                        content['email'] = "Error: Could not generate email content"
+                
+                if 'youtube' in platforms:
+                    logger.info("Creating video script...")
+                    try:
+                        content['youtube'] = await self._retry_with_backoff(
+                            self._create_video_script,
+                            research_brief, brand_voice, session_id
+                        )
+                        await asyncio.sleep(self.step_delay)
+                    except Exception as e:
+                        logger.error(f"Video script creation failed: {str(e)}")
+                        content['youtube'] = "Error: Could not generate video script"
+            logger.info(f"Content created for {len(content)} platforms")
             
-            # Create blog with retry
-            if 'blog' in platforms:
-                logger.info("Creating blog post...")
-                content['blog'] = await self._retry_with_backoff(
-                    self._create_blog,
-                    research_brief, brand_voice, session_id
-                )
-                await asyncio.sleep(2)
+            # Drafts that repeat earlier output are caught before fact-checking, editing and SEO
+            duplicates += self._check_duplicates('content', content=content)
             
-            # Create other platforms with retry (sequential to avoid overload)
-            if 'linkedin' in platforms:
-                logger.info("Creating LinkedIn posts...")
+            # STEP 3: FACT-CHECKING
+            logger.info("Step 3: Fact-Checker Agent verifying...")
+            await self._session_call(session.set, 'stage', 'fact_checking')
+            async with self._stage('fact_checking'):
+                blog_content = content.get('blog', '')
+                
                 try:
-                    content['linkedin'] = await self._retry_with_backoff(
-                        self._create_linkedin,
-                        research_brief, brand_voice, session_id
+                    verification_result = await self._retry_with_backoff(
+                        self.fact_checker.verify,
+                        content=blog_content,
+                        session_id=session_id
                     )
-                    await asyncio.sleep(2)
+                    
+                    verification_report = verification_result['report']
+                    confidence_score = verification_result.get('confidence', 75)
+                    flagged_claims = verification_result.get('flagged_claims', 0)
+                    
+                    logger.info(f"Fact-checking complete: {confidence_score}% confidence")
+                    
+                    if flagged_claims:
+                        logger.warning(f"Warning: {flagged_claims} claims flagged for review")
                 except Exception as e:
-                    logger.error(f"LinkedIn creation failed: {str(e)}")
-                    content['linkedin'] = "Error: Could not generate LinkedIn content"
+                    logger.error(f"Fact-checking failed: {str(e)}")
+                    verification_report = "Fact-checking unavailable"
+                    confidence_score = 0
+                    flagged_claims = 0
+            await asyncio.sleep(self.step_delay)
             
-            if 'twitter' in platforms:
-                logger.info("Creating Twitter threads...")
+            # STEP 4: EDITING
+            logger.info("Step 4: Editor Agent polishing...")
+            await self._session_call(session.set, 'stage', 'editing')
+            async with self._stage('editing'):
                 try:
-                    content['twitter'] = await self._retry_with_backoff(
-                        self._create_twitter,
-                        research_brief, brand_voice, session_id
+                    edited_blog = await self._retry_with_backoff(
+                        self.editor.edit,
+                        content=blog_content,
+                        brand_voice=brand_voice,
+                        session_id=session_id
                     )
-                    await asyncio.sleep(2)
+                    
+                    content['blog'] = edited_blog['content']
+                    readability_score = edited_blog['readability_score']
+                    
+                    logger.info(f"Editing complete: Readability score {readability_score}/100")
                 except Exception as e:
-                    logger.error(f"Twitter creation failed: {str(e)}")
-                    content['twitter'] = "Error: Could not generate Twitter content"
+                    logger.error(f"Editing failed: {str(e)}")
+                    readability_score = 75
+            await asyncio.sleep(self.step_delay)
             
-            if 'email' in platforms:
-                logger.info("Creating email newsletter...")
+            # STEP 5: SEO OPTIMIZATION
+            logger.info("Step 5: SEO Agent optimizing...")
+            await self._session_call(session.set, 'stage', 'seo')
+            async with self._stage('seo'):
                 try:
-                    content['email'] = await self._retry_with_backoff(
-                        self._create_email,
-                        research_brief, brand_voice, session_id
+                    seo_result = await self._retry_with_backoff(
+                        self.seo_agent.optimize,
+                        content=content['blog'],
+                        topic=topic,
+                        session_id=session_id
                     )
-                    await asyncio.sleep(2)
+                    
+                    content['blog'] = seo_result['optimized_content']
+                    seo_score = seo_result['seo_score']
+                    keywords = seo_result.get('keywords', {})
+                    meta_description = seo_result.get('meta_description', '')
+                    title_suggestion = seo_result.get('title_suggestion')
+                    
+                    logger.info(f"SEO optimization complete: Score {seo_score}/100")
                 except Exception as e:
-                    logger.error(f"Email creation failed: {str(e)}")
-                    content['email'] = "Error: Could not generate email content"
-            
-            if 'youtube' in platforms:
-                logger.info("Creating video script...")
+                    logger.error(f"SEO optimization failed: {str(e)}")
+                    seo_score = 75
+                    keywords = {'primary': topic, 'secondary': []}
+                    meta_description = f"Learn about {topic}"
+                    title_suggestion = None
+            
+            # Score the finished package in one offloaded call, so its text is shipped once
+            async with self._stage('quality'):
                 try:
-                    content['youtube'] = await self._retry_with_backoff(
-                        self._create_video_script,
-                        research_brief, brand_voice, session_id
+                    quality = await self.cpu.run(
+                        score_content_package,
+                        content,
+                        keywords.get('primary') or topic,
+                        keywords.get('secondary') or [],
+                        title_suggestion,
+                        meta_description,
+                        brand_voice
                     )
-                    await asyncio.sleep(2)
+                    if not quality['voice_ok']:
+                        logger.warning(
+                            f"Brand voice match below threshold: {quality['voice_score']} "
+                            f"(best other voice {quality['competing_voice_score']})"
+                        )
                 except Exception as e:
-                    logger.error(f"Video script creation failed: {str(e)}")
-                    content['youtube'] = "Error: Could not generate video script"
-            
-            self.metrics.stop_timer('content_creation')
-            logger.info(f"Content created for {len(content)} platforms")
-            
-            # STEP 3: FACT-CHECKING
-            logger.info("Step 3: Fact-Checker Agent verifying...")
-            self.metrics.start_timer('fact_checking')
-            
-            blog_content = content.get('blog', '')
-            
-            try:
-                verification_result = await self._retry_with_backoff(
-                    self.fact_checker.verify,
-                    content=blog_content,
-                    session_id=session_id
-                )
-                
-                verification_report = verification_result['report']
-                confidence_score = verification_result.get('confidence', 75)
-                flagged_claims = verification_result.get('flagged_claims', 0)
-                
-                logger.info(f"Fact-checking complete: {confidence_score}% confidence")
-                
-                if flagged_claims:
-                    logger.warning(f"Warning: {flagged_claims} claims flagged for review")
-            except Exception as e:
-                logger.error(f"Fact-checking failed: {str(e)}")
-                verification_report = "Fact-checking unavailable"
-                confidence_score = 0
-                flagged_claims = 0
-            
-            self.metrics.stop_timer('fact_checking')
-            await asyncio.sleep(2)
-            
-            # STEP 4: EDITING
-            logger.info("Step 4: Editor Agent polishing...")
-            self.metrics.start_timer('editing')
-            
-            try:
-                edited_blog = await self._retry_with_backoff(
-                    self.editor.edit,
-                    content=blog_content,
-                    brand_voice=brand_voice,
-                    session_id=session_id
-                )
-                
-                content['blog'] = edited_blog['content']
-                readability_score = edited_blog['readability_score']
-                
-                logger.info(f"Editing complete: Readability score {readability_score}/100")
-            except Exception as e:
-                logger.error(f"Editing failed: {str(e)}")
-                readability_score = 75
-            
-            self.metrics.stop_timer('editing')
-            await asyncio.sleep(2)
-            
-            # STEP 5: SEO OPTIMIZATION
-            logger.info("Step 5: SEO Agent optimizing...")
-            self.metrics.start_timer('seo')
-            
-            try:
-                seo_result = await self._retry_with_backoff(
-                    self.seo_agent.optimize,
-                    content=content['blog'],
-                    topic=topic,
-                    session_id=session_id
-                )
-                
-                content['blog'] = seo_result['optimized_content']
-                seo_score = seo_result['seo_score']
-                keywords = seo_result.get('keywords', {})
-                meta_description = seo_result.get('meta_description', '')
-                
-                logger.info(f"SEO optimization complete: Score {seo_score}/100")
-            except Exception as e:
-                logger.error(f"SEO optimization failed: {str(e)}")
-                seo_score = 75
-                keywords = {'primary': topic, 'secondary': []}
-                meta_description = f"Learn about {topic}"
-            
-            self.metrics.stop_timer('seo')
+                    logger.error(f"Quality scoring failed: {str(e)}")
+                    quality = {}
             
             # STEP 6: ANALYTICS
             logger.info("Step 6: Analytics Agent learning...")
+            await self._session_call(session.set, 'stage', 'analytics')
             
             content_package = {
                 'topic': topic,
@@ -366,15 +532,18 @@ class ContentFactoryOrchestrator:
                 'metrics': {
                     'confidence': confidence_score,
                     'readability': readability_score,
-                    'seo_score': seo_score
+                    'seo_score': seo_score,
+                    'blog_word_count': len(content.get('blog', '').split())
                 },
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.memory_bank.append_to_history('content_history', content_package)
+            # The history file is re-serialized on every append
+            await self.cpu.run_light(self.memory_bank.append_to_history, 'content_history', content_package)
             
             try:
-                learned_insights = await self.analytics.analyze_and_learn(session_id=session_id)
+                with stage_span('analytics'):
+                    learned_insights = await self.analytics.analyze_and_learn(session_id=session_id)
                 logger.info(f"Analytics complete: {len(learned_insights.get('patterns', []))} patterns identified")
             except Exception as e:
                 logger.error(f"Analytics failed: {str(e)}")
@@ -395,7 +564,10 @@ class ContentFactoryOrchestrator:
                 'sources_used': len(sources),
                 'flagged_claims': flagged_claims,
                 'keywords': keywords,
-                'timings': self.metrics.get_all_timings()
+                'quality': quality,
+                'near_duplicates': duplicates,
+                'timings': package_metrics.get_all_timings(),
+                'event_loop': self.loop_monitor.get_stats()
             }
             
             result = {
@@ -411,15 +583,25 @@ class ContentFactoryOrchestrator:
             }
             
             logger.info(f"Content package complete in {duration:.2f} seconds")
+            await self._session_call(session.set, 'stage', 'complete')
             
             return result
             
         except Exception as e:
             logger.error(f"Error in content creation pipeline: {str(e)}", exc_info=True)
+            await self._session_call(session.set, 'stage', 'failed')
             raise
         
         finally:
-            self.session_service.end_session(session_id)
+            # Durable sessions stay readable by other processes until their TTL
+            if not self.session_service.durable:
+                self.session_service.end_session(session_id)
+    
+    async def _session_call(self, func, *args):
+        """Run a session call, off the event loop when the backend may wait on other processes' locks"""
+        if self.session_service.durable:
+            return await self.cpu.run_light(func, *args)
+        return func(*args)
     
     async def _create_blog(self, research: str, brand_voice: dict, session_id: str) -> str:
         """Create blog post"""
@@ -498,9 +680,21 @@ class ContentFactoryOrchestrator:
         with open(f'{output_dir}/metrics_{clean_topic}_{timestamp}.json', 'w', encoding='utf-8') as f:
             json.dump(result['metrics'], f, indent=2)
         
+        profile = self._profiles.pop(result['profile']['label'], None) if result.get('profile') else None
+        if profile is not None:
+            profile.write(output_dir, f'profile_{clean_topic}_{timestamp}')
+        
         logger.info(f"All outputs saved to {output_dir}/")
     
     async def cleanup(self):
         """Cleanup resources"""
         logger.info("Cleaning up resources...")
+        self.metrics_exporter.stop()
+        self.loop_monitor.stop()
+        self.cpu.shutdown()
+        if self.session_service.durable:
+            # Closes the connections of every thread that used the database
+            self.session_service.close()
+        else:
+            self.session_service.stop_sweeper()
         logger.info("Cleanup complete")
\ No newline at end of file
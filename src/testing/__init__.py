@@ -0,0 +1,16 @@
+"""
+Content Factory AI - Offline test doubles
+"""
+
+from .cassette import Cassette, CassetteMiss, RecordingClient, ReplayClient
+from .fake_client import FakeGeminiClient, FakeRequest, LatencyProfile
+
+__all__ = [
+    'Cassette',
+    'CassetteMiss',
+    'FakeGeminiClient',
+    'FakeRequest',
+    'LatencyProfile',
+    'RecordingClient',
+    'ReplayClient',
+]
\ No newline at end of file
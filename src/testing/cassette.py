@@ -0,0 +1,424 @@
+"""
+Cassette - Record model calls from a real run and replay them offline
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict, deque
+from datetime import datetime
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from google.genai import errors, types
+
+from utils.tracing import get_current_stage
+
+from .fake_client import FakeCall, detect_agent, request_text
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed request has no recorded response"""
+
+
+def prompt_hash(system_instruction: str, prompt: str) -> str:
+    """Stable hash of a request, insensitive to whitespace differences"""
+    normalized = re.sub(r'\s+', ' ', f'{system_instruction}\x00{prompt}').strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def _request_key(contents: Any, config: Any) -> Dict:
+    """Stage, agent, prompt hash and size identifying one request"""
+    prompt = request_text(contents)
+    system_instruction = request_text(getattr(config, 'system_instruction', None))
+    agent = detect_agent(system_instruction, prompt)
+    return {
+        'stage': get_current_stage() or agent,
+        'agent': agent,
+        'prompt_hash': prompt_hash(system_instruction, prompt),
+        'prompt_chars': len(prompt) + len(system_instruction)
+    }
+
+
+def _response_text(response: Any) -> str:
+    """Text parts of a response, without the SDK's non-text warnings"""
+    candidates = getattr(response, 'candidates', None) or []
+    content = getattr(candidates[0], 'content', None) if candidates else None
+    parts = getattr(content, 'parts', None) or []
+    return ''.join(part.text for part in parts if getattr(part, 'text', None))
+
+
+def _usage(response: Any) -> Dict:
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return {}
+    return {
+        'prompt': usage.prompt_token_count,
+        'candidates': usage.candidates_token_count,
+        'cached': usage.cached_content_token_count,
+        'total': usage.total_token_count
+    }
+
+
+def _finish_reason(response: Any) -> Optional[str]:
+    candidates = getattr(response, 'candidates', None) or []
+    reason = getattr(candidates[0], 'finish_reason', None) if candidates else None
+    return getattr(reason, 'name', reason)
+
+
+class Cassette:
+    """Recorded model calls, stored as (optionally gzipped) JSON
+
+    Each entry holds the stage, agent and prompt hash of a request plus
+    what came back: text (or stream chunks), token usage, finish reason
+    and latency, or the API error's code and body.
+    """
+    
+    def __init__(self, entries: Optional[List[Dict]] = None, meta: Optional[Dict] = None):
+        self.entries: List[Dict] = entries or []
+        self.meta = meta or {'version': CASSETTE_VERSION, 'recorded_at': datetime.now().isoformat()}
+        self._lock = threading.Lock()
+    
+    def add(self, entry: Dict):
+        """Append one recorded call"""
+        with self._lock:
+            entry['index'] = len(self.entries)
+            self.entries.append(entry)
+    
+    def save(self, path: str):
+        """Write the cassette; a `.gz` suffix compresses it"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with self._lock:
+            payload = json.dumps({'meta': self.meta, 'entries': self.entries}, separators=(',', ':'))
+        
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            f.write(payload)
+    
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        """Read a cassette written by `save`"""
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(entries=data.get('entries', []), meta=data.get('meta'))
+    
+    def summary(self) -> Dict:
+        """Calls, errors and recorded latency per stage"""
+        stages: Dict[str, Dict] = defaultdict(lambda: {'calls': 0, 'errors': 0, 'latency_seconds': 0.0})
+        for entry in self.entries:
+            stage = stages[entry['stage']]
+            stage['calls'] += 1
+            stage['errors'] += entry['status'] != 'ok'
+            stage['latency_seconds'] = round(stage['latency_seconds'] + entry['latency'], 3)
+        return dict(stages)
+
+
+class _Recorder:
+    """Times one call and turns its outcome into a cassette entry"""
+    
+    def __init__(self, cassette: Cassette, model: str, contents: Any, config: Any, stream: bool = False):
+        self.cassette = cassette
+        self.entry = {'model': model, 'stream': stream, **_request_key(contents, config)}
+        self.started = time.perf_counter()
+        self.chunks: List[str] = []
+        self.first_chunk_latency: Optional[float] = None
+        self.last_response: Any = None
+    
+    @contextlib.contextmanager
+    def capture_errors(self):
+        """Record API errors (then re-raise them)"""
+        try:
+            yield
+        except errors.APIError as e:
+            self.entry.update(status=e.code, error=e.details)
+            self._add()
+            raise
+    
+    def chunk(self, response: Any):
+        if self.first_chunk_latency is None:
+            self.first_chunk_latency = round(time.perf_counter() - self.started, 4)
+        self.chunks.append(_response_text(response))
+        self.last_response = response
+    
+    def done(self, response: Any = None):
+        response = response if response is not None else self.last_response
+        self.entry.update(
+            status='ok',
+            usage=_usage(response),
+            finish_reason=_finish_reason(response)
+        )
+        if self.entry['stream']:
+            self.entry.update(chunks=self.chunks, first_chunk_latency=self.first_chunk_latency)
+        else:
+            self.entry['text'] = _response_text(response)
+        self._add()
+    
+    def _add(self):
+        self.entry['latency'] = round(time.perf_counter() - self.started, 4)
+        self.cassette.add(self.entry)
+
+
+class _RecordingModels:
+    """`client.models` proxy that records every generate call"""
+    
+    def __init__(self, models: Any, cassette: Cassette):
+        self._models = models
+        self._cassette = cassette
+    
+    def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        recorder = _Recorder(self._cassette, model, contents, config)
+        with recorder.capture_errors():
+            response = self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+        recorder.done(response)
+        return response
+    
+    def generate_content_stream(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        recorder = _Recorder(self._cassette, model, contents, config, stream=True)
+        with recorder.capture_errors():
+            for chunk in self._models.generate_content_stream(model=model, contents=contents, config=config, **kwargs):
+                recorder.chunk(chunk)
+                yield chunk
+        recorder.done()
+    
+    def __getattr__(self, name: str):
+        return getattr(self._models, name)
+
+
+class _AsyncRecordingModels(_RecordingModels):
+    """`client.aio.models` proxy that records every generate call"""
+    
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        recorder = _Recorder(self._cassette, model, contents, config)
+        with recorder.capture_errors():
+            response = await self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+        recorder.done(response)
+        return response
+    
+    async def generate_content_stream(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        recorder = _Recorder(self._cassette, model, contents, config, stream=True)
+        with recorder.capture_errors():
+            stream = await self._models.generate_content_stream(model=model, contents=contents, config=config, **kwargs)
+        
+        async def record():
+            with recorder.capture_errors():
+                async for chunk in stream:
+                    recorder.chunk(chunk)
+                    yield chunk
+            recorder.done()
+        return record()
+
+
+class _RecordingAio:
+    def __init__(self, aio: Any, cassette: Cassette):
+        self._aio = aio
+        self.models = _AsyncRecordingModels(aio.models, cassette)
+    
+    def __getattr__(self, name: str):
+        return getattr(self._aio, name)
+
+
+class RecordingClient:
+    """Wraps a genai.Client and records every model call into a cassette
+
+    Everything else is delegated to the wrapped client. Call `save` at
+    the end of the run to write the cassette.
+    """
+    
+    def __init__(self, client: Any, cassette: Optional[Cassette] = None):
+        self._client = client
+        self.cassette = cassette or Cassette()
+        self.models = _RecordingModels(client.models, self.cassette)
+        self._aio: Optional[_RecordingAio] = None
+    
+    @property
+    def aio(self) -> _RecordingAio:
+        if self._aio is None:
+            self._aio = _RecordingAio(self._client.aio, self.cassette)
+        return self._aio
+    
+    def save(self, path: str):
+        """Write the recorded calls to `path`"""
+        self.cassette.save(path)
+    
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+class _ReplayModels:
+    """`client.models` surface served from a cassette"""
+    
+    def __init__(self, client: 'ReplayClient'):
+        self._client = client
+    
+    def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        entry = self._client._next(contents, config, stream=False)
+        time.sleep(self._client._latency(entry))
+        return self._client._finish(entry)
+    
+    def generate_content_stream(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        entry = self._client._next(contents, config, stream=True)
+        for delay, chunk in self._client._chunks(entry):
+            time.sleep(delay)
+            yield chunk
+
+
+class _AsyncReplayModels:
+    """`client.aio.models` surface served from a cassette"""
+    
+    def __init__(self, client: 'ReplayClient'):
+        self._client = client
+    
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        entry = self._client._next(contents, config, stream=False)
+        await asyncio.sleep(self._client._latency(entry))
+        return self._client._finish(entry)
+    
+    async def generate_content_stream(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        chunks = self._client._chunks(self._client._next(contents, config, stream=True))
+        
+        async def stream():
+            for delay, chunk in chunks:
+                await asyncio.sleep(delay)
+                yield chunk
+        return stream()
+
+
+class _ReplayAio:
+    def __init__(self, client: 'ReplayClient'):
+        self.models = _AsyncReplayModels(client)
+
+
+class ReplayClient:
+    """Drop-in replacement for genai.Client that serves a recorded cassette
+
+    Requests are matched on (stage, agent, prompt hash); repeated
+    identical requests get their recordings in order, so a recorded 429
+    followed by a successful retry replays the same way. When a prompt
+    has changed (new memory context, different topic) the next recording
+    for the same stage and agent is used instead, unless `strict`.
+    With `replay_latency` each call sleeps for its recorded latency
+    times `time_scale`.
+    """
+    
+    def __init__(self, cassette: Cassette, replay_latency: bool = False,
+                 time_scale: float = 1.0, strict: bool = False):
+        self.cassette = cassette
+        self.replay_latency = replay_latency
+        self.time_scale = time_scale
+        self.strict = strict
+        self.stats = {'exact': 0, 'fallback': 0}
+        self.calls: List[FakeCall] = []
+        self._lock = threading.Lock()
+        self._exact: Dict[Tuple, deque] = defaultdict(deque)
+        self._by_stage: Dict[Tuple, List[Dict]] = defaultdict(list)
+        self._cursor: Dict[Tuple, int] = defaultdict(int)
+        
+        for entry in cassette.entries:
+            stage = (entry['stage'], entry['agent'], entry['stream'])
+            self._exact[stage + (entry['prompt_hash'],)].append(entry)
+            self._by_stage[stage].append(entry)
+        
+        self.models = _ReplayModels(self)
+        self.aio = _ReplayAio(self)
+    
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'ReplayClient':
+        """Replay client for a cassette file"""
+        return cls(Cassette.load(path), **kwargs)
+    
+    def _next(self, contents: Any, config: Any, stream: bool) -> Dict:
+        """Recorded entry for this request"""
+        key = _request_key(contents, config)
+        stage = (key['stage'], key['agent'], stream)
+        
+        with self._lock:
+            queue = self._exact.get(stage + (key['prompt_hash'],))
+            if queue:
+                self.stats['exact'] += 1
+                # Keep the last recording so extra identical calls still get an answer
+                entry = queue.popleft() if len(queue) > 1 else queue[0]
+            else:
+                recorded = self._by_stage.get(stage)
+                if self.strict or not recorded:
+                    raise CassetteMiss(
+                        f"No recording for stage={key['stage']} agent={key['agent']} "
+                        f"prompt_hash={key['prompt_hash']} stream={stream}"
+                    )
+                
+                self.stats['fallback'] += 1
+                entry = recorded[self._cursor[stage] % len(recorded)]
+                self._cursor[stage] += 1
+            
+            self.calls.append(FakeCall(
+                agent=entry['agent'],
+                model=entry['model'],
+                status=str(entry['status']),
+                latency=self._latency(entry),
+                prompt_chars=key['prompt_chars'],
+                response_chars=len(entry.get('text') or ''.join(entry.get('chunks', []))),
+                truncated=entry.get('finish_reason') == 'MAX_TOKENS',
+                stream=stream
+            ))
+        return entry
+    
+    def _latency(self, entry: Dict) -> float:
+        return entry['latency'] * self.time_scale if self.replay_latency else 0.0
+    
+    def _error(self, entry: Dict) -> errors.APIError:
+        error_class = errors.ClientError if entry['status'] < 500 else errors.ServerError
+        return error_class(entry['status'], entry.get('error') or {})
+    
+    def _response(self, entry: Dict, text: str, final: bool = True) -> types.GenerateContentResponse:
+        usage = entry.get('usage') or {}
+        finish_reason = None
+        if final and entry.get('finish_reason'):
+            finish_reason = types.FinishReason[entry['finish_reason']]
+        
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role='model', parts=[types.Part(text=text)]),
+                finish_reason=finish_reason
+            )],
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=usage.get('prompt'),
+                candidates_token_count=usage.get('candidates'),
+                total_token_count=usage.get('total'),
+                cached_content_token_count=usage.get('cached')
+            ),
+            model_version=entry['model']
+        )
+    
+    def _finish(self, entry: Dict) -> types.GenerateContentResponse:
+        if entry['status'] != 'ok':
+            raise self._error(entry)
+        text = entry['text'] if 'text' in entry else ''.join(entry.get('chunks', []))
+        return self._response(entry, text)
+    
+    def _chunks(self, entry: Dict) -> List:
+        """(delay, chunk) pairs reproducing the recorded stream timing"""
+        if entry['status'] != 'ok':
+            raise self._error(entry)
+        
+        pieces = entry.get('chunks') or [entry.get('text', '')]
+        total = self._latency(entry)
+        if len(pieces) > 1:
+            first = min(total, (entry.get('first_chunk_latency') or 0.0) * self.time_scale)
+            rest = (total - first) / (len(pieces) - 1)
+        else:
+            first, rest = total, 0.0
+        
+        return [
+            (first if i == 0 else rest, self._response(entry, piece, final=i == len(pieces) - 1))
+            for i, piece in enumerate(pieces)
+        ]
\ No newline at end of file
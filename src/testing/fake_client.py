@@ -0,0 +1,435 @@
+"""
+Fake Gemini Client - Offline, deterministic stand-in for genai.Client
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Union
+from dataclasses import dataclass, field
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+
+from google.genai import errors, types
+
+# First line of each agent's system instruction -> agent name
+AGENT_MARKERS = (
+    ('EXPERT RESEARCHER', 'research'),
+    ('professional writer', 'blog'),
+    ('Content Editor', 'editor'),
+    ('Fact-Checker', 'fact_checker'),
+    ('SEO Specialist', 'seo'),
+    ('Data Analyst', 'analytics'),
+    ('Email Marketing', 'email'),
+    ('LinkedIn', 'linkedin'),
+    ('Twitter', 'twitter'),
+    ('Instagram', 'instagram'),
+    ('YouTube Script', 'video'),
+)
+
+FAULT_STATUSES = {
+    429: 'RESOURCE_EXHAUSTED',
+    500: 'INTERNAL',
+    503: 'UNAVAILABLE',
+}
+
+Responder = Union[str, Callable[['FakeRequest'], str]]
+
+
+class LatencyProfile:
+    """Lognormal latency described by its median and p99
+
+    `per_output_token` adds generation time proportional to response
+    length, so long blog posts are slower than short social posts.
+    """
+    
+    def __init__(self, median: float = 0.0, p99: Optional[float] = None, per_output_token: float = 0.0):
+        self.median = median
+        self.p99 = p99 if p99 is not None else median
+        self.per_output_token = per_output_token
+        ratio = self.p99 / self.median if self.median > 0 else 1.0
+        self._sigma = math.log(ratio) / 2.326 if ratio > 1 else 0.0
+    
+    def sample(self, rng: random.Random, output_tokens: int = 0) -> float:
+        """Draw one latency in seconds"""
+        base = 0.0
+        if self.median > 0:
+            base = self.median * math.exp(rng.gauss(0, 1) * self._sigma) if self._sigma else self.median
+        return base + self.per_output_token * output_tokens
+
+
+@dataclass
+class FakeRequest:
+    """What an agent sent to the fake client"""
+    
+    agent: str
+    model: str
+    prompt: str
+    system_instruction: str
+    
+    @property
+    def topic(self) -> str:
+        """Topic named in the prompt, when the agent includes one"""
+        match = re.search(r'(?:research on|Primary Keyword):\s*(.+)', self.prompt)
+        return match.group(1).strip() if match else 'the topic'
+    
+    def section(self, start: str, end: Optional[str] = None) -> str:
+        """Prompt text between two markers (used to echo content back)"""
+        if start not in self.prompt:
+            return ''
+        text = self.prompt.split(start, 1)[1]
+        if end and end in text:
+            text = text.split(end, 1)[0]
+        return text.strip()
+
+
+@dataclass
+class FakeCall:
+    """Record of one call made to the fake client"""
+    
+    agent: str
+    model: str
+    status: str
+    latency: float
+    prompt_chars: int
+    response_chars: int = 0
+    truncated: bool = False
+    stream: bool = False
+    started_at: float = field(default_factory=time.monotonic)
+
+
+def request_text(value: Any) -> str:
+    """Plain text of `contents` or a system instruction, whatever its SDK shape"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(request_text(item) for item in value)
+    text = getattr(value, 'text', None)
+    if isinstance(text, str):
+        return text
+    parts = getattr(value, 'parts', None)
+    if parts:
+        return '\n'.join(request_text(part) for part in parts)
+    return str(value)
+
+
+def detect_agent(system_instruction: str, prompt: str) -> str:
+    """Agent name recognised from the first line of its system instruction"""
+    header = system_instruction.split('\n', 1)[0] if system_instruction else prompt[:200]
+    for marker, agent in AGENT_MARKERS:
+        if marker in header:
+            return agent
+    return 'unknown'
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _paragraphs(topic: str, words: int) -> str:
+    """Deterministic filler prose of roughly `words` words"""
+    sentences = [
+        f"{topic} is changing how teams plan, build and measure their work.",
+        "Recent surveys show adoption rising by 35% year over year across mid-sized companies.",
+        "Practitioners report that the biggest gains come from small, well-scoped pilots.",
+        "Security and governance remain the most common blockers to wider rollout.",
+        "Teams that publish clear success metrics move from pilot to production twice as fast.",
+        "Costs fall sharply once workloads are batched and cached instead of run ad hoc.",
+    ]
+    out: List[str] = []
+    count = 0
+    section = 1
+    while count < words:
+        out.append(f"\n## Section {section}: What matters now\n")
+        for sentence in sentences:
+            out.append(sentence)
+            count += len(sentence.split())
+        section += 1
+    return ' '.join(out)
+
+
+def _default_research(request: FakeRequest) -> str:
+    topic = request.topic
+    return json.dumps({
+        'brief': f"Research brief on {topic}. " + _paragraphs(topic, 250),
+        'key_insights': [f"{topic} adoption grew 35% in the last year"],
+        'statistics': ["62% of teams run at least one production pilot (Industry Survey 2025)"],
+        'real_examples': ["A mid-sized retailer cut support costs by 20% after a six-week pilot"],
+        'sources': [
+            {'title': f'{topic} report', 'url': 'https://example.com/report', 'relevance': 'high'},
+            {'title': f'{topic} survey', 'url': 'https://example.com/survey', 'relevance': 'medium'}
+        ]
+    })
+
+
+def _default_blog(request: FakeRequest) -> str:
+    return f"# A Practical Guide\n\n{_paragraphs('This technology', 1800)}\n\n## Conclusion\n\nStart small and measure."
+
+
+def _default_editor(request: FakeRequest) -> str:
+    return request.section('Edit and improve the following content:', 'Brand Voice:') or _default_blog(request)
+
+
+def _default_fact_checker(request: FakeRequest) -> str:
+    return json.dumps({
+        'report': 'Verified 5 of 6 claims. One statistic lacks a primary source.',
+        'confidence': 88,
+        'total_claims': 6,
+        'verified_claims': 5,
+        'flagged_claims': 1,
+        'claims': []
+    })
+
+
+def _default_seo(request: FakeRequest) -> str:
+    topic = request.topic
+    return json.dumps({
+        'optimized_content': request.section('Content:', 'Tasks:'),
+        'seo_score': 86,
+        'keywords': {'primary': topic, 'secondary': [f'{topic} guide', f'{topic} examples']},
+        'meta_description': f'A practical guide to {topic}: what works, what to avoid and where to start.',
+        'title_suggestion': f'{topic}: A Practical Guide',
+        'improvements': ['Added keyword to H1', 'Shortened meta description']
+    })
+
+
+def _default_analytics(request: FakeRequest) -> str:
+    return json.dumps({
+        'patterns': ['Posts over 1500 words score higher on SEO'],
+        'insights': 'Longer, example-driven posts perform best.',
+        'recommendations': ['Keep including concrete examples']
+    })
+
+
+DEFAULT_RESPONDERS: Dict[str, Responder] = {
+    'research': _default_research,
+    'blog': _default_blog,
+    'editor': _default_editor,
+    'fact_checker': _default_fact_checker,
+    'seo': _default_seo,
+    'analytics': _default_analytics,
+    'email': "SUBJECT LINE: What changed this week\n\nPREVIEW TEXT: Three things worth knowing\n\n" + _paragraphs('This week', 300),
+    'linkedin': '\n\n'.join(f"POST {i}:\n{_paragraphs('The industry', 80)}" for i in range(1, 4)),
+    'twitter': '\n\n'.join(f"THREAD {i}:\n1/ {_paragraphs('Teams', 40)}" for i in range(1, 3)),
+    'instagram': "CAPTION 1:\nSmall pilots, big wins. #ai #productivity",
+    'video': "[HOOK]\nHere is what changed.\n\n[MAIN CONTENT]\n" + _paragraphs('This space', 400),
+    'unknown': 'Fake response.',
+}
+
+
+class _FakeModels:
+    """`client.models` surface"""
+    
+    def __init__(self, client: 'FakeGeminiClient'):
+        self._client = client
+    
+    def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        plan = self._client._plan(model, contents, config)
+        time.sleep(plan['latency'])
+        return self._client._finish(plan)
+    
+    def generate_content_stream(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        plan = self._client._plan(model, contents, config, stream=True)
+        chunks = self._client._chunks(plan)
+        for delay, chunk in chunks:
+            time.sleep(delay)
+            yield chunk
+
+
+class _FakeAsyncModels:
+    """`client.aio.models` surface"""
+    
+    def __init__(self, client: 'FakeGeminiClient'):
+        self._client = client
+    
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        plan = self._client._plan(model, contents, config)
+        await asyncio.sleep(plan['latency'])
+        return self._client._finish(plan)
+    
+    async def generate_content_stream(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        plan = self._client._plan(model, contents, config, stream=True)
+        chunks = self._client._chunks(plan)
+        
+        async def stream():
+            for delay, chunk in chunks:
+                await asyncio.sleep(delay)
+                yield chunk
+        return stream()
+
+
+class _FakeAio:
+    def __init__(self, client: 'FakeGeminiClient'):
+        self.models = _FakeAsyncModels(client)
+
+
+class FakeGeminiClient:
+    """Drop-in replacement for genai.Client that never touches the network
+
+    Responses come from per-agent templates (override with `responses`,
+    mapping agent name to a string or a callable taking a FakeRequest).
+    Agents are recognised by their system instruction. Latency, token
+    usage, 429/503 faults (with RetryInfo `retryDelay`) and truncated
+    MAX_TOKENS responses are all driven by a seeded RNG, so a run with the
+    same seed and call order is reproducible. `time_scale` multiplies
+    every sleep (0 for instant tests, 1 for realistic benchmarks).
+    """
+    
+    def __init__(self, responses: Optional[Dict[str, Responder]] = None,
+                 latency: Optional[Union[LatencyProfile, Dict[str, LatencyProfile]]] = None,
+                 rate_limit_rate: float = 0.0, unavailable_rate: float = 0.0,
+                 retry_delay: float = 1.0, truncation_rate: float = 0.0,
+                 cached_token_rate: float = 0.0, time_scale: float = 1.0,
+                 stream_chunk_chars: int = 400, seed: int = 0):
+        self.responses = {**DEFAULT_RESPONDERS, **(responses or {})}
+        self.latency = latency if latency is not None else LatencyProfile()
+        self.rate_limit_rate = rate_limit_rate
+        self.unavailable_rate = unavailable_rate
+        self.retry_delay = retry_delay
+        self.truncation_rate = truncation_rate
+        self.cached_token_rate = cached_token_rate
+        self.time_scale = time_scale
+        self.stream_chunk_chars = stream_chunk_chars
+        self.calls: List[FakeCall] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._scripted_faults: List[int] = []
+        self.models = _FakeModels(self)
+        self.aio = _FakeAio(self)
+    
+    @classmethod
+    def realistic(cls, seed: int = 0, time_scale: float = 1.0, **kwargs) -> 'FakeGeminiClient':
+        """Latency roughly like the hosted API: flash ~2s, pro ~8s, long tails"""
+        latency = {
+            'flash': LatencyProfile(median=1.5, p99=6.0, per_output_token=0.002),
+            'pro': LatencyProfile(median=5.0, p99=20.0, per_output_token=0.006),
+        }
+        return cls(latency=latency, seed=seed, time_scale=time_scale, **kwargs)
+    
+    def fail_next(self, status: int = 429, count: int = 1):
+        """Force the next `count` calls to fail with `status`"""
+        with self._lock:
+            self._scripted_faults.extend([status] * count)
+    
+    def calls_for(self, agent: str) -> List[FakeCall]:
+        """Recorded calls made by one agent"""
+        return [call for call in self.calls if call.agent == agent]
+    
+    def _latency_profile(self, model: str) -> LatencyProfile:
+        if isinstance(self.latency, LatencyProfile):
+            return self.latency
+        for marker, profile in self.latency.items():
+            if marker in model:
+                return profile
+        return self.latency.get('default', LatencyProfile())
+    
+    def _plan(self, model: str, contents: Any, config: Any, stream: bool = False) -> Dict:
+        """Decide response, latency and faults for one call (under the lock, for determinism)"""
+        prompt = request_text(contents)
+        system_instruction = request_text(getattr(config, 'system_instruction', None))
+        request = FakeRequest(detect_agent(system_instruction, prompt), model, prompt, system_instruction)
+        
+        with self._lock:
+            if self._scripted_faults:
+                fault = self._scripted_faults.pop(0)
+            else:
+                roll = self._rng.random()
+                if roll < self.rate_limit_rate:
+                    fault = 429
+                elif roll < self.rate_limit_rate + self.unavailable_rate:
+                    fault = 503
+                else:
+                    fault = None
+            truncated = fault is None and self._rng.random() < self.truncation_rate
+            cached = self._rng.random() < self.cached_token_rate
+            
+            text = ''
+            if fault is None:
+                responder = self.responses.get(request.agent, self.responses['unknown'])
+                text = responder(request) if callable(responder) else responder
+                if truncated:
+                    text = text[:max(1, len(text) // 3)]
+            
+            output_tokens = estimate_tokens(text)
+            latency = self._latency_profile(model).sample(self._rng, output_tokens) * self.time_scale
+            if fault is not None:
+                latency = min(latency, 0.05 * self.time_scale)
+            
+            call = FakeCall(
+                agent=request.agent,
+                model=model,
+                status=str(fault) if fault else 'ok',
+                latency=latency,
+                prompt_chars=len(prompt) + len(system_instruction),
+                response_chars=len(text),
+                truncated=truncated,
+                stream=stream
+            )
+            self.calls.append(call)
+        
+        return {
+            'request': request,
+            'fault': fault,
+            'text': text,
+            'truncated': truncated,
+            'cached': cached,
+            'latency': latency,
+            'input_tokens': estimate_tokens(prompt) + estimate_tokens(system_instruction)
+        }
+    
+    def _error(self, status: int) -> errors.APIError:
+        body = {'error': {'code': status, 'message': 'Injected fault', 'status': FAULT_STATUSES.get(status, 'UNKNOWN')}}
+        if status == 429:
+            body['error']['details'] = [{
+                '@type': 'type.googleapis.com/google.rpc.RetryInfo',
+                'retryDelay': f'{self.retry_delay:g}s'
+            }]
+        error_class = errors.ClientError if status < 500 else errors.ServerError
+        return error_class(status, body)
+    
+    def _response(self, plan: Dict, text: str, final: bool = True) -> types.GenerateContentResponse:
+        output_tokens = estimate_tokens(plan['text'])
+        cached_tokens = plan['input_tokens'] // 2 if plan['cached'] else None
+        finish_reason = None
+        if final:
+            finish_reason = types.FinishReason.MAX_TOKENS if plan['truncated'] else types.FinishReason.STOP
+        
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role='model', parts=[types.Part(text=text)]),
+                finish_reason=finish_reason
+            )],
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=plan['input_tokens'],
+                candidates_token_count=output_tokens,
+                total_token_count=plan['input_tokens'] + output_tokens,
+                cached_content_token_count=cached_tokens
+            ),
+            model_version=plan['request'].model
+        )
+    
+    def _finish(self, plan: Dict) -> types.GenerateContentResponse:
+        if plan['fault'] is not None:
+            raise self._error(plan['fault'])
+        return self._response(plan, plan['text'])
+    
+    def _chunks(self, plan: Dict) -> List:
+        """(delay, chunk) pairs for a streamed response; raises up front for faults"""
+        if plan['fault'] is not None:
+            raise self._error(plan['fault'])
+        
+        text = plan['text']
+        size = max(1, self.stream_chunk_chars)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+        first_delay = plan['latency'] * 0.3
+        rest_delay = (plan['latency'] - first_delay) / max(1, len(pieces) - 1) if len(pieces) > 1 else 0.0
+        
+        return [
+            (first_delay if i == 0 else rest_delay, self._response(plan, piece, final=i == len(pieces) - 1))
+            for i, piece in enumerate(pieces)
+        ]
\ No newline at end of file
@@ -6,10 +6,18 @@ from .web_search import WebSearchTool
 from .readability_scorer import ReadabilityScorer
 from .brand_voice_matcher import BrandVoiceMatcher
 from .seo_analyzer import SEOAnalyzer
+from .text_analysis import TextDocument, analyze_text
+from .keyword_matcher import KeywordMatcher
+from .voice_fingerprint import VoiceFingerprint, voice_fingerprint
 
 __all__ = [
     'WebSearchTool',
     'ReadabilityScorer',
     'BrandVoiceMatcher',
     'SEOAnalyzer',
+    'TextDocument',
+    'analyze_text',
+    'KeywordMatcher',
+    'VoiceFingerprint',
+    'voice_fingerprint',
 ]
\ No newline at end of file
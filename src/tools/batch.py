@@ -0,0 +1,37 @@
+"""
+Batch Scoring - Score many documents at once into columnar results
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+# Below this many documents a process pool costs more than it saves
+MIN_PARALLEL_BATCH = 64
+
+
+def _apply(func: Callable, args: Tuple) -> Any:
+    return func(*args)
+
+
+def map_documents(func: Callable, jobs: Sequence[Tuple], workers: Optional[int] = None,
+                  chunk_size: int = 16) -> List:
+    """`func(*job)` for every job, in order
+
+    With `workers` > 1 and a large enough batch the jobs are fanned out
+    over a process pool in chunks; `func` must then be a module-level
+    function or static method so it can be pickled.
+    """
+    if workers and workers > 1 and len(jobs) >= MIN_PARALLEL_BATCH:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(partial(_apply, func), jobs, chunksize=chunk_size))
+    return [func(*job) for job in jobs]
+
+
+def score_batch(func: Callable[..., Dict], jobs: Sequence[Tuple], workers: Optional[int] = None,
+                chunk_size: int = 16) -> pd.DataFrame:
+    """One row per job, with nested result dicts flattened into dotted columns"""
+    rows = map_documents(func, jobs, workers, chunk_size)
+    return pd.json_normalize(rows, sep='.') if rows else pd.DataFrame()
\ No newline at end of file
@@ -2,47 +2,90 @@
 Brand Voice Matcher - Analyzes and matches brand voice consistency
 """
 
-from typing import Dict, List
-import re
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .batch import score_batch
+from .text_analysis import TextDocument
+from .voice_fingerprint import voice_fingerprint
 
 
 class BrandVoiceMatcher:
     """Tool for analyzing brand voice consistency"""
     
+    TONE_INDICATORS = {
+        'professional': ['therefore', 'however', 'furthermore', 'additionally', 'consequently'],
+        'casual': ['hey', 'awesome', 'cool', 'basically', 'stuff', 'things'],
+        'friendly': ['you', 'your', 'we', 'our', 'together'],
+        'authoritative': ['research shows', 'studies indicate', 'evidence suggests', 'proven', 'demonstrated'],
+        'conversational': ['you know', "let's", "we'll", "you're", "it's"],
+        'aggressive': ['stop', 'the truth is', 'broken', 'fail', 'wrong', 'never'],
+        'analytical': ['data', 'analysis', 'according to', '%', 'measured', 'statistically'],
+        'narrative': ['what really happened', 'behind the scenes', 'told me', 'story', 'later', 'when'],
+        'practical': ['in practice', 'step', 'here is how', 'checklist', 'works', 'real-world']
+    }
+    
+    # Tone words used by the brand voices, mapped to the indicator list that detects them
+    TONE_ALIASES = {
+        'direct': 'aggressive', 'confrontational': 'aggressive', 'bold': 'aggressive', 'blunt': 'aggressive',
+        'warm': 'friendly', 'encouraging': 'friendly', 'approachable': 'friendly',
+        'objective': 'analytical', 'precise': 'analytical', 'data-driven': 'analytical',
+        'investigative': 'narrative', 'revealing': 'narrative',
+        'realistic': 'practical', 'experienced': 'practical',
+        'engaging': 'conversational', 'informal': 'casual', 'relaxed': 'casual',
+        'formal': 'professional', 'clear': 'professional'
+    }
+    
     @staticmethod
-    def analyze_tone(text: str, target_tone: str) -> Dict:
-        """Analyze if text matches target tone"""
-        text_lower = text.lower()
-        
-        tone_indicators = {
-            'professional': ['therefore', 'however', 'furthermore', 'additionally', 'consequently'],
-            'casual': ['hey', 'awesome', 'cool', 'basically', 'stuff', 'things'],
-            'friendly': ['you', 'your', 'we', 'our', 'together'],
-            'authoritative': ['research shows', 'studies indicate', 'evidence suggests', 'proven', 'demonstrated'],
-            'conversational': ['you know', "let's", "we'll", "you're", "it's"]
-        }
-        
-        target_indicators = tone_indicators.get(target_tone.lower(), [])
-        matches = sum(1 for indicator in target_indicators if indicator in text_lower)
-        
-        score = min(100, (matches / len(target_indicators) * 100)) if target_indicators else 50
+    def analyze_tone(text: Union[str, TextDocument], target_tone: str) -> Dict:
+        """Analyze if text matches target tone (one tone or a comma-separated list)"""
+        doc = TextDocument.of(text)
+        
+        tones = []
+        for tone in target_tone.lower().split(','):
+            tone = BrandVoiceMatcher.TONE_ALIASES.get(tone.strip(), tone.strip())
+            if tone in BrandVoiceMatcher.TONE_INDICATORS and tone not in tones:
+                tones.append(tone)
+        
+        # Each recognized tone is scored on its own indicators, then averaged
+        scores = []
+        matches = 0
+        indicators_checked = 0
+        for tone in tones:
+            indicators = BrandVoiceMatcher.TONE_INDICATORS[tone]
+            found = sum(1 for indicator in indicators if doc.contains(indicator))
+            scores.append(min(100, found / len(indicators) * 100))
+            matches += found
+            indicators_checked += len(indicators)
+        
+        score = sum(scores) / len(scores) if scores else 50
         
         return {
             'tone': target_tone,
+            'tones_checked': tones,
             'match_score': round(score, 2),
             'matches_found': matches,
-            'indicators_checked': len(target_indicators)
+            'indicators_checked': indicators_checked
         }
     
     @staticmethod
-    def check_avoided_words(text: str, avoid_list: List[str]) -> Dict:
+    def analyze_voice_fingerprint(text: Union[str, TextDocument], brand_voice: Dict) -> Optional[Dict]:
+        """Stylometric similarity to the voice's examples, phrases and rules (None if it has none)"""
+        fingerprint = voice_fingerprint(brand_voice)
+        if fingerprint is None:
+            return None
+        return fingerprint.score(TextDocument.of(text))
+    
+    @staticmethod
+    def check_avoided_words(text: Union[str, TextDocument], avoid_list: List[str]) -> Dict:
         """Check for words that should be avoided"""
-        text_lower = text.lower()
+        doc = TextDocument.of(text)
         found_words = []
         
         for word in avoid_list:
-            if word.lower() in text_lower:
-                count = text_lower.count(word.lower())
+            count = doc.count(word)
+            if count:
                 found_words.append({
                     'word': word,
                     'count': count
@@ -55,12 +98,10 @@ class BrandVoiceMatcher:
         }
     
     @staticmethod
-    def analyze_sentence_structure(text: str, preferences: Dict) -> Dict:
+    def analyze_sentence_structure(text: Union[str, TextDocument], preferences: Dict) -> Dict:
         """Analyze sentence structure against preferences"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        word_counts = [len(s.split()) for s in sentences]
+        doc = TextDocument.of(text)
+        word_counts = doc.sentence_lengths
         avg_words = sum(word_counts) / len(word_counts) if word_counts else 0
         
         target_length = preferences.get('sentence_length', 'medium')
@@ -79,12 +120,14 @@ class BrandVoiceMatcher:
             'avg_sentence_length': round(avg_words, 2),
             'target_range': target_range,
             'match_percentage': round(match_percentage, 2),
-            'total_sentences': len(sentences)
+            'total_sentences': len(word_counts)
         }
     
     @staticmethod
-    def calculate_overall_match(text: str, brand_voice: Dict) -> Dict:
+    def calculate_overall_match(text: Union[str, TextDocument], brand_voice: Dict) -> Dict:
         """Calculate overall brand voice match score"""
+        text = TextDocument.of(text)
+        
         tone_match = BrandVoiceMatcher.analyze_tone(
             text, 
             brand_voice.get('tone', 'professional')
@@ -100,16 +143,33 @@ class BrandVoiceMatcher:
             brand_voice.get('preferences', {})
         )
         
+        fingerprint = BrandVoiceMatcher.analyze_voice_fingerprint(text, brand_voice)
+        
         tone_score = tone_match['match_score']
         avoid_score = 100 if avoided['clean'] else max(0, 100 - (avoided['avoided_words_used'] * 10))
         structure_score = structure['match_percentage']
         
-        overall_score = (tone_score * 0.4 + avoid_score * 0.3 + structure_score * 0.3)
+        if fingerprint is None:
+            overall_score = (tone_score * 0.4 + avoid_score * 0.3 + structure_score * 0.3)
+        else:
+            overall_score = (
+                fingerprint['match_score'] * 0.4 +
+                tone_score * 0.2 +
+                avoid_score * 0.2 +
+                structure_score * 0.2
+            )
         
         return {
             'overall_score': round(overall_score, 2),
             'tone_analysis': tone_match,
             'avoided_words_analysis': avoided,
             'structure_analysis': structure,
+            'fingerprint_analysis': fingerprint,
             'recommendation': 'Good match' if overall_score >= 80 else 'Needs adjustment'
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def calculate_overall_match_batch(texts: Sequence[Union[str, TextDocument]], brand_voice: Dict,
+                                      workers: Optional[int] = None) -> pd.DataFrame:
+        """Brand voice match of many texts, one row per text with dotted columns per analysis"""
+        return score_batch(BrandVoiceMatcher.calculate_overall_match, [(text, brand_voice) for text in texts], workers)
\ No newline at end of file
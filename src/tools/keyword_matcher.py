@@ -0,0 +1,72 @@
+"""
+Keyword Matcher - Word-boundary keyword counting for many keywords in one pass
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from functools import lru_cache
+
+from .text_analysis import TextDocument, tokenize
+
+# Trie key marking the end of a keyword (never a word token)
+_END = ''
+
+
+class KeywordMatcher:
+    """Token-level trie over a set of keywords
+
+    Keywords and text are split into words the same way, so "AI" matches
+    "AI", "AI's" and "AI-powered" but not "maintain", and "machine learning"
+    matches across any punctuation or whitespace between the two words.
+    One scan of the document counts every keyword, including keywords
+    nested in longer ones ("learning" in "machine learning").
+    """
+    
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._root: Dict = {}
+        
+        for index, keyword in enumerate(self.keywords):
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, []).append(index)
+    
+    def scan(self, text: Union[str, TextDocument]) -> Dict[str, Dict]:
+        """Occurrences and first position (word index and character offset) of every keyword"""
+        doc = TextDocument.of(text)
+        words, offsets = doc.word_spans
+        
+        counts = [0] * len(self.keywords)
+        first: List[Optional[int]] = [None] * len(self.keywords)
+        root = self._root
+        
+        for start in range(len(words)):
+            node = root.get(words[start])
+            end = start + 1
+            while node is not None:
+                for index in node.get(_END, ()):
+                    counts[index] += 1
+                    if first[index] is None:
+                        first[index] = start
+                if end == len(words):
+                    break
+                node = node.get(words[end])
+                end += 1
+        
+        return {
+            keyword: {
+                'occurrences': counts[index],
+                'first_position': first[index],
+                'first_offset': offsets[first[index]] if first[index] is not None else None
+            }
+            for index, keyword in enumerate(self.keywords)
+        }
+
+
+@lru_cache(maxsize=64)
+def keyword_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """Matcher for a keyword set; repeated calls with the same keywords share the trie"""
+    return KeywordMatcher(keywords)
\ No newline at end of file
@@ -2,31 +2,58 @@
 Readability Scorer - Analyzes content readability
 """
 
-import textstat
-from typing import Dict
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .batch import map_documents
+from .readability_engine import _ratio, readability_indices
+from .text_analysis import TextDocument
+
+# Per-document counts behind the scores and statistics, in column order
+_COUNT_COLUMNS = (
+    'word_count', 'sentence_count', 'syllable_count', 'polysyllable_count',
+    'difficult_words_3', 'char_count', 'token_count', 'difficult_words'
+)
+
+
+def _document_counts(text: Union[str, TextDocument]) -> Tuple[int, ...]:
+    """Raw counts of one document (runs in pool workers for large batches)"""
+    doc = TextDocument.of(text)
+    return (
+        doc.lexicon_count,
+        doc.sentence_count,
+        doc.syllable_count,
+        doc.polysyllable_count,
+        doc.difficult_word_count(syllable_threshold=3),
+        doc.char_count,
+        doc.word_count,
+        doc.difficult_word_count(syllable_threshold=2, unique=True)
+    )
 
 
 class ReadabilityScorer:
     """Tool for calculating readability scores"""
     
     @staticmethod
-    def calculate_scores(text: str) -> Dict:
+    def calculate_scores(text: Union[str, TextDocument]) -> Dict:
         """Calculate various readability scores"""
         try:
-            flesch_reading_ease = textstat.flesch_reading_ease(text)
-            flesch_kincaid_grade = textstat.flesch_kincaid_grade(text)
-            gunning_fog = textstat.gunning_fog(text)
-            smog_index = textstat.smog_index(text)
-            automated_readability = textstat.automated_readability_index(text)
+            doc = TextDocument.of(text)
+            indices = readability_indices(
+                words=doc.lexicon_count,
+                sentences=doc.sentence_count,
+                syllables=doc.syllable_count,
+                polysyllables=doc.polysyllable_count,
+                difficult_words=doc.difficult_word_count(syllable_threshold=3),
+                characters=doc.char_count,
+                tokens=doc.word_count
+            )
             
-            scores = {
-                'flesch_reading_ease': round(flesch_reading_ease, 2),
-                'flesch_kincaid_grade': round(flesch_kincaid_grade, 2),
-                'gunning_fog': round(gunning_fog, 2),
-                'smog_index': round(smog_index, 2),
-                'automated_readability': round(automated_readability, 2),
-                'overall_score': round(flesch_reading_ease, 2)
-            }
+            # np.round, as calculate_scores_batch rounds, so single and batch scores agree exactly
+            scores = {name: float(np.round(value, 2)) for name, value in indices.items()}
+            scores['overall_score'] = scores['flesch_reading_ease']
             
             return scores
             
@@ -60,20 +87,20 @@ class ReadabilityScorer:
             return "Very Difficult (College graduate)"
     
     @staticmethod
-    def calculate_statistics(text: str) -> Dict:
+    def calculate_statistics(text: Union[str, TextDocument]) -> Dict:
         """Calculate text statistics"""
         try:
-            word_count = textstat.lexicon_count(text, removepunct=True)
-            sentence_count = textstat.sentence_count(text)
-            syllable_count = textstat.syllable_count(text)
+            doc = TextDocument.of(text)
+            word_count = doc.lexicon_count
+            sentence_count = doc.sentence_count
             avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
             
             return {
                 'word_count': word_count,
                 'sentence_count': sentence_count,
-                'syllable_count': syllable_count,
-                'avg_sentence_length': round(avg_sentence_length, 2),
-                'difficult_words': textstat.difficult_words(text)
+                'syllable_count': doc.syllable_count,
+                'avg_sentence_length': float(np.round(avg_sentence_length, 2)),
+                'difficult_words': doc.difficult_word_count(syllable_threshold=2, unique=True)
             }
             
         except Exception as e:
@@ -84,4 +111,33 @@ class ReadabilityScorer:
                 'avg_sentence_length': 0,
                 'difficult_words': 0,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def calculate_scores_batch(texts: Sequence[Union[str, TextDocument]],
+                               workers: Optional[int] = None) -> pd.DataFrame:
+        """Scores and statistics of many texts, one row per text
+        
+        Documents are counted one by one (over `workers` processes for
+        large batches) and every index is then computed for the whole
+        batch at once.
+        """
+        rows = map_documents(_document_counts, [(text,) for text in texts], workers)
+        counts = dict(zip(_COUNT_COLUMNS, np.array(rows, dtype=np.int64).reshape(-1, len(_COUNT_COLUMNS)).T))
+        
+        indices = readability_indices(
+            words=counts['word_count'],
+            sentences=counts['sentence_count'],
+            syllables=counts['syllable_count'],
+            polysyllables=counts['polysyllable_count'],
+            difficult_words=counts['difficult_words_3'],
+            characters=counts['char_count'],
+            tokens=counts['token_count']
+        )
+        
+        frame = pd.DataFrame({name: np.round(values, 2) for name, values in indices.items()})
+        frame['overall_score'] = frame['flesch_reading_ease']
+        for column in ('word_count', 'sentence_count', 'syllable_count', 'difficult_words'):
+            frame[column] = counts[column]
+        frame['avg_sentence_length'] = np.round(_ratio(counts['word_count'], counts['sentence_count']), 2)
+        return frame
\ No newline at end of file
@@ -2,21 +2,56 @@
 SEO Analyzer - Analyzes and scores SEO elements
 """
 
-from typing import Dict, List
-import re
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .batch import score_batch
+from .keyword_matcher import keyword_matcher
+from .text_analysis import TextDocument
 
 
 class SEOAnalyzer:
     """Tool for analyzing SEO quality"""
     
     @staticmethod
-    def analyze_keyword_density(text: str, keyword: str) -> Dict:
+    def analyze_keyword_density(text: Union[str, TextDocument], keyword: str) -> Dict:
         """Calculate keyword density"""
-        text_lower = text.lower()
-        keyword_lower = keyword.lower()
+        return SEOAnalyzer.analyze_keywords(text, keyword)['primary']
+    
+    @staticmethod
+    def analyze_keywords(text: Union[str, TextDocument], primary: str,
+                         secondary: Optional[Sequence[str]] = None) -> Dict:
+        """Count the primary and all secondary keywords in one pass over the text
+
+        `secondary` often comes straight from model JSON, so anything but a
+        list or tuple is ignored, as are items that are not non-blank strings.
+        """
+        doc = TextDocument.of(text)
+        if not isinstance(secondary, (list, tuple)):
+            secondary = []
+        # Keywords differing only in case or surrounding spaces are one keyword (first spelling kept)
+        unique = {primary.strip().lower(): primary}
+        for keyword in secondary:
+            if isinstance(keyword, str) and keyword.strip():
+                unique.setdefault(keyword.strip().lower(), keyword.strip())
+        secondary = list(unique.values())[1:]
+        matches = keyword_matcher(tuple([primary, *secondary])).scan(doc)
+        
+        analyses = [SEOAnalyzer._keyword_density(keyword, matches.get(keyword), doc.word_count)
+                    for keyword in [primary, *secondary]]
+        found = sum(1 for analysis in analyses[1:] if analysis['occurrences'])
         
-        total_words = len(text.split())
-        keyword_count = text_lower.count(keyword_lower)
+        return {
+            'primary': analyses[0],
+            'secondary': analyses[1:],
+            'secondary_coverage': round(found / len(secondary), 2) if secondary else 1.0
+        }
+    
+    @staticmethod
+    def _keyword_density(keyword: str, match: Optional[Dict], total_words: int) -> Dict:
+        """Density analysis for one keyword from its matcher result"""
+        keyword_count = match['occurrences'] if match else 0
         
         density = (keyword_count / total_words * 100) if total_words > 0 else 0
         
@@ -27,6 +62,7 @@ class SEOAnalyzer:
             'keyword': keyword,
             'occurrences': keyword_count,
             'density_percentage': round(density, 2),
+            'first_position': match['first_position'] if match else None,
             'optimal_range': optimal_range,
             'is_optimal': is_optimal,
             'recommendation': 'Good' if is_optimal else ('Increase usage' if density < optimal_range[0] else 'Reduce usage')
@@ -82,15 +118,13 @@ class SEOAnalyzer:
         }
     
     @staticmethod
-    def analyze_headers(text: str, keyword: str) -> Dict:
+    def analyze_headers(text: Union[str, TextDocument], keyword: str) -> Dict:
         """Analyze header structure and keyword usage"""
-        h1_pattern = r'^#\s+(.+)$'
-        h2_pattern = r'^##\s+(.+)$'
-        h3_pattern = r'^###\s+(.+)$'
+        doc = TextDocument.of(text)
         
-        h1s = re.findall(h1_pattern, text, re.MULTILINE)
-        h2s = re.findall(h2_pattern, text, re.MULTILINE)
-        h3s = re.findall(h3_pattern, text, re.MULTILINE)
+        h1s = doc.headers_at(1)
+        h2s = doc.headers_at(2)
+        h3s = doc.headers_at(3)
         
         h1_has_keyword = any(keyword.lower() in h.lower() for h in h1s)
         h2_with_keyword = sum(1 for h in h2s if keyword.lower() in h.lower())
@@ -116,14 +150,21 @@ class SEOAnalyzer:
         }
     
     @staticmethod
-    def calculate_overall_seo_score(text: str, title: str, meta: str, keyword: str) -> Dict:
+    def calculate_overall_seo_score(text: Union[str, TextDocument], title: str, meta: str, keyword: str,
+                                    secondary_keywords: Optional[Sequence[str]] = None) -> Dict:
         """Calculate comprehensive SEO score"""
-        keyword_analysis = SEOAnalyzer.analyze_keyword_density(text, keyword)
+        text = TextDocument.of(text)
+        
+        keywords = SEOAnalyzer.analyze_keywords(text, keyword, secondary_keywords)
+        keyword_analysis = keywords['primary']
         title_analysis = SEOAnalyzer.analyze_title(title, keyword)
         meta_analysis = SEOAnalyzer.analyze_meta_description(meta, keyword)
         header_analysis = SEOAnalyzer.analyze_headers(text, keyword)
         
         keyword_score = 100 if keyword_analysis['is_optimal'] else 50
+        if keywords['secondary']:
+            # Secondary keywords only need to appear; their density is not scored
+            keyword_score = keyword_score * 0.7 + keywords['secondary_coverage'] * 100 * 0.3
         title_score = title_analysis['score']
         meta_score = meta_analysis['score']
         header_score = header_analysis['score']
@@ -138,15 +179,25 @@ class SEOAnalyzer:
         return {
             'overall_score': round(overall_score, 2),
             'keyword_analysis': keyword_analysis,
+            'secondary_keywords': keywords['secondary'],
             'title_analysis': title_analysis,
             'meta_analysis': meta_analysis,
             'header_analysis': header_analysis,
             'grade': SEOAnalyzer._get_seo_grade(overall_score),
             'recommendations': SEOAnalyzer._get_recommendations(
-                keyword_analysis, title_analysis, meta_analysis, header_analysis
+                keyword_analysis, title_analysis, meta_analysis, header_analysis, keywords['secondary']
             )
         }
     
+    @staticmethod
+    def calculate_overall_seo_score_batch(texts: Sequence[Union[str, TextDocument]], titles: Sequence[str],
+                                          metas: Sequence[str], keyword: str,
+                                          secondary_keywords: Optional[Sequence[str]] = None,
+                                          workers: Optional[int] = None) -> pd.DataFrame:
+        """SEO scores of many documents, one row per document with dotted columns per analysis"""
+        jobs = [(text, title, meta, keyword, secondary_keywords) for text, title, meta in zip(texts, titles, metas)]
+        return score_batch(SEOAnalyzer.calculate_overall_seo_score, jobs, workers)
+    
     @staticmethod
     def _get_seo_grade(score: float) -> str:
         """Get letter grade for SEO score"""
@@ -163,13 +214,18 @@ class SEOAnalyzer:
     
     @staticmethod
     def _get_recommendations(keyword_analysis: Dict, title_analysis: Dict, 
-                            meta_analysis: Dict, header_analysis: Dict) -> List[str]:
+                            meta_analysis: Dict, header_analysis: Dict,
+                            secondary_analyses: Optional[List[Dict]] = None) -> List[str]:
         """Generate SEO improvement recommendations"""
         recommendations = []
         
         if not keyword_analysis['is_optimal']:
             recommendations.append(keyword_analysis['recommendation'])
         
+        missing = [analysis['keyword'] for analysis in secondary_analyses or [] if not analysis['occurrences']]
+        if missing:
+            recommendations.append(f"Keywords: Work in {', '.join(missing[:5])}")
+        
         if title_analysis['score'] < 80:
             recommendations.append(f"Title: {title_analysis['recommendation']}")
         
@@ -0,0 +1,256 @@
+"""
+Text Analysis - Shared single-pass document model for the scoring tools
+"""
+
+from typing import Counter as CounterType, Dict, FrozenSet, List, Tuple, Union
+from collections import Counter
+from functools import cached_property, lru_cache
+from itertools import chain
+import hashlib
+import re
+
+from .readability_engine import count_syllables, easy_words
+
+_HEADER = re.compile(r'(#{1,6})[ \t]+(\S.*)$')
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+_READABILITY_SENTENCE = re.compile(r'\b[^.!?]+[.!?]*', re.UNICODE)
+# Punctuation except apostrophes that start an English contraction ("don't", "we'll")
+_PUNCTUATION = re.compile(r"[^\w\s']|'(?![tsd]|ve|ll|re)")
+# Words split at every non-word character except contraction apostrophes
+# ("AI-powered" -> "ai", "powered"; "AI's" -> "ai", "s"; "don't" stays whole)
+_WORD = re.compile(r"\w+(?:'(?!s\b)\w+)*")
+# Blank lines right after terminal punctuation: no sentence spans them
+_SECTION_BREAK = re.compile(r'(?<=[.!?])[ \t]*\n(?:[ \t]*\n)+')
+
+
+def split_sections(text: str) -> List[str]:
+    """Split `text` into consecutive sections that together are exactly `text`
+
+    A section ends at a blank line that follows terminal punctuation, so
+    a header stays with the paragraphs under it and no sentence crosses
+    a section boundary. Every sentence and word statistic of the whole
+    text is therefore the combination of its sections' statistics.
+    """
+    sections = []
+    start = 0
+    for match in _SECTION_BREAK.finditer(text):
+        sections.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text) or not sections:
+        sections.append(text[start:])
+    return sections
+
+
+class TextSection:
+    """Words, sentences, headers and counts of one section of a document
+
+    Sections are cached by content (see `analyze_section`), so after an
+    edit only the sections whose text changed are analyzed again.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        
+        # Whitespace tokens, as `len(text.split())` counts them
+        self.tokens: List[str] = []
+        # Words with punctuation stripped (textstat's lexicon)
+        self.words: List[str] = []
+        self.headers: List[Tuple[int, str]] = []
+        self.char_count = 0
+        
+        for line in text.splitlines():
+            tokens = line.split()
+            if not tokens:
+                continue
+            self.tokens.extend(tokens)
+            self.char_count += sum(len(token) for token in tokens)
+            self.words.extend(_PUNCTUATION.sub('', line).split())
+            
+            if tokens[0][0] == '#':
+                match = _HEADER.match(line)
+                if match:
+                    self.headers.append((len(match.group(1)), match.group(2).strip()))
+        
+        # Sentences as split on terminal punctuation
+        self.sentences: List[str] = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+        self.sentence_lengths: List[int] = [len(s.split()) for s in self.sentences]
+    
+    @cached_property
+    def key(self) -> str:
+        """Content hash identifying this section across document versions"""
+        return hashlib.blake2b(self.text.encode('utf-8'), digest_size=8).hexdigest()
+    
+    @cached_property
+    def readability_sentences(self) -> int:
+        """Sentences as textstat counts them (fragments of two words or fewer ignored)"""
+        fragments = _READABILITY_SENTENCE.findall(self.text)
+        return sum(1 for fragment in fragments if len(_PUNCTUATION.sub('', fragment).split()) > 2)
+    
+    @cached_property
+    def word_spans(self) -> Tuple[List[str], List[int]]:
+        """Lowercase words split at every non-word character, and their offsets in the section"""
+        matches = list(_WORD.finditer(self.text.lower()))
+        return [match.group() for match in matches], [match.start() for match in matches]
+    
+    @cached_property
+    def terms(self) -> CounterType[str]:
+        """Lowercase word frequencies"""
+        return Counter(word.lower() for word in self.words)
+    
+    @cached_property
+    def syllable_count(self) -> int:
+        return sum(count_syllables(word) * count for word, count in self.terms.items())
+    
+    @cached_property
+    def polysyllable_count(self) -> int:
+        """Words of three or more syllables"""
+        return sum(count for word, count in self.terms.items() if count_syllables(word) >= 3)
+    
+    def difficult_words(self, syllable_threshold: int) -> Tuple[int, FrozenSet[str]]:
+        """Count of words off the easy-word list with enough syllables, and their spellings"""
+        cache = self.__dict__.setdefault('_difficult', {})
+        if syllable_threshold not in cache:
+            easy = easy_words()
+            difficult = {
+                word for word in self.terms
+                if count_syllables(word) >= syllable_threshold and word not in easy
+            }
+            cache[syllable_threshold] = (
+                sum(self.terms[word] for word in difficult),
+                frozenset(word for word in self.words if word.lower() in difficult)
+            )
+        return cache[syllable_threshold]
+
+
+class TextDocument:
+    """Words, sentences, headers and counts of one text, computed once
+
+    The text is split into sections (`split_sections`), each analyzed in
+    a single pass over its lines and cached by content, and the document
+    combines them. Syllable-based counts (readability) and n-gram
+    profiles are computed lazily on first use, once per distinct word,
+    and then cached. Definitions follow textstat where the readability
+    formulas need them; syllables come from the memoized readability
+    engine.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text or ''
+        self.lower = self.text.lower()
+        self.sections: List[TextSection] = [analyze_section(section) for section in split_sections(self.text)]
+        
+        # Whitespace tokens, as `len(text.split())` counts them
+        self.tokens: List[str] = self._join('tokens')
+        # Words with punctuation stripped (textstat's lexicon)
+        self.words: List[str] = self._join('words')
+        self.headers: List[Tuple[int, str]] = self._join('headers')
+        self.char_count = sum(section.char_count for section in self.sections)
+        
+        self.word_count = len(self.tokens)
+        self.lexicon_count = len(self.words)
+        
+        # Sentences as split on terminal punctuation
+        self.sentences: List[str] = self._join('sentences')
+        self.sentence_lengths: List[int] = self._join('sentence_lengths')
+    
+    def _join(self, attribute: str) -> List:
+        return list(chain.from_iterable(getattr(section, attribute) for section in self.sections))
+    
+    @classmethod
+    def of(cls, value: Union[str, 'TextDocument']) -> 'TextDocument':
+        """Document for `value`, reusing a cached analysis of the same text"""
+        if value is None or isinstance(value, str):
+            return analyze_text(value or '')
+        return value
+    
+    def count(self, phrase: str) -> int:
+        """Case-insensitive occurrences of `phrase` as a substring"""
+        return self.lower.count(phrase.lower()) if phrase else 0
+    
+    def contains(self, phrase: str) -> bool:
+        """Case-insensitive substring check"""
+        return phrase.lower() in self.lower
+    
+    def headers_at(self, level: int) -> List[str]:
+        """Header texts at one markdown level (1 for `#`, 2 for `##`, ...)"""
+        return [text for header_level, text in self.headers if header_level == level]
+    
+    @cached_property
+    def section_keys(self) -> List[str]:
+        """Content hash of each section, in order"""
+        return [section.key for section in self.sections]
+    
+    @cached_property
+    def sentence_count(self) -> int:
+        """Sentences as textstat counts them (fragments of two words or fewer ignored)"""
+        if not self.text:
+            return 0
+        return max(1, sum(section.readability_sentences for section in self.sections))
+    
+    @cached_property
+    def word_spans(self) -> Tuple[List[str], List[int]]:
+        """Lowercase words split at every non-word character, and their character offsets"""
+        words: List[str] = []
+        offsets: List[int] = []
+        start = 0
+        for section in self.sections:
+            section_words, section_offsets = section.word_spans
+            words.extend(section_words)
+            offsets.extend(offset + start for offset in section_offsets)
+            start += len(section.text)
+        return words, offsets
+    
+    @cached_property
+    def terms(self) -> CounterType[str]:
+        """Lowercase word frequencies"""
+        terms: CounterType[str] = Counter()
+        for section in self.sections:
+            terms.update(section.terms)
+        return terms
+    
+    @cached_property
+    def syllables_by_word(self) -> Dict[str, int]:
+        """Syllable count of each distinct lowercase word"""
+        return {word: count_syllables(word) for word in self.terms}
+    
+    @cached_property
+    def syllable_count(self) -> int:
+        return sum(section.syllable_count for section in self.sections)
+    
+    @cached_property
+    def polysyllable_count(self) -> int:
+        """Words of three or more syllables"""
+        return sum(section.polysyllable_count for section in self.sections)
+    
+    def difficult_word_count(self, syllable_threshold: int = 2, unique: bool = False) -> int:
+        """Words off the easy-word list with at least `syllable_threshold` syllables"""
+        results = [section.difficult_words(syllable_threshold) for section in self.sections]
+        if unique:
+            # textstat treats differently cased spellings as distinct words
+            return len(frozenset().union(*(spellings for _, spellings in results)))
+        return sum(count for count, _ in results)
+    
+    def ngrams(self, n: int) -> CounterType[Tuple[str, ...]]:
+        """Frequencies of lowercase word n-grams"""
+        cache = self.__dict__.setdefault('_ngrams', {})
+        if n not in cache:
+            words = [word.lower() for word in self.words]
+            cache[n] = Counter(zip(*(words[i:] for i in range(n))))
+        return cache[n]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of `text`, split as `TextDocument.word_spans` splits them"""
+    return _WORD.findall(text.lower())
+
+
+@lru_cache(maxsize=4096)
+def analyze_section(text: str) -> TextSection:
+    """Analyze one section once; unchanged sections of an edited document are reused"""
+    return TextSection(text)
+
+
+@lru_cache(maxsize=128)
+def analyze_text(text: str) -> TextDocument:
+    """Analyze `text` once; repeated calls with the same text share the result"""
+    return TextDocument(text)
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Voice Fingerprint - Stylometric brand-voice profiles and vectorized similarity
+"""
+
+from typing import Dict, Optional, Sequence, Union
+from functools import lru_cache
+import json
+import re
+
+import numpy as np
+
+from .keyword_matcher import keyword_matcher
+from .text_analysis import TextDocument
+
+# Frequent English function words; their rates are largely independent of topic
+FUNCTION_WORDS = (
+    'a', 'about', 'all', 'an', 'and', 'are', 'as', 'at', 'be', 'because', 'been', 'but', 'by', 'can',
+    'could', 'did', 'do', 'does', 'every', 'for', 'from', 'have', 'he', 'here', 'how', 'i', 'if', 'in',
+    'into', 'is', 'it', 'just', 'may', 'might', 'more', 'most', 'must', 'my', 'no', 'not', 'of', 'on',
+    'or', 'our', 'should', 'so', 'than', 'that', 'the', 'their', 'then', 'there', 'these', 'they',
+    'this', 'those', 'to', 'very', 'was', 'we', 'were', 'what', 'when', 'why', 'will', 'with', 'would',
+    'you', 'your'
+)
+_FUNCTION_INDEX = {word: i for i, word in enumerate(FUNCTION_WORDS)}
+
+# Upper bounds (inclusive) of the sentence-length bins, in words
+SENTENCE_BINS = np.array([5, 10, 15, 20, 30])
+
+# Buckets for hashed character trigrams (prime, so byte patterns spread evenly)
+NGRAM_BUCKETS = 509
+
+# Weight of each feature block in the combined similarity
+BLOCK_WEIGHTS = {'function_words': 0.4, 'sentence_lengths': 0.25, 'ngrams': 0.35}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _function_word_vector(terms: Dict[str, int], total_words: int) -> np.ndarray:
+    vector = np.zeros(len(FUNCTION_WORDS))
+    for word, index in _FUNCTION_INDEX.items():
+        vector[index] = terms.get(word, 0)
+    return vector / total_words if total_words else vector
+
+
+def _sentence_length_vector(lengths: Sequence[int]) -> np.ndarray:
+    counts = np.bincount(np.searchsorted(SENTENCE_BINS, np.asarray(lengths, dtype=int)),
+                         minlength=len(SENTENCE_BINS) + 1).astype(float)
+    # Add-one smoothing so a handful of example sentences still gives a usable distribution
+    return (counts + 1) / (counts.sum() + len(counts))
+
+
+def _ngram_vector(text: str) -> np.ndarray:
+    """Hashed character-trigram frequencies of lowercased, whitespace-collapsed text"""
+    data = np.frombuffer(_WHITESPACE.sub(' ', text.lower()).encode('utf-8'), dtype=np.uint8).astype(np.int64)
+    if len(data) < 3:
+        return np.zeros(NGRAM_BUCKETS)
+    codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    return np.bincount(codes % NGRAM_BUCKETS, minlength=NGRAM_BUCKETS).astype(float)
+
+
+def style_vectors(text: Union[str, TextDocument]) -> Dict[str, np.ndarray]:
+    """Unit-length feature blocks of one text (cached on the document)"""
+    doc = TextDocument.of(text)
+    cached = doc.__dict__.get('_style_vectors')
+    if cached is None:
+        cached = {
+            'function_words': _normalize(_function_word_vector(doc.terms, doc.lexicon_count)),
+            'sentence_lengths': _normalize(_sentence_length_vector(doc.sentence_lengths)),
+            'ngrams': _normalize(_ngram_vector(doc.text))
+        }
+        doc.__dict__['_style_vectors'] = cached
+    return cached
+
+
+class VoiceFingerprint:
+    """Numeric stylometric profile of one brand voice
+
+    Built once from the voice's `examples`, `use_often` phrases and
+    `writing_rules`: function-word rates, the sentence-length distribution
+    of the examples and a hashed character-trigram profile. Texts are
+    compared by cosine similarity per feature block, and `use_often`
+    phrases found in a text raise its score. A voice's `avoid` entries are
+    mostly descriptions ("hedging", "corporate speak") rather than words
+    that appear in text, so they are left to
+    BrandVoiceMatcher.check_avoided_words and not part of the fingerprint.
+    """
+    
+    def __init__(self, examples: Sequence[str], use_often: Sequence[str] = (), writing_rules: Sequence[str] = ()):
+        self.use_often = tuple(phrase for phrase in use_often if phrase)
+        
+        # Examples carry the voice's rhythm; phrases and rules add vocabulary
+        example_text = ' '.join(examples)
+        profile = TextDocument('\n\n'.join([example_text, *self.use_often, *writing_rules]))
+        rhythm = TextDocument(example_text) if examples else profile
+        
+        self.vectors = {
+            'function_words': _normalize(_function_word_vector(profile.terms, profile.lexicon_count)),
+            'sentence_lengths': _normalize(_sentence_length_vector(rhythm.sentence_lengths)),
+            'ngrams': _normalize(_ngram_vector(profile.text))
+        }
+    
+    def block_similarities(self, texts: Sequence[Union[str, TextDocument]]) -> Dict[str, np.ndarray]:
+        """Cosine similarity of each text to each feature block, one array per block"""
+        vectors = [style_vectors(text) for text in texts]
+        return {
+            block: np.stack([v[block] for v in vectors]) @ profile if vectors else np.zeros(0)
+            for block, profile in self.vectors.items()
+        }
+    
+    def _evaluate(self, texts: Sequence[Union[str, TextDocument]]):
+        similarities = self.block_similarities(texts)
+        combined = sum(weight * similarities[block] for block, weight in BLOCK_WEIGHTS.items())
+        
+        coverage = np.zeros(len(texts))
+        if self.use_often:
+            matcher = keyword_matcher(self.use_often)
+            for i, text in enumerate(texts):
+                matches = matcher.scan(text)
+                found = sum(1 for phrase in self.use_often if matches[phrase]['occurrences'])
+                coverage[i] = found / len(self.use_often)
+        
+        scores = np.clip(combined * 100 + coverage * 10, 0, 100)
+        return scores, similarities
+    
+    def score_many(self, texts: Sequence[Union[str, TextDocument]]) -> np.ndarray:
+        """Voice match (0-100) of every text, computed as one matrix product per block"""
+        return self._evaluate(texts)[0]
+    
+    def score(self, text: Union[str, TextDocument]) -> Dict:
+        """Voice match of one text with the per-block similarities behind it"""
+        scores, similarities = self._evaluate([text])
+        return {
+            'match_score': round(float(scores[0]), 2),
+            **{f'{block}_similarity': round(float(values[0]), 3) for block, values in similarities.items()}
+        }
+
+
+@lru_cache(maxsize=64)
+def _fingerprint(payload: str) -> VoiceFingerprint:
+    fields = json.loads(payload)
+    return VoiceFingerprint(fields['examples'], fields['use_often'], fields['writing_rules'])
+
+
+def voice_fingerprint(brand_voice: Dict) -> Optional[VoiceFingerprint]:
+    """Fingerprint of a brand voice, or None if it has no examples, phrases or rules
+
+    Cached by the content of those fields, so editing a voice (or saving a
+    custom one) yields a fresh fingerprint and unchanged voices reuse theirs.
+    """
+    fields = {
+        name: [str(item) for item in brand_voice.get(name) or []]
+        for name in ('examples', 'use_often', 'writing_rules')
+    }
+    if not (fields['examples'] or fields['use_often'] or fields['writing_rules']):
+        return None
+    return _fingerprint(json.dumps(fields, sort_keys=True))
\ No newline at end of file
@@ -4,10 +4,14 @@ Content Factory AI - Utility Modules
 
 from .logger import setup_logger
 from .metrics import MetricsCollector
+from .prometheus import PrometheusExporter
+from .tracing import setup_tracing
 from .validators import ContentValidator
 
 __all__ = [
     'setup_logger',
     'MetricsCollector',
+    'PrometheusExporter',
+    'setup_tracing',
     'ContentValidator',
 ]
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Content Scoring - One-call quality scoring of a finished content package
+"""
+
+from typing import Dict, Iterable, List, Optional
+import os
+
+from tools.brand_voice_matcher import BrandVoiceMatcher
+from tools.readability_scorer import ReadabilityScorer
+from tools.seo_analyzer import SEOAnalyzer
+from tools.text_analysis import TextDocument
+from tools.voice_fingerprint import voice_fingerprint
+from .validators import ContentValidator
+
+
+def voice_gate_threshold() -> float:
+    """Minimum brand-voice match of the blog, from VOICE_GATE_THRESHOLD
+
+    Real blogs score about 45-75 against any of the predefined voices and
+    stubs or placeholders about 20-30, so the floor only catches the latter.
+    """
+    return float(os.getenv('VOICE_GATE_THRESHOLD') or 40)
+
+
+def voice_gate_margin() -> float:
+    """How far the blog may trail the best competing voice, from VOICE_GATE_MARGIN"""
+    return float(os.getenv('VOICE_GATE_MARGIN') or 15)
+
+
+def competing_voice_score(blog: TextDocument, brand_voice: Dict,
+                          competing_voices: Optional[Iterable[Dict]] = None) -> Optional[float]:
+    """Best fingerprint match of the blog to any voice other than `brand_voice`
+
+    Competes against the predefined voices unless `competing_voices` is given.
+    """
+    own = voice_fingerprint(brand_voice)
+    if competing_voices is None:
+        from brand_voices import BrandVoiceManager
+        competing_voices = BrandVoiceManager.PREDEFINED_VOICES.values()
+    
+    scores = [
+        fingerprint.score(blog)['match_score']
+        for fingerprint in (voice_fingerprint(voice) for voice in competing_voices)
+        if fingerprint is not None and fingerprint is not own
+    ]
+    return max(scores) if scores else None
+
+
+def score_content_package(content: Dict[str, str], keyword: str, secondary_keywords: Optional[List[str]] = None,
+                          title: Optional[str] = None, meta_description: str = '',
+                          brand_voice: Optional[Dict] = None,
+                          competing_voices: Optional[Iterable[Dict]] = None) -> Dict:
+    """Readability, SEO, validation and brand-voice match of a package in one call
+
+    Everything is computed from one analysis of each text, so a worker
+    process receives the package once (see CPUExecutor.run). Absolute
+    voice scores move with the topic as much as with the voice, so a
+    fingerprinted voice passes when the blog clears the floor and scores
+    within the margin of the best competing voice.
+    """
+    blog = TextDocument.of(content.get('blog', ''))
+    if not title:
+        headers = blog.headers_at(1)
+        title = headers[0] if headers else ''
+    
+    readability = ReadabilityScorer.calculate_scores(blog)
+    seo = SEOAnalyzer.calculate_overall_seo_score(blog, title, meta_description, keyword, secondary_keywords)
+    validation = ContentValidator.validate_all_content({
+        ('video_script' if platform == 'youtube' else platform): text
+        for platform, text in content.items()
+    })
+    
+    # Gate on the stylometric fingerprint when the voice has one, else on the heuristic match
+    voice_score = None
+    competing_score = None
+    if brand_voice:
+        voice = BrandVoiceMatcher.calculate_overall_match(blog, brand_voice)
+        fingerprint = voice['fingerprint_analysis']
+        voice_score = fingerprint['match_score'] if fingerprint else voice['overall_score']
+        if fingerprint:
+            competing_score = competing_voice_score(blog, brand_voice, competing_voices)
+    
+    voice_ok = voice_score is None or (
+        voice_score >= voice_gate_threshold()
+        and (competing_score is None or voice_score >= competing_score - voice_gate_margin())
+    )
+    
+    return {
+        'readability': readability['flesch_reading_ease'],
+        'reading_grade': readability['flesch_kincaid_grade'],
+        'seo_score': seo['overall_score'],
+        'seo_grade': seo['grade'],
+        'seo_recommendations': seo['recommendations'],
+        'all_valid': validation['all_valid'],
+        'validation_issues': {
+            platform: result['issues'] for platform, result in validation['results'].items() if result['issues']
+        },
+        'voice_score': voice_score,
+        'competing_voice_score': competing_score,
+        'voice_ok': voice_ok
+    }
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+CPU Executor - Run CPU-bound pipeline steps off the event loop
+"""
+
+from typing import Any, Callable, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+
+from .logger import setup_logger
+from .metrics import MetricsCollector, metric_key
+
+logger = setup_logger(__name__)
+
+
+class CPUExecutor:
+    """Offloads scoring, validation and serialization from the event loop
+
+    `run` is for heavy, pure work such as readability or SEO scoring of a
+    whole package. In 'process' mode it goes to a spawn-based process pool,
+    so concurrent packages use every core; the function and its arguments
+    must pickle, so pass each package's text once and do all of its
+    scoring in that call. `run_light` always uses a thread pool, for work
+    that touches shared objects or is mostly I/O (history appends).
+    'thread' mode sends heavy work to threads too, and 'inline' runs
+    everything on the loop.
+    """
+    
+    MODES = ('process', 'thread', 'inline')
+    
+    def __init__(self, mode: str = 'thread', max_workers: Optional[int] = None,
+                 metrics: Optional[MetricsCollector] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown CPU executor mode: {mode} (expected one of {', '.join(self.MODES)})")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.metrics = metrics or MetricsCollector()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls, metrics: Optional[MetricsCollector] = None) -> 'CPUExecutor':
+        """Build an executor from CPU_EXECUTOR (process, thread or inline) and CPU_WORKERS"""
+        workers = os.getenv('CPU_WORKERS')
+        return cls(
+            mode=os.getenv('CPU_EXECUTOR', 'thread').lower() or 'thread',
+            max_workers=int(workers) if workers else None,
+            metrics=metrics
+        )
+    
+    def _processes(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                # Spawned workers do not inherit the loop, locks or logging threads of this process
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Started CPU process pool with {self.max_workers} workers")
+            return self._process_pool
+    
+    def _threads(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cpu')
+            return self._thread_pool
+    
+    async def _submit(self, pool: str, executor: Optional[Executor], func: Callable, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            if executor is None:
+                return func(*args, **kwargs)
+            call = partial(func, *args, **kwargs)
+            if pool == 'thread':
+                # Keep log context and the current span in the worker thread
+                call = partial(contextvars.copy_context().run, call)
+            return await asyncio.get_running_loop().run_in_executor(executor, call)
+        finally:
+            self.metrics.increment_counter(metric_key('cpu_tasks', pool=pool))
+            self.metrics.record_metric(metric_key('cpu_task_seconds', pool=pool), time.perf_counter() - start)
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run CPU-heavy `func` in the configured pool"""
+        if self.mode == 'process':
+            pool = self._processes()
+            try:
+                return await self._submit('process', pool, func, *args, **kwargs)
+            except BrokenProcessPool:
+                # A crashed worker poisons the pool; start a fresh one on the next call
+                with self._pool_lock:
+                    if self._process_pool is pool:
+                        self._process_pool = None
+                raise
+        if self.mode == 'thread':
+            return await self._submit('thread', self._threads(), func, *args, **kwargs)
+        return await self._submit('inline', None, func, *args, **kwargs)
+    
+    async def run_light(self, func: Callable, *args, **kwargs) -> Any:
+        """Run lighter or I/O-bound `func` in the thread pool"""
+        if self.mode == 'inline':
+            return await self._submit('inline', None, func, *args, **kwargs)
+        return await self._submit('thread', self._threads(), func, *args, **kwargs)
+    
+    def shutdown(self, wait: bool = True):
+        """Stop both pools; they restart on next use"""
+        with self._pool_lock:
+            pools, self._process_pool, self._thread_pool = (self._process_pool, self._thread_pool), None, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Histogram - Fixed-memory log-bucketed histogram for streaming percentiles
+"""
+
+import math
+from typing import Dict, Optional
+
+
+class LogHistogram:
+    """Streaming histogram with bounded relative error and bounded memory
+
+    Values are placed in logarithmic buckets so any percentile is reported
+    within `relative_accuracy` of the true value. When more than
+    `max_buckets` buckets are in use, the lowest ones are collapsed
+    together, which keeps memory fixed and only costs accuracy at the
+    bottom of the distribution. Negative values go to a mirrored set of
+    buckets keyed by magnitude, and values within `min_value` of zero to
+    a zero bucket. Histograms with the same accuracy can be merged, so
+    per-worker snapshots can be combined into one view.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048,
+                 min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._negative_buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket_index(self, value: float) -> int:
+        """Bucket holding `value`"""
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative value for a bucket"""
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """Record a value"""
+        value = float(value)
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if abs(value) <= self.min_value:
+            self.zero_count += count
+            return
+
+        buckets = self._buckets if value > 0 else self._negative_buckets
+        index = self._bucket_index(abs(value))
+        buckets[index] = buckets.get(index, 0) + count
+
+        if len(self._buckets) + len(self._negative_buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the buckets nearest zero together to stay within max_buckets"""
+        excess = len(self._buckets) + len(self._negative_buckets) - self.max_buckets
+        for buckets in (self._buckets, self._negative_buckets):
+            folded = min(excess, len(buckets) - 1)
+            if folded <= 0:
+                continue
+            indexes = sorted(buckets)
+            target = indexes[folded]
+            for index in indexes[:folded]:
+                buckets[target] += buckets.pop(index)
+            excess -= folded
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100)"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q / 100 * (self.count - 1)
+
+        # Most negative first: negative buckets by falling magnitude, zero, then positives
+        seen = 0
+        for index in sorted(self._negative_buckets, reverse=True):
+            seen += self._negative_buckets[index]
+            if seen > rank:
+                return min(max(-self._bucket_value(index), self.min), self.max)
+
+        seen += self.zero_count
+        if seen > rank:
+            return min(max(0.0, self.min), self.max)
+
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Mean of recorded values"""
+        return self.sum / self.count if self.count else 0.0
+
+    def merge(self, other: 'LogHistogram'):
+        """Merge another histogram into this one"""
+        if other.count == 0:
+            return
+        if abs(other.relative_accuracy - self.relative_accuracy) > 1e-12:
+            raise ValueError("Cannot merge histograms with different accuracy")
+
+        self.count += other.count
+        self.sum += other.sum
+        self.zero_count += other.zero_count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        for index, count in other._negative_buckets.items():
+            self._negative_buckets[index] = self._negative_buckets.get(index, 0) + count
+
+        if len(self._buckets) + len(self._negative_buckets) > self.max_buckets:
+            self._collapse()
+
+    def summary(self) -> Dict:
+        """Count, sum, mean, min/max and common percentiles"""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.mean,
+            'min': self.min if self.min is not None else 0,
+            'max': self.max if self.max is not None else 0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99)
+        }
+
+    def to_dict(self) -> Dict:
+        """Serializable snapshot"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_buckets': self.max_buckets,
+            'min_value': self.min_value,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'zero_count': self.zero_count,
+            'buckets': {str(index): count for index, count in self._buckets.items()},
+            'negative_buckets': {str(index): count for index, count in self._negative_buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LogHistogram':
+        """Rebuild a histogram from a snapshot"""
+        histogram = cls(
+            relative_accuracy=data.get('relative_accuracy', 0.01),
+            max_buckets=data.get('max_buckets', 2048),
+            min_value=data.get('min_value', 1e-9)
+        )
+        histogram.count = data.get('count', 0)
+        histogram.sum = data.get('sum', 0.0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        histogram.zero_count = data.get('zero_count', 0)
+        histogram._buckets = {int(index): count for index, count in data.get('buckets', {}).items()}
+        histogram._negative_buckets = {
+            int(index): count for index, count in data.get('negative_buckets', {}).items()
+        }
+        return histogram
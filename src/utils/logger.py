@@ -2,45 +2,225 @@
 Logger - Structured logging for observability
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import queue
 import sys
 import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
 
+CONTEXT_FIELDS = ('session_id', 'stage', 'model')
 
-def setup_logger(name: str, log_level: str = "INFO") -> logging.Logger:
-    """Setup structured logger with file and console handlers"""
-    
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, log_level.upper()))
-    
-    if logger.handlers:
-        return logger
+_log_context: ContextVar[Dict[str, str]] = ContextVar('log_context', default={})
+_queue: Optional[queue.SimpleQueue] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+# Loggers set up by setup_logger; detached by shutdown_logging and re-attached by the next setup
+_configured: List[logging.Logger] = []
+_atexit_registered = False
+
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', *CONTEXT_FIELDS}
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (session_id, stage, model, ...) to every record logged in this context"""
+    token = _log_context.set({**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context() -> Dict[str, str]:
+    """Fields bound by the enclosing log_context() blocks"""
+    return dict(_log_context.get())
+
+
+class ContextFilter(logging.Filter):
+    """Copies the log context onto records in the calling task/thread"""
     
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        for field, value in context.items():
+            if not hasattr(record, field):
+                setattr(record, field, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with context and `extra=` fields"""
     
-    log_file = log_dir / f"content_factory_{datetime.now().strftime('%Y%m%d')}.log"
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        for field, value in vars(record).items():
+            if field not in _RECORD_ATTRIBUTES and not field.startswith('_'):
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps extra fields and pre-renders exceptions"""
     
-    formatter = logging.Formatter(
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    """Formatter for LOG_FORMAT (text or json)"""
+    if log_format == 'json':
+        return JsonFormatter()
+    return logging.Formatter(
         '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+
+
+def _build_file_handler(log_file: Path) -> logging.Handler:
+    """Rotating file handler configured from LOG_ROTATION / LOG_MAX_BYTES / LOG_BACKUP_COUNT"""
+    backup_count = int(os.getenv('LOG_BACKUP_COUNT', '14'))
+    
+    if os.getenv('LOG_ROTATION', 'time').lower() == 'size':
+        return logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+            backupCount=backup_count,
+            encoding='utf-8',
+            delay=True
+        )
+    
+    return logging.handlers.TimedRotatingFileHandler(
+        log_file,
+        when='midnight',
+        backupCount=backup_count,
+        encoding='utf-8',
+        delay=True
+    )
+
+
+def _log_file_name() -> str:
+    """Log file of this process
+
+    Rotation renames the file, which is not safe with several processes
+    writing to it, so worker processes (CPU_EXECUTOR=process) each write
+    their own content_factory.<pid>.log. Separately started programs
+    (CLI and web UI at once) should be given different LOG_DIRs.
+    """
+    if multiprocessing.parent_process() is not None:
+        return f'content_factory.{os.getpid()}.log'
+    return 'content_factory.log'
+
+
+def _get_queue() -> queue.SimpleQueue:
+    """Shared log queue, starting the listener thread on first use"""
+    global _queue, _listener, _atexit_registered
     
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
+    with _listener_lock:
+        if _queue is not None:
+            return _queue
+        
+        log_dir = Path(os.getenv('LOG_DIR', 'logs'))
+        log_dir.mkdir(exist_ok=True)
+        formatter = _build_formatter(os.getenv('LOG_FORMAT', 'text').lower())
+        
+        file_handler = _build_file_handler(log_dir / _log_file_name())
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(formatter)
+        
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(formatter)
+        
+        # Set console encoding for Windows
+        if sys.platform == 'win32':
+            os.environ['PYTHONIOENCODING'] = 'utf-8'
+        
+        _queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(
+            _queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        if not _atexit_registered:
+            atexit.register(shutdown_logging)
+            _atexit_registered = True
+        return _queue
+
+
+def shutdown_logging():
+    """Flush queued records, stop the listener thread and detach queue handlers
+
+    A later setup_logger() call starts a fresh queue and listener and
+    re-attaches every logger set up before, including module-level ones.
+    """
+    global _queue, _listener
+    
+    with _listener_lock:
+        for logger in _configured:
+            for handler in [h for h in logger.handlers if isinstance(h, _QueueHandler)]:
+                logger.removeHandler(handler)
+        
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _listener = None
+        _queue = None
+
+
+def setup_logger(name: str, log_level: str = "INFO") -> logging.Logger:
+    """Setup structured logger with file and console handlers
+
+    Records are put on a queue and written by a single listener thread, so
+    logging never blocks the event loop on file or console I/O. The file
+    under LOG_DIR rotates daily or by size (LOG_ROTATION), and LOG_FORMAT=json
+    emits one JSON object per line including session_id, stage and model
+    from log_context().
+    """
     
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, log_level.upper()))
     
-    # Set console encoding for Windows
-    if sys.platform == 'win32':
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
+    if logger.handlers:
+        return logger
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    log_queue = _get_queue()
+    with _listener_lock:
+        if logger not in _configured:
+            _configured.append(logger)
+        for configured in _configured:
+            if not any(isinstance(handler, _QueueHandler) for handler in configured.handlers):
+                handler = _QueueHandler(log_queue)
+                handler.addFilter(ContextFilter())
+                configured.addHandler(handler)
     
     return logger
\ No newline at end of file
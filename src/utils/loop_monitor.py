@@ -0,0 +1,144 @@
+"""
+Loop Monitor - Event-loop lag and blocking-call detection
+"""
+
+from typing import Dict, List, Optional
+from collections import deque
+from datetime import datetime
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from .logger import setup_logger
+from .metrics import MetricsCollector, metric_key
+
+logger = setup_logger(__name__)
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures stacks of blocking calls
+
+    A heartbeat task sleeps for `interval` and records how late it wakes
+    up (`event_loop_lag_seconds`). A watchdog thread notices when the
+    heartbeat is overdue by more than `block_threshold` and samples the
+    loop thread's stack while it is still blocked, so each report names
+    the code that held the loop (`event_loop_blocks` counts them). The
+    watchdog lives as long as the heartbeat task, so it also ends when the
+    loop shuts down without `stop()` (asyncio.run cancels leftover tasks).
+    """
+    
+    def __init__(self, metrics: Optional[MetricsCollector] = None, interval: float = 0.1,
+                 block_threshold: float = 0.25, max_reports: int = 50, stack_depth: int = 20):
+        self.metrics = metrics or MetricsCollector()
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.stack_depth = stack_depth
+        self.reports: deque = deque(maxlen=max_reports)
+        self.max_lag = 0.0
+        self.blocks = 0
+        self._loop_name = 'main'
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._pending_stack: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop: Optional[threading.Event] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self, name: str = 'main'):
+        """Start monitoring the running event loop (call from inside it)"""
+        if self.running:
+            return
+        
+        loop = asyncio.get_running_loop()
+        self._loop_name = name
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._watchdog_stop = threading.Event()
+        self._task = loop.create_task(self._heartbeat(self._watchdog_stop), name='loop-monitor')
+        
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(self._watchdog_stop,), name='loop-watchdog', daemon=True
+        )
+        self._watchdog.start()
+    
+    async def _heartbeat(self, watchdog_stop: threading.Event):
+        """Record how late each wakeup is"""
+        lag_key = metric_key('event_loop_lag_seconds', loop=self._loop_name)
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                lag = max(0.0, now - expected)
+                self._last_beat = now
+                
+                self.metrics.record_metric(lag_key, lag)
+                self.max_lag = max(self.max_lag, lag)
+                if lag >= self.block_threshold:
+                    self._record_block(lag)
+        finally:
+            # Cancelled by stop() or by the loop shutting down: the watchdog goes with it
+            watchdog_stop.set()
+    
+    def _watch(self, stop: threading.Event):
+        """Sample the loop thread's stack while the heartbeat is overdue"""
+        while not stop.wait(self.interval):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue < self.block_threshold or self._pending_stack is not None:
+                continue
+            
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._pending_stack = [
+                line.rstrip() for line in traceback.format_stack(frame, limit=self.stack_depth)
+            ]
+            del frame
+    
+    def _record_block(self, lag: float):
+        """Store a report for a stall the heartbeat just recovered from"""
+        stack, self._pending_stack = self._pending_stack, None
+        self.blocks += 1
+        self.metrics.increment_counter(metric_key('event_loop_blocks', loop=self._loop_name))
+        
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'blocked_seconds': round(lag, 3),
+            'stack': stack or []
+        }
+        self.reports.append(report)
+        
+        where = stack[-1].splitlines()[0].strip() if stack else 'unknown (no stack sample)'
+        logger.warning(f"Event loop blocked for {lag:.2f}s at {where}")
+    
+    def get_reports(self) -> List[Dict]:
+        """Recent blocking reports, oldest first"""
+        return list(self.reports)
+    
+    def get_stats(self) -> Dict:
+        """Lag percentiles and block count"""
+        stats = self.metrics.get_metric_stats(metric_key('event_loop_lag_seconds', loop=self._loop_name))
+        return {
+            'blocks': self.blocks,
+            'max_lag_seconds': round(self.max_lag, 3),
+            'p50_lag_seconds': round(stats['p50'], 3),
+            'p99_lag_seconds': round(stats['p99'], 3),
+            'samples': stats['count'],
+            'block_threshold_seconds': self.block_threshold
+        }
+    
+    def stop(self):
+        """Stop the heartbeat and watchdog"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog_stop is not None:
+            self._watchdog_stop.set()
+            self._watchdog_stop = None
+        self._watchdog = None
\ No newline at end of file
@@ -2,108 +2,296 @@
 Metrics Collector - Track performance metrics and timings
 """
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+import functools
+import inspect
+import re
+import threading
 import time
 
+from .histogram import LogHistogram
+
+_active_scope: ContextVar[Optional['MetricsCollector']] = ContextVar('metrics_scope', default=None)
+
+_LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def metric_key(name: str, **labels) -> str:
+    """Series key for a labeled metric, e.g. model_calls{model="x",status="ok"}"""
+    if not labels:
+        return name
+    parts = []
+    for label, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{label}="{value}"')
+    return f"{name}{{{','.join(parts)}}}"
+
+
+def parse_metric_key(key: str) -> Tuple[str, Dict[str, str]]:
+    """Split a series key from metric_key() into name and labels"""
+    if not key.endswith('}') or '{' not in key:
+        return key, {}
+    name, _, body = key[:-1].partition('{')
+    labels = {
+        label: value.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+        for label, value in _LABEL_PATTERN.findall(body)
+    }
+    return name, labels
+
+
+class _Timer:
+    """Times a block or function call into a MetricsCollector
+
+    Works as `with`, `async with`, or as a decorator on sync and async
+    functions. Elapsed time is measured with time.perf_counter().
+    """
+    
+    def __init__(self, collector: 'MetricsCollector', name: str):
+        self.collector = collector
+        self.name = name
+        self.elapsed: Optional[float] = None
+        self._start: Optional[float] = None
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed = time.perf_counter() - self._start
+        self.collector.record_metric(self.name, self.elapsed)
+        return False
+    
+    async def __aenter__(self):
+        return self.__enter__()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return self.__exit__(exc_type, exc_val, exc_tb)
+    
+    def __call__(self, func: Callable) -> Callable:
+        collector, name = self.collector, self.name
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with _Timer(collector, name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(collector, name):
+                return func(*args, **kwargs)
+        return wrapper
+
 
 class MetricsCollector:
-    """Collect and track metrics for agents and workflows"""
+    """Collect and track metrics for agents and workflows
+
+    `scope()` opens a child collector bound to the current context
+    (asyncio task or thread). While a scope is active, calls made on the
+    parent collector are recorded in the scope, and every value recorded
+    in a scope also rolls up into its parents. Concurrent packages each
+    get their own timers and numbers while the root keeps process totals.
     
-    def __init__(self):
+    Each metric is kept in a fixed-memory LogHistogram, so long-lived
+    workers report p50/p90/p99 without storing every sample. Metric and
+    counter names may carry labels via metric_key(). Gauges describe the
+    whole process, so they ignore scopes.
+    """
+    
+    def __init__(self, name: str = 'global', parent: Optional['MetricsCollector'] = None):
+        self.name = name
+        self.parent = parent
+        self._lock = threading.Lock()
         self._timers: Dict[str, float] = {}
-        self._metrics: Dict[str, List[float]] = {}
+        self._metrics: Dict[str, LogHistogram] = {}
         self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, float] = {}
+    
+    def _target(self) -> 'MetricsCollector':
+        """Innermost active scope belonging to this collector, or self"""
+        scope = _active_scope.get()
+        node = scope
+        while node is not None:
+            if node is self:
+                return scope
+            node = node.parent
+        return self
+    
+    @contextmanager
+    def scope(self, name: str):
+        """Open a child scope for the current context"""
+        child = MetricsCollector(name=name, parent=self._target())
+        token = _active_scope.set(child)
+        try:
+            yield child
+        finally:
+            _active_scope.reset(token)
+    
+    def timer(self, name: str) -> _Timer:
+        """Context manager / decorator that records elapsed time under `name`"""
+        return _Timer(self, name)
     
     def start_timer(self, name: str):
         """Start a timer"""
-        self._timers[name] = time.time()
+        target = self._target()
+        with target._lock:
+            target._timers[name] = time.perf_counter()
     
     def stop_timer(self, name: str) -> float:
         """Stop a timer and return elapsed time"""
-        if name not in self._timers:
-            return 0.0
-        
-        elapsed = time.time() - self._timers[name]
-        
-        if name not in self._metrics:
-            self._metrics[name] = []
-        self._metrics[name].append(elapsed)
-        
-        del self._timers[name]
+        target = self._target()
+        with target._lock:
+            if name not in target._timers:
+                return 0.0
+            elapsed = time.perf_counter() - target._timers.pop(name)
         
+        target.record_metric(name, elapsed)
         return elapsed
     
     def get_timer(self, name: str) -> Optional[float]:
         """Get current timer value"""
-        if name not in self._timers:
+        target = self._target()
+        if name not in target._timers:
             return None
-        return time.time() - self._timers[name]
+        return time.perf_counter() - target._timers[name]
     
     def record_metric(self, name: str, value: float):
         """Record a metric value"""
-        if name not in self._metrics:
-            self._metrics[name] = []
-        self._metrics[name].append(value)
+        node = self._target()
+        while node is not None:
+            with node._lock:
+                if name not in node._metrics:
+                    node._metrics[name] = LogHistogram()
+                node._metrics[name].add(value)
+            node = node.parent
     
     def increment_counter(self, name: str, amount: int = 1):
         """Increment a counter"""
-        if name not in self._counters:
-            self._counters[name] = 0
-        self._counters[name] += amount
+        node = self._target()
+        while node is not None:
+            with node._lock:
+                if name not in node._counters:
+                    node._counters[name] = 0
+                node._counters[name] += amount
+            node = node.parent
     
     def get_metric_stats(self, name: str) -> Dict:
         """Get statistics for a metric"""
-        if name not in self._metrics or not self._metrics[name]:
+        if name not in self._metrics or not self._metrics[name].count:
             return {
                 'count': 0,
                 'mean': 0,
                 'min': 0,
                 'max': 0,
-                'total': 0
+                'total': 0,
+                'p50': 0,
+                'p90': 0,
+                'p99': 0
             }
         
-        values = self._metrics[name]
+        with self._lock:
+            summary = self._metrics[name].summary()
+        
         return {
-            'count': len(values),
-            'mean': sum(values) / len(values),
-            'min': min(values),
-            'max': max(values),
-            'total': sum(values)
+            'count': summary['count'],
+            'mean': summary['mean'],
+            'min': summary['min'],
+            'max': summary['max'],
+            'total': summary['sum'],
+            'p50': summary['p50'],
+            'p90': summary['p90'],
+            'p99': summary['p99']
         }
     
     def get_counter(self, name: str) -> int:
         """Get counter value"""
         return self._counters.get(name, 0)
     
+    def set_gauge(self, name: str, value: float):
+        """Set a process-level gauge"""
+        with self._lock:
+            self._gauges[name] = value
+    
+    def adjust_gauge(self, name: str, amount: float = 1):
+        """Add to a process-level gauge (negative to subtract)"""
+        with self._lock:
+            self._gauges[name] = self._gauges.get(name, 0) + amount
+    
+    def get_gauge(self, name: str) -> float:
+        """Get gauge value"""
+        return self._gauges.get(name, 0)
+    
+    def get_all_gauges(self) -> Dict[str, float]:
+        """Get all gauges"""
+        return self._gauges.copy()
+    
+    def get_metric_names(self) -> List[str]:
+        """Names of all recorded metrics, including labeled series"""
+        return list(self._metrics)
+    
     def get_all_timings(self) -> Dict[str, Dict]:
-        """Get all timing statistics"""
+        """Get all timing statistics (unlabeled timers only)"""
         result = {}
-        for name in self._metrics:
+        for name in list(self._metrics):
+            if '{' in name:
+                continue
             stats = self.get_metric_stats(name)
             result[name] = {
                 'avg_seconds': round(stats['mean'], 2),
                 'min_seconds': round(stats['min'], 2),
                 'max_seconds': round(stats['max'], 2),
                 'total_seconds': round(stats['total'], 2),
+                'p50_seconds': round(stats['p50'], 2),
+                'p90_seconds': round(stats['p90'], 2),
+                'p99_seconds': round(stats['p99'], 2),
                 'count': stats['count']
             }
         return result
     
+    def get_histogram(self, name: str) -> Optional[LogHistogram]:
+        """Get the histogram backing a metric"""
+        return self._metrics.get(name)
+    
+    def snapshot(self) -> Dict:
+        """Serializable, mergeable snapshot of metrics and counters"""
+        with self._lock:
+            return {
+                'metrics': {name: histogram.to_dict() for name, histogram in self._metrics.items()},
+                'counters': self._counters.copy()
+            }
+    
+    def merge_snapshot(self, snapshot: Dict):
+        """Merge a snapshot (e.g. from another worker) into this collector"""
+        with self._lock:
+            for name, data in snapshot.get('metrics', {}).items():
+                if name not in self._metrics:
+                    self._metrics[name] = LogHistogram()
+                self._metrics[name].merge(LogHistogram.from_dict(data))
+            
+            for name, amount in snapshot.get('counters', {}).items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+    
     def get_all_counters(self) -> Dict[str, int]:
         """Get all counters"""
         return self._counters.copy()
     
     def reset(self):
         """Reset all metrics"""
-        self._timers = {}
-        self._metrics = {}
-        self._counters = {}
+        with self._lock:
+            self._timers = {}
+            self._metrics = {}
+            self._counters = {}
+            self._gauges = {}
     
     def get_summary(self) -> Dict:
         """Get comprehensive metrics summary"""
         return {
             'timings': self.get_all_timings(),
             'counters': self.get_all_counters(),
+            'gauges': self.get_all_gauges(),
             'active_timers': list(self._timers.keys())
         }
\ No newline at end of file
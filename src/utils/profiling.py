@@ -0,0 +1,243 @@
+"""
+Profiling - Opt-in sampling CPU and allocation profiles per content package
+"""
+
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+_tracemalloc_lock = threading.Lock()
+# Trackers currently sharing the process-wide tracemalloc session
+_active_trackers: List['AllocationTracker'] = []
+
+
+def should_profile(requested: Optional[bool] = None) -> bool:
+    """Decide whether to profile a package
+
+    An explicit `requested` wins. Otherwise PROFILE_PACKAGES=true profiles
+    every package and PROFILE_RATE (0-1) profiles that fraction of them.
+    """
+    if requested is not None:
+        return requested
+    if os.getenv('PROFILE_PACKAGES', '').lower() in ('1', 'true', 'yes'):
+        return True
+    try:
+        rate = float(os.getenv('PROFILE_RATE', '0'))
+    except ValueError:
+        return False
+    return rate > 0 and random.random() < rate
+
+
+def _frame_label(code) -> str:
+    """Readable label for a code object: last two path parts and function name"""
+    path = code.co_filename.replace('\\', '/').split('/')
+    return f"{'/'.join(path[-2:])}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack from a background thread
+
+    Cost is a stack walk every `interval` seconds on the sampler thread, so
+    it is safe to leave on for a fraction of production packages. Stacks
+    are kept in collapsed form (root;...;leaf -> samples), the input format
+    for flamegraph.pl and speedscope.
+    """
+    
+    def __init__(self, interval: float = 0.01, thread_id: Optional[int] = None, max_depth: int = 128):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started: Optional[float] = None
+    
+    def start(self):
+        """Start sampling the calling thread (or `thread_id`)"""
+        if self._thread is not None:
+            return
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='package-profiler', daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            del frame
+            
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+    
+    def stop(self):
+        """Stop sampling"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self._started
+    
+    def top_functions(self, limit: int = 25) -> List[Dict]:
+        """Functions by inclusive and self samples"""
+        inclusive: Counter = Counter()
+        exclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            exclusive[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        
+        total = self.samples or 1
+        return [
+            {
+                'function': label,
+                'samples': count,
+                'self_samples': exclusive.get(label, 0),
+                'percent': round(100 * count / total, 1),
+                'self_percent': round(100 * exclusive.get(label, 0) / total, 1)
+            }
+            for label, count in inclusive.most_common(limit)
+        ]
+    
+    def collapsed(self) -> str:
+        """Stacks in collapsed (folded) format"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+class AllocationTracker:
+    """tracemalloc snapshot for the lifetime of a package
+
+    tracemalloc is process-wide and slows every allocation while it runs,
+    so it is opt-in (PROFILE_MEMORY) and records one frame per allocation
+    by default. Concurrent trackers share one session, stopped when the
+    last of them finishes. The peak is process-wide too: when packages
+    overlap, each one's `peak_bytes` includes the others' allocations and
+    `overlapped` is set, so treat it as an upper bound.
+    """
+    
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+        self.current_bytes = 0
+        self.overlapped = False
+        self._active = False
+    
+    def start(self):
+        """Start tracing allocations"""
+        with _tracemalloc_lock:
+            if _active_trackers:
+                # Resetting the peak would clobber the other trackers' measurement
+                self.overlapped = True
+                for tracker in _active_trackers:
+                    tracker.overlapped = True
+            elif tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start(self.frames)
+            _active_trackers.append(self)
+        self._active = True
+    
+    def stop(self):
+        """Take the snapshot and release tracemalloc"""
+        if not self._active:
+            return
+        self._active = False
+        
+        self.snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        self.current_bytes, self.peak_bytes = tracemalloc.get_traced_memory()
+        
+        with _tracemalloc_lock:
+            _active_trackers.remove(self)
+            if not _active_trackers:
+                tracemalloc.stop()
+    
+    def top_allocations(self, limit: int = 25, key_type: str = 'lineno') -> List[Dict]:
+        """Largest live allocation sites at snapshot time"""
+        if self.snapshot is None:
+            return []
+        return [
+            {
+                'location': str(stat.traceback[0]) if stat.traceback else '?',
+                'size_bytes': stat.size,
+                'count': stat.count
+            }
+            for stat in self.snapshot.statistics(key_type)[:limit]
+        ]
+
+
+class PackageProfile:
+    """CPU samples and, with `memory`, an allocation snapshot for one content package"""
+    
+    def __init__(self, label: str, interval: float = 0.01, memory: bool = False):
+        self.label = label
+        self.cpu = SamplingProfiler(interval=interval)
+        self.memory = AllocationTracker() if memory else None
+    
+    def start(self):
+        """Start both profilers on the calling (event-loop) thread"""
+        if self.memory is not None:
+            self.memory.start()
+        self.cpu.start()
+    
+    def stop(self):
+        """Stop both profilers"""
+        self.cpu.stop()
+        if self.memory is not None:
+            self.memory.stop()
+    
+    def summary(self, limit: int = 25) -> Dict:
+        """JSON-friendly summary"""
+        summary = {
+            'label': self.label,
+            'cpu': {
+                'interval_seconds': self.cpu.interval,
+                'duration_seconds': round(self.cpu.duration, 3),
+                'samples': self.cpu.samples,
+                'top_functions': self.cpu.top_functions(limit)
+            }
+        }
+        if self.memory is not None:
+            summary['memory'] = {
+                'peak_bytes': self.memory.peak_bytes,
+                'peak_overlapped': self.memory.overlapped,
+                'current_bytes': self.memory.current_bytes,
+                'top_allocations': self.memory.top_allocations(limit)
+            }
+        return summary
+    
+    def write(self, output_dir: str, name: str) -> Tuple[str, str]:
+        """Write `<name>.collapsed` (flamegraph input) and `<name>.json`; returns both paths"""
+        os.makedirs(output_dir, exist_ok=True)
+        collapsed_path = os.path.join(output_dir, f'{name}.collapsed')
+        summary_path = os.path.join(output_dir, f'{name}.json')
+        
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            f.write(self.cpu.collapsed())
+        
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        
+        return collapsed_path, summary_path
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Prometheus - Text exposition of MetricsCollector for long-running workers
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import os
+import re
+import tempfile
+import threading
+
+from .metrics import MetricsCollector, parse_metric_key
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Unlabeled timers of the pipeline stages, rendered as one `stage_seconds` family
+PIPELINE_STAGES = ('research', 'content_creation', 'fact_checking', 'editing', 'seo', 'quality')
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_:]')
+
+# One /metrics server per (addr, port) and one textfile writer per path in this
+# process; an exporter started later takes them over
+_http_servers: Dict[Tuple[str, int], ThreadingHTTPServer] = {}
+_textfile_writers: Dict[str, Dict] = {}
+_shared_lock = threading.Lock()
+
+
+def _metric_name(*parts: str) -> str:
+    """Join and sanitize a Prometheus metric name"""
+    name = '_'.join(part for part in parts if part)
+    name = _INVALID_NAME_CHARS.sub('_', name)
+    return name if not name[:1].isdigit() else f'_{name}'
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Render a label set"""
+    if not labels:
+        return ''
+    parts = []
+    for label, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{_metric_name(label)}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value"""
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _group(keys) -> Dict[str, List[Tuple[str, Dict[str, str]]]]:
+    """Group series keys into metric families"""
+    families: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+    for key in sorted(keys):
+        name, labels = parse_metric_key(key)
+        families.setdefault(name, []).append((key, labels))
+    return families
+
+
+def render_metrics(collector: MetricsCollector,
+                   gauges: Optional[Dict[str, Callable[[], float]]] = None,
+                   namespace: str = 'content_factory',
+                   stages: Iterable[str] = PIPELINE_STAGES) -> str:
+    """Render a collector in Prometheus text exposition format
+
+    Timers named in `stages` become one summary family,
+    `<namespace>_stage_seconds{stage="..."}`. Every other metric, labeled
+    (see metric_key) or not, keeps its own name. Counters get a `_total`
+    suffix. `gauges` adds callables evaluated at scrape time, e.g. active
+    sessions.
+    """
+    lines = []
+    stages = frozenset(stages)
+    
+    stage_series = []
+    named_series = []
+    for key in collector.get_metric_names():
+        name, labels = parse_metric_key(key)
+        if not labels and name in stages:
+            stage_series.append((key, {'stage': name}))
+        else:
+            named_series.append(key)
+    
+    def add_summary(family: str, series):
+        lines.append(f'# TYPE {family} summary')
+        for key, labels in series:
+            stats = collector.get_metric_stats(key)
+            histogram = collector.get_histogram(key)
+            for quantile in QUANTILES:
+                value = histogram.percentile(quantile * 100) if histogram is not None and histogram.count else 0
+                lines.append(f'{family}{_format_labels({**labels, "quantile": str(quantile)})} {_format_value(value)}')
+            lines.append(f'{family}_sum{_format_labels(labels)} {_format_value(stats["total"])}')
+            lines.append(f'{family}_count{_format_labels(labels)} {stats["count"]}')
+    
+    if stage_series:
+        add_summary(_metric_name(namespace, 'stage_seconds'), stage_series)
+    
+    for name, series in _group(named_series).items():
+        add_summary(_metric_name(namespace, name), series)
+    
+    counters = collector.get_all_counters()
+    for name, series in _group(counters).items():
+        family = _metric_name(namespace, name[:-6] if name.endswith('_total') else name)
+        lines.append(f'# TYPE {family}_total counter')
+        for key, labels in series:
+            lines.append(f'{family}_total{_format_labels(labels)} {_format_value(counters[key])}')
+    
+    gauge_values = collector.get_all_gauges()
+    for name, read in (gauges or {}).items():
+        try:
+            gauge_values[name] = read()
+        except Exception:
+            continue
+    
+    for name, series in _group(gauge_values).items():
+        family = _metric_name(namespace, name)
+        lines.append(f'# TYPE {family} gauge')
+        for key, labels in series:
+            lines.append(f'{family}{_format_labels(labels)} {_format_value(gauge_values[key])}')
+    
+    return '\n'.join(lines) + '\n'
+
+
+def counter_ratio(collector: MetricsCollector, numerator: str,
+                  denominator: str) -> Callable[[], float]:
+    """Gauge callable: one counter family's total over another's, across all labels"""
+    def ratio() -> float:
+        totals = {numerator: 0, denominator: 0}
+        for key, value in collector.get_all_counters().items():
+            name = parse_metric_key(key)[0]
+            if name in totals:
+                totals[name] += value
+        return totals[numerator] / totals[denominator] if totals[denominator] else 0.0
+    return ratio
+
+
+class PrometheusExporter:
+    """Expose a MetricsCollector over HTTP and/or a node_exporter textfile
+
+    `start_http_server(port)` serves /metrics from a daemon thread;
+    `start_textfile_writer(path, interval)` atomically rewrites a .prom file
+    for node_exporter's textfile collector. Both render on demand, so the
+    pipeline itself never waits on a scrape. Servers are shared per port
+    and writers per path within a process: an exporter started on a port
+    or path already in use takes it over instead of starting another.
+    """
+    
+    def __init__(self, collector: MetricsCollector,
+                 gauges: Optional[Dict[str, Callable[[], float]]] = None,
+                 namespace: str = 'content_factory'):
+        self.collector = collector
+        self.gauges = gauges or {}
+        self.namespace = namespace
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._writer: Optional[Dict] = None
+    
+    def render(self) -> str:
+        """Current metrics in exposition format"""
+        return render_metrics(self.collector, self.gauges, self.namespace)
+    
+    def write_textfile(self, path: str):
+        """Atomically write the current metrics to `path`"""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def start_textfile_writer(self, path: str, interval: float = 15.0):
+        """Rewrite the textfile every `interval` seconds on a daemon thread"""
+        if self._writer is not None:
+            return
+        
+        with _shared_lock:
+            writer = _textfile_writers.get(path)
+            if writer is not None:
+                writer['exporter'] = self
+                self._writer = writer
+                return
+            writer = self._writer = _textfile_writers[path] = {'exporter': self, 'stop': threading.Event()}
+        
+        def write_loop():
+            while not writer['stop'].wait(interval):
+                try:
+                    writer['exporter'].write_textfile(path)
+                except OSError:
+                    continue
+        
+        threading.Thread(target=write_loop, name='metrics-textfile', daemon=True).start()
+    
+    def start_http_server(self, port: int = 9464, addr: str = '0.0.0.0') -> int:
+        """Serve /metrics on a daemon thread, returning the bound port"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        
+        with _shared_lock:
+            server = _http_servers.get((addr, port)) if port else None
+            if server is not None:
+                server.exporter = self
+                self._server = server
+                return port
+            
+            self._server = self._bind(addr, port)
+            _http_servers[(addr, self._server.server_address[1])] = self._server
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        return self._server.server_address[1]
+    
+    def _bind(self, addr: str, port: int) -> ThreadingHTTPServer:
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = self.server.exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((addr, port), MetricsHandler)
+        server.daemon_threads = True
+        server.exporter = self
+        return server
+    
+    def stop(self):
+        """Stop the HTTP server (unless another exporter took it over) and textfile writer"""
+        server, self._server = self._server, None
+        if server is not None:
+            with _shared_lock:
+                if server.exporter is not self:
+                    server = None
+                else:
+                    for key in [key for key, value in _http_servers.items() if value is server]:
+                        del _http_servers[key]
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            with _shared_lock:
+                if writer['exporter'] is self:
+                    writer['stop'].set()
+                    for path in [path for path, value in _textfile_writers.items() if value is writer]:
+                        del _textfile_writers[path]
\ No newline at end of file
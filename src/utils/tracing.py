@@ -0,0 +1,400 @@
+"""
+Tracing - OpenTelemetry spans for packages, stages and model calls
+"""
+
+from typing import Any, Dict, Iterator, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import os
+import re
+import threading
+import time
+
+from .logger import log_context
+from .metrics import MetricsCollector, metric_key
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SpanExporter,
+        SpanExportResult
+    )
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+    SpanExporter = object
+
+TRACER_NAME = 'content_factory'
+
+_current_stage: ContextVar[Optional[str]] = ContextVar('tracing_stage', default=None)
+_provider = None
+_setup_lock = threading.Lock()
+_configured_exporters = set()
+_STATUS_PATTERN = re.compile(r'\b(429|5\d\d|4\d\d)\b')
+
+
+class _NoopSpan:
+    """Stand-in span used when OpenTelemetry is not installed"""
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+    
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+    
+    def record_exception(self, exception: BaseException):
+        pass
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Offline exporter writing one JSON object per finished span"""
+    
+    def __init__(self, path: str = 'logs/traces.jsonl'):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def _span_to_dict(span) -> Dict:
+        """Flatten a ReadableSpan"""
+        context = span.get_span_context()
+        return {
+            'name': span.name,
+            'trace_id': format(context.trace_id, '032x'),
+            'span_id': format(context.span_id, '016x'),
+            'parent_id': format(span.parent.span_id, '016x') if span.parent else None,
+            'start_time_ns': span.start_time,
+            'end_time_ns': span.end_time,
+            'duration_ms': round((span.end_time - span.start_time) / 1e6, 3),
+            'status': span.status.status_code.name,
+            'attributes': dict(span.attributes or {}),
+            'events': [
+                {'name': event.name, 'timestamp_ns': event.timestamp, 'attributes': dict(event.attributes or {})}
+                for event in span.events
+            ]
+        }
+    
+    def export(self, spans) -> 'SpanExportResult':
+        """Append spans to the file"""
+        lines = [json.dumps(self._span_to_dict(span), default=str) for span in spans]
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        return SpanExportResult.SUCCESS
+    
+    def shutdown(self):
+        pass
+
+
+def _otlp_exporter(endpoint: Optional[str]):
+    """OTLP exporter, if opentelemetry-exporter-otlp is installed"""
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            return None
+    return OTLPSpanExporter(endpoint=endpoint) if endpoint else OTLPSpanExporter()
+
+
+def setup_tracing(exporter: Optional[str] = None, path: Optional[str] = None,
+                  endpoint: Optional[str] = None, service_name: str = 'content-factory-ai') -> bool:
+    """Install a tracer provider and exporter
+
+    `exporter` is one of 'console', 'file', 'otlp' or 'none' and defaults to
+    TRACING_EXPORTER. The file exporter writes JSON lines to `path`
+    (TRACING_FILE, default logs/traces.jsonl); OTLP uses `endpoint` or the
+    standard OTEL_EXPORTER_OTLP_* variables. Safe to call more than once;
+    returns whether spans are being exported.
+    """
+    global _provider
+    
+    exporter = (exporter or os.getenv('TRACING_EXPORTER', 'none')).lower()
+    if exporter in ('', 'none', 'off') or not OTEL_AVAILABLE:
+        return False
+    
+    with _setup_lock:
+        key = (exporter, path, endpoint)
+        if key in _configured_exporters:
+            return True
+        
+        if exporter == 'console':
+            span_exporter = ConsoleSpanExporter()
+        elif exporter == 'file':
+            span_exporter = JsonLinesSpanExporter(path or os.getenv('TRACING_FILE', 'logs/traces.jsonl'))
+        elif exporter == 'otlp':
+            span_exporter = _otlp_exporter(endpoint)
+            if span_exporter is None:
+                raise ValueError("TRACING_EXPORTER=otlp requires opentelemetry-exporter-otlp")
+        else:
+            raise ValueError(f"Unknown tracing exporter: {exporter}")
+        
+        if _provider is None:
+            _provider = TracerProvider(resource=Resource.create({'service.name': service_name}))
+            trace.set_tracer_provider(_provider)
+        
+        _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        _configured_exporters.add(key)
+        return True
+
+
+def flush_tracing(timeout_millis: int = 30000) -> bool:
+    """Export any buffered spans"""
+    if _provider is None:
+        return True
+    return _provider.force_flush(timeout_millis)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """Open a span as the current span, with optional attributes"""
+    if not OTEL_AVAILABLE:
+        yield _NoopSpan()
+        return
+    
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(name) as current:
+        for key, value in attributes.items():
+            if value is not None:
+                current.set_attribute(key, value)
+        yield current
+
+
+@contextmanager
+def stage_span(stage: str, **attributes) -> Iterator[Any]:
+    """Span for one pipeline stage; model calls and log records inside it are tagged with the stage"""
+    token = _current_stage.set(stage)
+    try:
+        with log_context(stage=stage):
+            with span(f'stage.{stage}', **{'content_factory.stage': stage}, **attributes) as current:
+                yield current
+    finally:
+        _current_stage.reset(token)
+
+
+def get_current_stage() -> Optional[str]:
+    """Stage of the innermost active stage_span"""
+    return _current_stage.get()
+
+
+def get_current_span() -> Any:
+    """Active span, or a no-op span"""
+    if not OTEL_AVAILABLE:
+        return _NoopSpan()
+    return trace.get_current_span()
+
+
+def payload_size(value: Any) -> int:
+    """Approximate character count of a prompt or contents argument"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    text = getattr(value, 'text', None)
+    if isinstance(text, str):
+        return len(text)
+    parts = getattr(value, 'parts', None)
+    if parts:
+        return sum(payload_size(part) for part in parts)
+    return len(str(value))
+
+
+def record_response(current: Any, response: Any):
+    """Copy token usage, cache hits and response size onto a model-call span"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        for attribute, field in (
+            ('gen_ai.usage.input_tokens', 'prompt_token_count'),
+            ('gen_ai.usage.output_tokens', 'candidates_token_count'),
+            ('gen_ai.usage.total_tokens', 'total_token_count'),
+            ('gen_ai.usage.cached_tokens', 'cached_content_token_count')
+        ):
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                current.set_attribute(attribute, value)
+        cached = getattr(usage, 'cached_content_token_count', None)
+        current.set_attribute('gen_ai.cache_hit', bool(isinstance(cached, int) and cached > 0))
+    
+    try:
+        text = response.text
+    except Exception:
+        text = None
+    if isinstance(text, str):
+        current.set_attribute('gen_ai.response.chars', len(text))
+
+
+@contextmanager
+def model_call_span(model: Optional[str], contents: Any, config: Any = None,
+                    operation: str = 'generate_content') -> Iterator[Any]:
+    """Span around one model call"""
+    attributes = {
+        'gen_ai.system': 'gemini',
+        'gen_ai.operation.name': operation,
+        'gen_ai.request.model': model,
+        'gen_ai.request.chars': payload_size(contents),
+        'content_factory.stage': get_current_stage()
+    }
+    system_instruction = getattr(config, 'system_instruction', None)
+    if system_instruction is not None:
+        attributes['gen_ai.request.system_chars'] = payload_size(system_instruction)
+    temperature = getattr(config, 'temperature', None)
+    if isinstance(temperature, (int, float)):
+        attributes['gen_ai.request.temperature'] = temperature
+    
+    with span(f'gen_ai.{operation}', **attributes) as current:
+        yield current
+
+
+def error_status(error: BaseException) -> str:
+    """Short status label for a failed model call (HTTP code when known)"""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return str(code)
+    match = _STATUS_PATTERN.search(str(error))
+    return match.group(0) if match else 'error'
+
+
+def record_model_call(metrics: MetricsCollector, model: Optional[str], status: str,
+                      elapsed: float, response: Any = None):
+    """Count a model call by status and record its latency and token usage"""
+    model = model or 'unknown'
+    metrics.increment_counter(metric_key('model_calls', model=model, status=status))
+    metrics.record_metric(metric_key('model_call_seconds', model=model), elapsed)
+    
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    for kind, field in (('input', 'prompt_token_count'), ('output', 'candidates_token_count'),
+                        ('cached', 'cached_content_token_count')):
+        value = getattr(usage, field, None)
+        if isinstance(value, int) and value:
+            metrics.increment_counter(metric_key('model_tokens', model=model, type=kind), value)
+    cached = getattr(usage, 'cached_content_token_count', None)
+    if isinstance(cached, int) and cached > 0:
+        metrics.increment_counter(metric_key('model_cache_hits', model=model))
+
+
+class _ModelCall:
+    """Span plus outcome of one in-flight model call"""
+    
+    def __init__(self, current: Any):
+        self.span = current
+        self.response = None
+        self.chars: Optional[int] = None
+
+
+class _TracedModels:
+    """Wraps `client.models` so each call gets a model-call span"""
+    
+    def __init__(self, models: Any, metrics: Optional[MetricsCollector] = None):
+        self._models = models
+        self._metrics = metrics
+    
+    @contextmanager
+    def _observe(self, kwargs: Dict, operation: str = 'generate_content') -> Iterator[_ModelCall]:
+        """Span, status and metrics around one call"""
+        model = kwargs.get('model')
+        status = 'ok'
+        start = time.perf_counter()
+        with log_context(model=model):
+            with model_call_span(model, kwargs.get('contents'), kwargs.get('config'), operation) as current:
+                call = _ModelCall(current)
+                try:
+                    yield call
+                except Exception as e:
+                    status = error_status(e)
+                    current.set_attribute('error.type', status)
+                    raise
+                finally:
+                    if call.response is not None:
+                        record_response(current, call.response)
+                    if call.chars is not None:
+                        current.set_attribute('gen_ai.response.chars', call.chars)
+                    if self._metrics is not None:
+                        record_model_call(self._metrics, model, status, time.perf_counter() - start, call.response)
+    
+    def generate_content(self, *args, **kwargs):
+        with self._observe(kwargs) as call:
+            call.response = self._models.generate_content(*args, **kwargs)
+            return call.response
+    
+    def generate_content_stream(self, *args, **kwargs):
+        with self._observe(kwargs, 'generate_content_stream') as call:
+            call.chars = 0
+            for chunk in self._models.generate_content_stream(*args, **kwargs):
+                call.response = chunk
+                call.chars += len(getattr(chunk, 'text', None) or '')
+                yield chunk
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._models, name)
+
+
+class _AsyncTracedModels(_TracedModels):
+    """Async counterpart for `client.aio.models`"""
+    
+    async def generate_content(self, *args, **kwargs):
+        with self._observe(kwargs) as call:
+            call.response = await self._models.generate_content(*args, **kwargs)
+            return call.response
+    
+    async def generate_content_stream(self, *args, **kwargs):
+        stream = await self._models.generate_content_stream(*args, **kwargs)
+        return self._traced_stream(stream, kwargs)
+    
+    async def _traced_stream(self, stream, kwargs: Dict):
+        with self._observe(kwargs, 'generate_content_stream') as call:
+            call.chars = 0
+            async for chunk in stream:
+                call.response = chunk
+                call.chars += len(getattr(chunk, 'text', None) or '')
+                yield chunk
+
+
+class _TracedAio:
+    """Wraps `client.aio`"""
+    
+    def __init__(self, aio: Any, metrics: Optional[MetricsCollector] = None):
+        self._aio = aio
+        self.models = _AsyncTracedModels(aio.models, metrics)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._aio, name)
+
+
+class TracedClient:
+    """genai.Client proxy that records a span for every model call
+
+    Agents keep calling `client.models.generate_content(...)`; the span
+    lands under whichever package/stage span is current, so overlapping
+    stages show up as overlapping children in the trace. With `metrics`,
+    calls are also counted by model and status, with latency and tokens.
+    """
+    
+    def __init__(self, client: Any, metrics: Optional[MetricsCollector] = None):
+        self._client = client
+        self._metrics = metrics
+        self.models = _TracedModels(client.models, metrics)
+        self._aio = None
+    
+    @property
+    def aio(self) -> _TracedAio:
+        if self._aio is None:
+            self._aio = _TracedAio(self._client.aio, self._metrics)
+        return self._aio
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
\ No newline at end of file
@@ -2,20 +2,26 @@
 Content Validator - Validate content quality and requirements
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Union
 import re
 
+import pandas as pd
+
+from tools.batch import score_batch
+from tools.text_analysis import TextDocument
+
 
 class ContentValidator:
     """Validate content against quality standards"""
     
     @staticmethod
-    def validate_blog_post(content: str, min_words: int = 1500, max_words: int = 2500) -> Dict:
+    def validate_blog_post(content: Union[str, TextDocument], min_words: int = 1500, max_words: int = 2500) -> Dict:
         """Validate blog post meets requirements"""
-        word_count = len(content.split())
-        has_title = bool(re.search(r'^#\s+.+$', content, re.MULTILINE))
-        has_headers = bool(re.search(r'^##\s+.+$', content, re.MULTILINE))
-        has_content = len(content.strip()) > 0
+        doc = TextDocument.of(content)
+        word_count = doc.word_count
+        has_title = bool(doc.headers_at(1))
+        has_headers = bool(doc.headers_at(2))
+        has_content = word_count > 0
         
         issues = []
         if word_count < min_words:
@@ -99,13 +105,15 @@ class ContentValidator:
         }
     
     @staticmethod
-    def validate_email(content: str) -> Dict:
+    def validate_email(content: Union[str, TextDocument]) -> Dict:
         """Validate email newsletter"""
-        has_subject = 'Subject:' in content or 'SUBJECT LINE' in content.upper()
+        doc = TextDocument.of(content)
+        content = doc.text
+        has_subject = 'Subject:' in content or doc.contains('SUBJECT LINE')
         has_body = len(content) > 100
-        has_cta = any(word in content.upper() for word in ['CLICK', 'LEARN MORE', 'READ', 'GET', 'DOWNLOAD'])
+        has_cta = any(doc.contains(word) for word in ['CLICK', 'LEARN MORE', 'READ', 'GET', 'DOWNLOAD'])
         
-        word_count = len(content.split())
+        word_count = doc.word_count
         optimal_length = 300 <= word_count <= 600
         
         issues = []
@@ -132,13 +140,15 @@ class ContentValidator:
         }
     
     @staticmethod
-    def validate_video_script(content: str) -> Dict:
+    def validate_video_script(content: Union[str, TextDocument]) -> Dict:
         """Validate video script"""
+        doc = TextDocument.of(content)
+        content = doc.text
         has_timestamps = bool(re.search(r'\[\d{2}:\d{2}\]', content))
         has_hook = '[00:00]' in content or '[0:00]' in content
         has_sections = content.count('[') >= 3
         
-        word_count = len(content.split())
+        word_count = doc.word_count
         duration_estimate = word_count / 150
         
         issues = []
@@ -197,4 +207,24 @@ class ContentValidator:
             'all_valid': all_valid,
             'total_issues': total_issues,
             'results': results
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def validate_batch(contents: Sequence[Union[str, TextDocument]], content_type: str,
+                       workers: Optional[int] = None) -> pd.DataFrame:
+        """Validate many pieces of one content type, one row per piece
+        
+        `content_type` is 'blog', 'email', 'video_script' or a social
+        platform ('linkedin', 'twitter', 'instagram').
+        """
+        if content_type == 'blog':
+            return score_batch(ContentValidator.validate_blog_post, [(content,) for content in contents], workers)
+        if content_type == 'email':
+            return score_batch(ContentValidator.validate_email, [(content,) for content in contents], workers)
+        if content_type == 'video_script':
+            return score_batch(ContentValidator.validate_video_script, [(content,) for content in contents], workers)
+        return score_batch(
+            ContentValidator.validate_social_post,
+            [(TextDocument.of(content).text, content_type) for content in contents],
+            workers
+        )
\ No newline at end of file
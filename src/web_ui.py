@@ -117,6 +117,13 @@ class StreamlitContentFactory:
             if progress_callback:
                 progress_callback(f"Error: {str(e)[:50]}", 0.0)
             raise
+        
+        finally:
+            # Each click runs in its own asyncio.run loop, so release the CPU pools,
+            # loop monitor and metrics exporter with it
+            if self.orchestrator:
+                await self.orchestrator.cleanup()
+                self.orchestrator = None
 
 
 def create_metrics_dashboard(metrics):
@@ -360,15 +367,15 @@ I write as a seasoned technology executive with 20 years of experience. My tone
         """)
         
         # Stats
-        if os.path.exists('memory/memory.json'):
-            try:
-                with open('memory/memory.json', 'r') as f:
-                    memory = json.load(f)
-                    history = memory.get('content_history', [])
-                    if history:
-                        st.metric("📈 Total Generated", len(history))
-            except:
-                pass
+        from memory.history_stats import load_history_stats
+        
+        if os.path.exists('memory/memory.json') and not os.path.exists('memory/history_stats.json'):
+            from memory.memory_bank import MemoryBank
+            MemoryBank(storage_path='memory')  # builds aggregates for existing history
+        
+        history_stats = load_history_stats('memory')
+        if history_stats.count:
+            st.metric("📈 Total Generated", history_stats.count)
     
     # Determine selected voice
     if st.session_state.get('use_predefined', True):
@@ -521,39 +528,35 @@ I write as a seasoned technology executive with 20 years of experience. My tone
     with tab2:
         st.header("📊 Analytics Dashboard")
         
-        if os.path.exists('memory/memory.json'):
+        if os.path.exists('memory/history_stats.json'):
             try:
-                with open('memory/memory.json', 'r') as f:
-                    memory = json.load(f)
-                    history = memory.get('content_history', [])
+                history_stats = load_history_stats('memory')
                 
-                if history:
-                    st.success(f"Found {len(history)} content pieces")
+                if history_stats.count:
+                    st.success(f"Found {history_stats.count} content pieces")
                     
-                    word_counts = []
-                    seo_scores = []
-                    dates = []
-                    
-                    for item in history[-20:]:
-                        metrics = item.get('metrics', {})
-                        word_counts.append(metrics.get('blog_word_count', 0))
-                        seo_scores.append(metrics.get('seo_score', 0))
-                        dates.append(item.get('timestamp', '')[:10])
+                    daily = list(history_stats.days().items())[-20:]
+                    dates = [day for day, _ in daily]
+                    word_counts = [rollup['averages'].get('blog_word_count', 0) for _, rollup in daily]
+                    seo_scores = [rollup['averages'].get('seo_score', 0) for _, rollup in daily]
                     
-                    if word_counts:
-                        fig1 = px.line(x=dates, y=word_counts, title="Word Count Trend")
+                    if dates:
+                        fig1 = px.line(x=dates, y=word_counts, title="Word Count Trend (daily average)")
                         st.plotly_chart(fig1, width='stretch')
                         
-                        fig2 = px.line(x=dates, y=seo_scores, title="SEO Score Trend")
+                        fig2 = px.line(x=dates, y=seo_scores, title="SEO Score Trend (daily average)")
                         st.plotly_chart(fig2, width='stretch')
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Avg Words", f"{sum(word_counts)/len(word_counts):.0f}")
-                        with col2:
-                            st.metric("Avg SEO", f"{sum(seo_scores)/len(seo_scores):.1f}")
-                        with col3:
-                            st.metric("Total", len(history))
+                    
+                    word_stats = history_stats.metric('blog_word_count')
+                    seo_stats = history_stats.metric('seo_score')
+                    
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Avg Words", f"{word_stats['mean']:.0f}")
+                    with col2:
+                        st.metric("Avg SEO", f"{seo_stats['mean']:.1f}")
+                    with col3:
+                        st.metric("Total", history_stats.count)
                 else:
                     st.info("No data yet")
             except Exception as e:
@@ -12,6 +12,12 @@ from src.agents.blog_writer_agent import BlogWriterAgent
 from src.agents.fact_checker_agent import FactCheckerAgent
 from src.agents.editor_agent import EditorAgent
 from src.agents.seo_agent import SEOAgent
+from src.memory.file_lock import FileLockTimeout
+from src.memory.research_index import ResearchIndex
+from src.testing import (
+    Cassette, CassetteMiss, FakeGeminiClient, LatencyProfile, RecordingClient, ReplayClient
+)
+from google.genai import errors, types
 
 
 @pytest.fixture
@@ -181,4 +187,161 @@ async def test_agent_workflow_integration(mock_client, mock_response):
     blog = await blog_writer.write(research['brief'], {"tone": "professional"}, "session_001")
     
     assert blog['content']
-    assert blog['word_count'] > 0
\ No newline at end of file
+    assert blog['word_count'] > 0
+
+
+class TestFakeGeminiClient:
+    """Test the offline fake client against real agents"""
+    
+    @pytest.mark.asyncio
+    async def test_agents_parse_fake_responses(self):
+        """Test templated responses satisfy each agent's parser"""
+        client = FakeGeminiClient(time_scale=0)
+        
+        research = await ResearchAgent(client, "gemini-2.5-flash").research("Edge AI", "s1")
+        seo = await SEOAgent(client, "gemini-2.5-flash").optimize("# Post\n\nBody text", "Edge AI", "s1")
+        
+        assert "Edge AI" in research['brief']
+        assert research['sources']
+        assert seo['keywords']['primary'] == "Edge AI"
+        assert "Body text" in seo['optimized_content']
+        assert [call.agent for call in client.calls] == ['research', 'seo']
+    
+    @pytest.mark.asyncio
+    async def test_research_builds_on_prior_briefs(self, tmp_path):
+        """Test research results are indexed and passed to later related research"""
+        client = FakeGeminiClient(time_scale=0)
+        agent = ResearchAgent(client, "gemini-2.5-flash", research_index=ResearchIndex(str(tmp_path)))
+        
+        await agent.research("Edge AI", "s1")
+        await agent.research("Edge AI hardware", "s2")
+        
+        assert agent.research_index.count > 0
+        assert client.calls[1].prompt_chars > client.calls[0].prompt_chars
+        assert agent.research_index.search("Edge AI")[0]['topic'] == "Edge AI"
+    
+    @pytest.mark.asyncio
+    async def test_research_survives_index_failures(self):
+        """Test a locked research index does not fail the research itself"""
+        client = FakeGeminiClient(time_scale=0)
+        index = Mock()
+        index.search.side_effect = FileLockTimeout("Timed out waiting for lock")
+        index.add_research.side_effect = FileLockTimeout("Timed out waiting for lock")
+        agent = ResearchAgent(client, "gemini-2.5-flash", research_index=index)
+        
+        result = await agent.research("Edge AI", "s1")
+        
+        assert result['brief']
+        assert index.search.called and index.add_research.called
+    
+    def test_injected_rate_limit_has_retry_delay(self):
+        """Test 429 faults look like the real SDK error"""
+        client = FakeGeminiClient(time_scale=0, retry_delay=7)
+        client.fail_next(429)
+        
+        with pytest.raises(errors.ClientError) as excinfo:
+            client.models.generate_content(model="gemini-2.5-flash", contents="hi")
+        
+        assert excinfo.value.code == 429
+        assert "429" in str(excinfo.value)
+        assert excinfo.value.details['error']['details'][0]['retryDelay'] == '7s'
+        assert client.models.generate_content(model="gemini-2.5-flash", contents="hi").text
+    
+    def test_seeded_runs_are_deterministic(self):
+        """Test the same seed gives the same faults, latencies and truncation"""
+        def run():
+            client = FakeGeminiClient(
+                latency=LatencyProfile(median=1.0, p99=5.0), time_scale=0,
+                rate_limit_rate=0.2, unavailable_rate=0.1, truncation_rate=0.2, seed=42
+            )
+            for _ in range(30):
+                try:
+                    client.models.generate_content(model="gemini-2.5-flash", contents="hi")
+                except errors.APIError:
+                    pass
+            return [(call.status, call.truncated) for call in client.calls]
+        
+        outcomes = run()
+        assert outcomes == run()
+        assert {'ok', '429', '503'} <= {status for status, _ in outcomes}
+        assert any(truncated for _, truncated in outcomes)
+    
+    def test_truncation_sets_finish_reason(self):
+        """Test truncated responses report MAX_TOKENS and usage"""
+        client = FakeGeminiClient(time_scale=0, truncation_rate=1.0)
+        response = client.models.generate_content(model="gemini-2.5-flash", contents="hi")
+        
+        assert response.candidates[0].finish_reason == types.FinishReason.MAX_TOKENS
+        assert response.usage_metadata.candidates_token_count > 0
+    
+    @pytest.mark.asyncio
+    async def test_async_and_stream_surfaces(self):
+        """Test aio and streaming variants return the same text"""
+        client = FakeGeminiClient(time_scale=0, stream_chunk_chars=50)
+        
+        full = await client.aio.models.generate_content(model="m", contents="x")
+        chunks = [chunk.text for chunk in client.models.generate_content_stream(model="m", contents="x")]
+        stream = await client.aio.models.generate_content_stream(model="m", contents="x")
+        async_chunks = [chunk.text async for chunk in stream]
+        
+        assert ''.join(chunks) == full.text
+        assert ''.join(async_chunks) == full.text
+
+
+class TestCassette:
+    """Test record and replay of model calls"""
+    
+    @pytest.mark.asyncio
+    async def test_recorded_run_replays_identically(self, tmp_path):
+        """Test agents get the recorded responses and errors back, in order"""
+        fake = FakeGeminiClient(time_scale=0, retry_delay=3)
+        fake.fail_next(429)
+        recorder = RecordingClient(fake)
+        
+        with pytest.raises(errors.ClientError):
+            recorder.models.generate_content(model="gemini-2.5-flash", contents="hi")
+        recorded = await ResearchAgent(recorder, "gemini-2.5-flash").research("Edge AI", "s1")
+        path = str(tmp_path / "run.json.gz")
+        recorder.save(path)
+        
+        replay = ReplayClient.load(path, strict=True)
+        with pytest.raises(errors.ClientError) as excinfo:
+            replay.models.generate_content(model="gemini-2.5-flash", contents="hi")
+        replayed = await ResearchAgent(replay, "gemini-2.5-flash").research("Edge AI", "s1")
+        
+        assert excinfo.value.code == 429
+        assert excinfo.value.details['error']['details'][0]['retryDelay'] == '3s'
+        assert replayed == recorded
+        assert replay.stats == {'exact': 2, 'fallback': 0}
+        assert [call.agent for call in replay.calls] == ['unknown', 'research']
+    
+    def test_changed_prompt_falls_back_to_stage_order(self):
+        """Test non-strict replay serves the next recording for the agent"""
+        cassette = Cassette()
+        recorder = RecordingClient(FakeGeminiClient(time_scale=0), cassette)
+        recorder.models.generate_content(model="m", contents="first prompt")
+        
+        replay = ReplayClient(cassette)
+        response = replay.models.generate_content(model="m", contents="a prompt never recorded")
+        
+        assert response.text == cassette.entries[0]['text']
+        assert replay.stats['fallback'] == 1
+        with pytest.raises(CassetteMiss):
+            ReplayClient(cassette, strict=True).models.generate_content(model="m", contents="other")
+    
+    @pytest.mark.asyncio
+    async def test_stream_and_latency_replay(self):
+        """Test streamed chunks replay with the recorded timing"""
+        recorder = RecordingClient(FakeGeminiClient(time_scale=0, stream_chunk_chars=50))
+        stream = await recorder.aio.models.generate_content_stream(model="m", contents="x")
+        recorded = [chunk.text async for chunk in stream]
+        recorder.cassette.entries[0]['latency'] = 0.2
+        
+        replay = ReplayClient(recorder.cassette, replay_latency=True, time_scale=0.5)
+        start = asyncio.get_running_loop().time()
+        stream = await replay.aio.models.generate_content_stream(model="m", contents="x")
+        replayed = [chunk.text async for chunk in stream]
+        
+        assert replayed == recorded
+        assert asyncio.get_running_loop().time() - start >= 0.09
+        assert recorder.cassette.summary()['unknown']['calls'] == 1
\ No newline at end of file
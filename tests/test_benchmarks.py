@@ -0,0 +1,101 @@
+"""
+Smoke tests for benchmark harnesses
+"""
+
+from benchmarks.pipeline_bench import find_regressions as find_pipeline_regressions, run_scenario
+from benchmarks.tools_bench import find_regressions, load_corpus, main, run
+
+
+class TestPipelineBenchmark:
+    """Test the pipeline benchmark harness"""
+    
+    def test_scenario_reports_all_fields(self, monkeypatch, tmp_path):
+        """Test one tiny scenario runs end to end on the fake backend"""
+        # run_scenario sets these for the pipeline; monkeypatch restores them afterwards
+        monkeypatch.setenv('LOG_DIR', str(tmp_path))
+        monkeypatch.setenv('TRACING_EXPORTER', 'none')
+        monkeypatch.setenv('LOOP_MONITOR', 'true')
+        monkeypatch.setenv('CPU_EXECUTOR', 'thread')
+        result = run_scenario({
+            'concurrency': 2,
+            'platforms': ('blog', 'linkedin'),
+            'error_rate': 0.0,
+            'packages': 2,
+            'time_scale': 0.0,
+            'step_delay': 0.0,
+            'retry_delay': 0.0,
+            'seed': 0
+        })
+        
+        assert result['completed'] == 2
+        assert result['failed'] == 0
+        assert result['packages_per_hour'] > 0
+        assert result['model_calls_per_package'] >= 6
+        assert 'research' in result['stages']
+        assert result['peak_rss_mb'] > 0
+    
+    def test_find_regressions_applies_thresholds(self):
+        """Test each metric is held to its own threshold"""
+        baseline = {'scenarios': [{
+            'name': 'c1-blog-err0', 'packages_per_hour': 100.0, 'p99_latency_seconds': 1.0,
+            'model_calls_per_package': 6.0, 'event_loop_p99_lag_seconds': 0.01
+        }]}
+        results = [{
+            'name': 'c1-blog-err0', 'packages_per_hour': 90.0, 'p99_latency_seconds': 1.5,
+            'model_calls_per_package': 7.0, 'event_loop_p99_lag_seconds': 0.015
+        }]
+        
+        regressions = find_pipeline_regressions(
+            results, baseline, {'max_slowdown': 25, 'max_overhead': 10, 'max_lag_growth': 100}
+        )
+        
+        assert {row['metric'] for row in regressions} == {'p99_latency_seconds', 'model_calls_per_package'}
+
+
+class TestToolsBenchmark:
+    """Test the text-analysis micro-benchmarks"""
+    
+    def test_corpus_spans_tweet_to_long_post(self):
+        """Test inputs grow from a tweet to the requested long post"""
+        corpus = load_corpus(long_words=5000)
+        
+        assert len(corpus['tweet']) <= 400
+        assert len(corpus['long'].split()) >= 4500
+        assert len(corpus['tweet']) < len(corpus['email']) < len(corpus['blog']) < len(corpus['long'])
+    
+    def test_run_reports_throughput_and_allocations(self):
+        """Test a filtered run measures ops/sec and allocation"""
+        results = run('seo.analyze_keyword_density', min_time=0.01, repeat=1)
+        
+        assert len(results) == 5
+        assert all(result['ops_per_sec'] > 0 for result in results)
+        assert all(result['relative_ops'] > 0 for result in results)
+        assert all(result['peak_alloc_bytes'] >= 0 for result in results)
+    
+    def test_find_regressions_applies_thresholds(self):
+        """Test only changes past the thresholds are reported, with throughput relative to calibration"""
+        baseline = {'cases': [
+            {'name': 'a', 'ops_per_sec': 1000.0, 'relative_ops': 1.0, 'peak_alloc_bytes': 1000},
+            {'name': 'b', 'ops_per_sec': 1000.0, 'relative_ops': 1.0, 'peak_alloc_bytes': 1000}
+        ]}
+        results = [
+            # Half the raw speed on a machine half as fast is not a regression
+            {'name': 'a', 'ops_per_sec': 500.0, 'relative_ops': 0.95, 'peak_alloc_bytes': 1100},
+            {'name': 'b', 'ops_per_sec': 700.0, 'relative_ops': 0.7, 'peak_alloc_bytes': 2000},
+            {'name': 'new', 'ops_per_sec': 1.0, 'relative_ops': 0.001, 'peak_alloc_bytes': 1}
+        ]
+        
+        regressions = find_regressions(results, baseline, max_slowdown=15, max_alloc_growth=25)
+        
+        assert {(row['name'], row['metric']) for row in regressions} == {
+            ('b', 'relative_ops'), ('b', 'peak_alloc_bytes')
+        }
+    
+    def test_missing_baseline_fails(self, tmp_path):
+        """Test the gate exits non-zero when there is no baseline to compare with"""
+        status = main([
+            '--filter', 'seo.analyze_keyword_density', '--min-time', '0.01', '--repeat', '1',
+            '--baseline', str(tmp_path / 'missing.json'), '--output', str(tmp_path / 'tools.json')
+        ])
+        
+        assert status == 2
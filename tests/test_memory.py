@@ -6,8 +6,18 @@ import pytest
 import os
 import tempfile
 import shutil
+import sqlite3
+import sys
+import multiprocessing
+import threading
+import time
+from datetime import datetime, timedelta
 from src.memory.memory_bank import MemoryBank
+from src.memory.history_stats import load_history_stats
+from src.memory.retention import RetentionPolicy
+from src.memory.research_index import ResearchIndex
 from src.memory.session_service import SessionService, Session
+from src.memory.sqlite_session_service import SQLiteSessionService
 
 
 class TestMemoryBank:
@@ -84,6 +94,259 @@ class TestMemoryBank:
         
         bank2 = MemoryBank(storage_path=temp_memory_dir)
         assert bank2.get('persistent_key') == 'persistent_value'
+    
+    def test_sees_writes_from_other_instances(self, temp_memory_dir):
+        """Test instance reloads when another instance writes"""
+        bank1 = MemoryBank(storage_path=temp_memory_dir)
+        bank2 = MemoryBank(storage_path=temp_memory_dir)
+        
+        bank1.set('shared', 'from_bank1')
+        assert bank2.get('shared') == 'from_bank1'
+        
+        bank2.append_to_history('history', 'a')
+        bank1.append_to_history('history', 'b')
+        assert bank2.get_history('history') == ['a', 'b']
+    
+    def test_concurrent_process_appends_survive(self, temp_memory_dir):
+        """Test appends from parallel processes are not lost"""
+        workers = [
+            multiprocessing.Process(target=_append_worker, args=(temp_memory_dir, n, 10))
+            for n in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        history = bank.get_history('history')
+        assert len(history) == 40
+        assert len(set(history)) == 40
+    
+    def test_history_stats_updated_on_append(self, temp_memory_dir):
+        """Test aggregates are maintained as history grows"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        for i, score in enumerate([70, 80, 90]):
+            bank.append_to_history('content_history', {
+                'topic': 'AI' if i < 2 else 'Security',
+                'metrics': {'seo_score': score, 'blog_word_count': 1000 + i},
+                'timestamp': f'2025-11-1{i}T10:00:00'
+            })
+        
+        stats = bank.get_history_stats('content_history')
+        seo = stats.metric('seo_score')
+        
+        assert stats.count == 3
+        assert seo['mean'] == 80
+        assert seo['min'] == 70 and seo['max'] == 90
+        assert abs(seo['p50'] - 80) <= 1
+        assert stats.topic('AI')['count'] == 2
+        assert stats.topic('AI')['averages']['seo_score'] == 75
+        assert stats.day('2025-11-12')['count'] == 1
+    
+    def test_history_stats_built_for_existing_history(self, temp_memory_dir):
+        """Test aggregates are rebuilt when stats file is missing"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        bank.append_to_history('content_history', {'metrics': {'seo_score': 60}})
+        os.remove(bank.stats_file)
+        
+        reopened = MemoryBank(storage_path=temp_memory_dir)
+        assert reopened.get_history_stats().count == 1
+        assert load_history_stats(temp_memory_dir).metric('seo_score')['max'] == 60
+    
+    def test_history_stats_negative_scores(self, temp_memory_dir):
+        """Test percentiles of a metric that goes below zero keep the sign"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        for score in [-30, -20, -10, 40, 50]:
+            bank.append_to_history('content_history', {'metrics': {'readability_score': score}})
+        
+        readability = load_history_stats(temp_memory_dir).metric('readability_score')
+        
+        assert readability['min'] == -30
+        assert abs(readability['p50'] + 10) <= 0.1
+        assert readability['p90'] > 40
+    
+    def test_compact_applies_retention_policy(self, temp_memory_dir):
+        """Test compaction keeps recent artifacts and downsamples old ones"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        now = datetime.now()
+        ages = [400, 400, 30, 20, 1]
+        for i, age in enumerate(ages):
+            bank.append_to_history('content_history', {
+                'topic': f'Topic {i}',
+                'content': {'blog': 'x' * 1000},
+                'metrics': {'seo_score': 80},
+                'timestamp': (now - timedelta(days=age)).isoformat()
+            })
+        
+        policy = RetentionPolicy(full_entries=2, summarize_after_days=180)
+        report = bank.compact('content_history', policy)
+        history = bank.get_history('content_history')
+        daily = bank.get('content_history_daily')
+        
+        assert report['summarized'] == 2
+        assert report['metrics_only'] == 1
+        assert report['full'] == 2
+        assert len(history) == 3
+        assert 'content' not in history[0]
+        assert history[0]['metrics']['seo_score'] == 80
+        assert history[-1]['content']['blog']
+        assert daily[0]['count'] == 2
+        assert daily[0]['averages']['seo_score'] == 80
+        assert bank.get_history_stats().count == 5
+    
+    def test_compact_twice_keeps_daily_totals(self, temp_memory_dir):
+        """Test repeated compaction and rebuilt aggregates keep summarized entries"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        now = datetime.now()
+        for i, age in enumerate([401, 400, 400, 30, 1]):
+            bank.append_to_history('content_history', {
+                'topic': f'Topic {i}',
+                'metrics': {'seo_score': 70 + i},
+                'timestamp': (now - timedelta(days=age)).isoformat()
+            })
+        totals = bank.get_history_stats().days()
+        
+        policy = RetentionPolicy(full_entries=1, summarize_after_days=180)
+        bank.compact('content_history', policy)
+        daily = bank.get('content_history_daily')
+        bank.compact('content_history', policy)
+        
+        assert bank.get('content_history_daily') == daily
+        assert sum(summary['count'] for summary in daily) == 3
+        
+        os.remove(bank.stats_file)
+        rebuilt = MemoryBank(storage_path=temp_memory_dir).get_history_stats()
+        assert rebuilt.count == 5
+        assert rebuilt.days() == totals
+        assert rebuilt.metric('seo_score')['sum'] == sum(70 + i for i in range(5))
+    
+    def test_near_duplicates_found_after_append(self, temp_memory_dir):
+        """Test topic and content near duplicates are found from the history index"""
+        blog = ("Hospitals now use machine learning models to read scans, predict readmissions "
+                "and triage patients faster than ever, and clinicians are learning to trust them. ") * 3
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        bank.append_to_history('content_history', {
+            'topic': 'AI in Healthcare',
+            'content': {'blog': blog, 'linkedin': 'Error: Could not generate LinkedIn content'},
+            'timestamp': '2025-11-12T10:00:00'
+        })
+        
+        found = bank.find_near_duplicates(
+            topic='AI in healthcare 2026',
+            content={'blog': blog.replace('faster', 'quicker'), 'linkedin': 'Error: Could not generate LinkedIn content'}
+        )
+        
+        assert found['topic'][0]['topic'] == 'AI in Healthcare'
+        assert [match['platform'] for match in found['content']] == ['blog']
+        assert bank.find_near_duplicates(topic='Remote work productivity') == {'topic': [], 'content': []}
+    
+    def test_near_duplicate_index_built_for_existing_history(self, temp_memory_dir):
+        """Test the index is rebuilt when its file is missing and dropped with the history"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        bank.append_to_history('content_history', {'topic': 'Quantum computing basics'})
+        os.remove(bank.duplicates_file)
+        
+        reopened = MemoryBank(storage_path=temp_memory_dir)
+        assert reopened.find_near_duplicates(topic='Quantum Computing Basics')['topic']
+        
+        reopened.delete('content_history')
+        assert not bank.find_near_duplicates(topic='Quantum Computing Basics')['topic']
+    
+    def test_near_duplicate_signatures_appended(self, temp_memory_dir):
+        """Test appends only add lines to the signature file and other instances pick them up"""
+        bank = MemoryBank(storage_path=temp_memory_dir)
+        other = MemoryBank(storage_path=temp_memory_dir)
+        bank.append_to_history('content_history', {'topic': 'Quantum computing basics'})
+        with open(bank.duplicates_file, 'rb') as f:
+            before = f.read()
+        
+        bank.append_to_history('content_history', {'topic': 'Zero trust networking'})
+        with open(bank.duplicates_file, 'rb') as f:
+            after = f.read()
+        
+        assert after.startswith(before)
+        assert len(after.splitlines()) == len(before.splitlines()) + 1
+        assert other.find_near_duplicates(topic='Zero Trust Networking')['topic']
+        assert other.find_near_duplicates(topic='Quantum Computing Basics')['topic']
+
+
+class TestResearchIndex:
+    """Test ResearchIndex functionality"""
+    
+    RESEARCH = {
+        'brief': "Ransomware groups now target hospitals. Backups that are offline cut recovery time sharply.",
+        'key_insights': ["Offline backups are the best ransomware defense"],
+        'statistics': ["66% of healthcare organizations were hit by ransomware in 2023 (Sophos)"],
+        'sources': [{'title': 'State of Ransomware', 'url': 'https://example.com/ransomware', 'relevance': 'survey'}]
+    }
+    
+    def test_search_ranks_relevant_documents(self, tmp_path):
+        """Test BM25 search returns matching research ahead of unrelated research"""
+        index = ResearchIndex(str(tmp_path))
+        index.add_research('Ransomware in healthcare', self.RESEARCH)
+        index.add_research('Remote work tools', {'brief': "Async video cuts meetings for distributed teams."})
+        
+        results = index.search('hospital ransomware statistics', limit=3)
+        
+        assert results[0]['topic'] == 'Ransomware in healthcare'
+        assert {result['kind'] for result in results} >= {'statistic', 'source'}
+        assert all(result['topic'] != 'Remote work tools' for result in results)
+        assert index.search('quantum') == []
+    
+    def test_persisted_and_deduplicated(self, tmp_path):
+        """Test documents survive reopening, reach other instances and are stored once"""
+        index = ResearchIndex(str(tmp_path))
+        other = ResearchIndex(str(tmp_path))
+        added = index.add_research('Ransomware in healthcare', self.RESEARCH)
+        
+        assert added == 4
+        assert index.add_research('Hospital ransomware', self.RESEARCH) == 0
+        assert other.search('offline backups')[0]['kind'] == 'insight'
+        assert ResearchIndex(str(tmp_path)).count == 4
+    
+    def test_shared_between_threads(self, tmp_path):
+        """Test concurrent adds and searches on one instance neither fail nor index twice"""
+        index = ResearchIndex(str(tmp_path))
+        errors = []
+        
+        def add(worker):
+            try:
+                for i in range(100):
+                    index.add_research(f'Topic {worker} {i}', {'key_insights': [f'Insight {worker} {i} ransomware']})
+            except Exception as e:
+                errors.append(e)
+        
+        def search():
+            try:
+                for _ in range(200):
+                    index.search('ransomware insight')
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=add, args=(n,)) for n in range(2)]
+        threads += [threading.Thread(target=search) for _ in range(2)]
+        # Switch threads often so unguarded reads would overlap the writes
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        
+        assert errors == []
+        assert index.count == 200
+        assert ResearchIndex(str(tmp_path)).count == 200
+
+
+def _append_worker(storage_path, worker_id, count):
+    """Append entries from a separate process"""
+    bank = MemoryBank(storage_path=storage_path)
+    for i in range(count):
+        bank.append_to_history('history', f'worker{worker_id}_item{i}')
 
 
 class TestSession:
@@ -203,4 +466,161 @@ class TestSessionService:
         service.create_session('session2')
         service.clear_all_sessions()
         
-        assert len(service.get_all_sessions()) == 0
\ No newline at end of file
+        assert len(service.get_all_sessions()) == 0
+    
+    def test_idle_sessions_expire(self):
+        """Test sessions idle past the TTL are dropped"""
+        service = SessionService(ttl_seconds=0.05)
+        service.create_session('stale')
+        time.sleep(0.1)
+        
+        assert service.get_session('stale') is None
+        assert service.get_stats()['expired'] == 1
+    
+    def test_lru_eviction_at_capacity(self):
+        """Test least recently used session is evicted at the cap"""
+        service = SessionService(max_sessions=2)
+        service.create_session('a')
+        service.create_session('b')
+        service.get_session('a')
+        service.create_session('c')
+        
+        assert service.get_session('b') is None
+        assert service.get_session('a') is not None
+        assert service.get_stats()['evicted'] == 1
+    
+    def test_session_use_counts_for_lru(self):
+        """Test reads and writes through a session keep it from being evicted"""
+        service = SessionService(max_sessions=2)
+        a = service.create_session('a')
+        service.create_session('b')
+        a.set('stage', 'research')
+        a.get('stage')
+        service.create_session('c')
+        
+        assert service.get_session('a') is a
+        assert service.get_session('b') is None
+    
+    def test_bytes_accounting(self):
+        """Test approximate bytes follow session state"""
+        service = SessionService()
+        session = service.create_session('test')
+        session.set('brief', 'x' * 10000)
+        
+        assert session.approx_bytes >= 10000
+        assert service.total_bytes() == session.approx_bytes
+        
+        session.set('brief', 'short')
+        assert session.approx_bytes < 1000
+        
+        session.delete('brief')
+        assert session.approx_bytes == 0
+    
+    def test_background_sweeper_reaps(self):
+        """Test the sweeper removes expired sessions without access"""
+        service = SessionService(ttl_seconds=0.05, sweep_interval=0.05)
+        service.create_session('stale')
+        time.sleep(0.3)
+        service.stop_sweeper()
+        
+        assert 'stale' not in service._sessions
+
+
+class TestSQLiteSessionService:
+    """Test durable SQLite session backend"""
+    
+    @pytest.fixture
+    def db_path(self):
+        """Temporary database path"""
+        temp_dir = tempfile.mkdtemp()
+        yield os.path.join(temp_dir, 'sessions.db')
+        shutil.rmtree(temp_dir)
+    
+    def test_set_and_get_roundtrip(self, db_path):
+        """Test values including datetimes survive serialization"""
+        service = SQLiteSessionService(db_path=db_path)
+        session = service.create_session('test')
+        started = datetime(2025, 11, 16, 20, 51, 8)
+        session.set('start_time', started)
+        session.set('sources', [{'title': 'A', 'url': 'https://example.com'}])
+        
+        assert session.get('start_time') == started
+        assert session.get('sources')[0]['title'] == 'A'
+        assert session.get('missing', 'default') == 'default'
+        assert set(session.get_all()) == {'start_time', 'sources'}
+        service.close()
+    
+    def test_state_shared_across_instances(self, db_path):
+        """Test another service instance sees progress and survives restart"""
+        writer = SQLiteSessionService(db_path=db_path)
+        writer.create_session('job').set('stage', 'research')
+        
+        reader = SQLiteSessionService(db_path=db_path)
+        session = reader.get_session('job')
+        assert session.get('stage') == 'research'
+        
+        writer.get_session('job').set('stage', 'seo')
+        assert session.get('stage') == 'seo'
+        writer.close()
+        reader.close()
+    
+    def test_close_covers_every_thread(self, db_path):
+        """Test close() closes connections opened by other threads and the service can reopen"""
+        service = SQLiteSessionService(db_path=db_path)
+        worker = threading.Thread(target=lambda: service.create_session('job').set('stage', 'research'))
+        worker.start()
+        worker.join()
+        connections = set(service._connections)
+        
+        service.close()
+        
+        assert len(connections) == 2
+        for conn in connections:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        assert service.get_session('job').get('stage') == 'research'
+        service.close()
+    
+    def test_delete_and_end_session(self, db_path):
+        """Test deleting keys and ending sessions"""
+        service = SQLiteSessionService(db_path=db_path)
+        session = service.create_session('test')
+        session.set('key', 'value')
+        assert session.approx_bytes > 0
+        
+        session.delete('key')
+        assert session.get('key') is None
+        assert session.approx_bytes == 0
+        
+        service.end_session('test')
+        assert service.get_session('test') is None
+        service.close()
+    
+    def test_ttl_and_capacity(self, db_path):
+        """Test expiry and LRU eviction apply to durable sessions"""
+        service = SQLiteSessionService(db_path=db_path, ttl_seconds=0.05, max_sessions=2)
+        service.create_session('old')
+        time.sleep(0.1)
+        assert service.get_session('old') is None
+        
+        service.ttl_seconds = None
+        service.create_session('a')
+        time.sleep(0.01)
+        service.create_session('b')
+        service.create_session('c')
+        assert set(service.get_all_sessions()) == {'b', 'c'}
+        service.close()
+    
+    def test_set_after_eviction_recreates_session(self, db_path):
+        """Test writing to an evicted session keeps working instead of failing the foreign key"""
+        service = SQLiteSessionService(db_path=db_path, max_sessions=1)
+        session = service.create_session('s')
+        session.set('stage', 'research')
+        service.create_session('other')
+        assert service.get_session('s') is None
+        
+        session.set('stage', 'seo')
+        
+        assert session.get('stage') == 'seo'
+        assert service.get_session('s').get('stage') == 'seo'
+        service.close()
\ No newline at end of file
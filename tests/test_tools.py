@@ -2,11 +2,23 @@
 Test cases for tool functionality
 """
 
+import glob
+import os
+
+import numpy as np
 import pytest
 from src.tools.readability_scorer import ReadabilityScorer
 from src.tools.brand_voice_matcher import BrandVoiceMatcher
 from src.tools.seo_analyzer import SEOAnalyzer
 from src.tools.web_search import WebSearchTool
+from src.tools.voice_fingerprint import voice_fingerprint
+from src.brand_voices import BrandVoiceManager
+from src.tools.text_analysis import TextDocument, analyze_text, split_sections
+from src.tools.readability_engine import count_syllables, readability_indices
+from src.utils.validators import ContentValidator
+from src.utils.content_scoring import score_content_package
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples', 'sample_output')
 
 
 class TestReadabilityScorer:
@@ -108,6 +120,69 @@ class TestBrandVoiceMatcher:
         assert 'overall_score' in result
         assert 0 <= result['overall_score'] <= 100
         assert 'recommendation' in result
+    
+    def test_analyze_tone_multiple_tones(self):
+        """Test comma-separated tones are scored instead of falling back to 50"""
+        text = "Stop wasting money. The truth is most strategies fail because they are wrong."
+        result = BrandVoiceMatcher.analyze_tone(text, "aggressive, direct, confrontational")
+        
+        assert result['tones_checked'] == ['aggressive']
+        assert result['match_score'] > 50
+        assert BrandVoiceMatcher.analyze_tone(text, "friendly, warm")['match_score'] < result['match_score']
+    
+    def test_fingerprint_prefers_own_voice(self):
+        """Test texts score highest against the voice they were written in"""
+        voices = BrandVoiceManager.PREDEFINED_VOICES
+        aggressive = voice_fingerprint(voices['aggressive_consultant'])
+        analyst = voice_fingerprint(voices['data_analyst'])
+        text = ' '.join(voices['data_analyst']['examples'])
+        
+        assert analyst.score(text)['match_score'] > aggressive.score(text)['match_score']
+        assert 'fingerprint_analysis' in BrandVoiceMatcher.calculate_overall_match(text, voices['data_analyst'])
+    
+    def test_fingerprint_cache(self):
+        """Test fingerprints are reused per voice and rebuilt when the voice changes"""
+        voice = dict(BrandVoiceManager.PREDEFINED_VOICES['friendly_expert'])
+        fingerprint = voice_fingerprint(voice)
+        
+        assert voice_fingerprint(dict(voice)) is fingerprint
+        voice['examples'] = voice['examples'] + ["A brand new example sentence."]
+        assert voice_fingerprint(voice) is not fingerprint
+        assert voice_fingerprint({'tone': 'professional'}) is None
+    
+    def test_fingerprint_score_many(self):
+        """Test vectorized scoring matches one-at-a-time scoring"""
+        voice = BrandVoiceManager.PREDEFINED_VOICES['pragmatic_practitioner']
+        fingerprint = voice_fingerprint(voice)
+        texts = voice['examples'] + ["Hey there! This is awesome stuff.", ""]
+        
+        scores = fingerprint.score_many(texts)
+        
+        assert scores.shape == (len(texts),)
+        assert np.allclose(np.round(scores, 2), [fingerprint.score(text)['match_score'] for text in texts])
+    
+    def test_voice_gate_calibrated_on_samples(self):
+        """Test sample blogs pass the voice gate for every predefined voice and an empty blog does not"""
+        voices = BrandVoiceManager.PREDEFINED_VOICES
+        blogs = [open(path, encoding='utf-8').read() for path in glob.glob(os.path.join(SAMPLE_DIR, 'blog_*.md'))]
+        
+        for blog in filter(None, blogs):
+            for voice in voices.values():
+                assert score_content_package({'blog': blog}, 'security', brand_voice=voice)['voice_ok']
+        assert not score_content_package({'blog': ''}, 'security', brand_voice=voices['data_analyst'])['voice_ok']
+    
+    def test_voice_gate_relative_to_competing_voice(self):
+        """Test a blog that reads as another voice is flagged"""
+        voices = BrandVoiceManager.PREDEFINED_VOICES
+        blog = ' '.join(voices['data_analyst']['examples'])
+        
+        result = score_content_package(
+            {'blog': blog}, 'data', brand_voice=voices['aggressive_consultant'],
+            competing_voices=[voices['data_analyst']]
+        )
+        
+        assert result['competing_voice_score'] > result['voice_score']
+        assert not result['voice_ok']
 
 
 class TestSEOAnalyzer:
@@ -129,6 +204,45 @@ class TestSEOAnalyzer:
         assert result['density_percentage'] == 2.0
         assert result['is_optimal']
     
+    def test_keyword_density_respects_word_boundaries(self):
+        """Test keywords inside other words are not counted"""
+        text = "We maintain AI-powered tools. Detail matters, and so does AI's role."
+        result = SEOAnalyzer.analyze_keyword_density(text, "AI")
+        
+        assert result['occurrences'] == 2
+        assert result['first_position'] == 2
+    
+    def test_analyze_keywords_in_one_pass(self):
+        """Test primary and secondary keywords, including multi-word and nested ones"""
+        text = "Machine learning helps. Machine\nlearning scales; learning never stops."
+        result = SEOAnalyzer.analyze_keywords(text, "learning", ["machine learning", "deep learning", "learning"])
+        
+        assert result['primary']['occurrences'] == 3
+        assert [(a['keyword'], a['occurrences']) for a in result['secondary']] == [
+            ('machine learning', 2), ('deep learning', 0)
+        ]
+        assert result['secondary_coverage'] == 0.5
+    
+    def test_secondary_keywords_deduplicated_ignoring_case(self):
+        """Test secondary keywords differing only in case or spacing count once"""
+        text = "Machine learning helps teams. Deep learning needs data."
+        result = SEOAnalyzer.analyze_keywords(
+            text, "Machine Learning", ["Deep Learning", "deep learning ", " machine learning", ""]
+        )
+        
+        assert [a['keyword'] for a in result['secondary']] == ['Deep Learning']
+        assert result['secondary'][0]['occurrences'] == 1
+        assert result['secondary_coverage'] == 1.0
+    
+    def test_secondary_keywords_from_untrusted_json(self):
+        """Test a string or non-string items in place of a keyword list are ignored"""
+        text = "Machine learning helps teams. Deep learning needs data."
+        
+        assert SEOAnalyzer.analyze_keywords(text, "machine learning", "deep learning")['secondary'] == []
+        result = SEOAnalyzer.analyze_keywords(text, "machine learning", [None, 42, {'k': 'v'}, "deep learning"])
+        assert [a['keyword'] for a in result['secondary']] == ['deep learning']
+        assert SEOAnalyzer.analyze_keywords(text, "machine learning", None)['secondary_coverage'] == 1.0
+    
     def test_analyze_title(self):
         """Test title SEO analysis"""
         title = "Complete Guide to AI Trends in 2025"
@@ -192,6 +306,16 @@ More content about AI here."""
         assert 'grade' in result
         assert 'recommendations' in result
     
+    def test_secondary_keywords_feed_overall_score(self):
+        """Test missing secondary keywords lower the score and are recommended"""
+        text = "# AI guide\n\n" + " ".join(["word"] * 60 + ["AI", "automation"])
+        covered = SEOAnalyzer.calculate_overall_seo_score(text, "AI guide", "AI", "AI", ["automation"])
+        missing = SEOAnalyzer.calculate_overall_seo_score(text, "AI guide", "AI", "AI", ["robotics"])
+        
+        assert covered['overall_score'] > missing['overall_score']
+        assert "Keywords: Work in robotics" in missing['recommendations']
+        assert missing['secondary_keywords'][0]['occurrences'] == 0
+    
     def test_seo_grade_assignment(self):
         """Test SEO grade assignment"""
         assert SEOAnalyzer._get_seo_grade(95) == "A"
@@ -218,4 +342,145 @@ class TestWebSearchTool:
         """Test query formatting with context"""
         query = WebSearchTool.format_query("AI trends", "2025")
         assert "AI trends" in query
-        assert "2025" in query
\ No newline at end of file
+        assert "2025" in query
+
+
+class TestTextAnalysis:
+    """Test the shared TextDocument model"""
+    
+    TEXT = "# Guide to AI\n\n## Why it matters\n\nWe don't wait. Teams adopt AI quickly, and it works!\n\n## Next steps\nOk. Start small."
+    
+    def test_single_pass_counts(self):
+        """Test tokens, words, headers and sentences are collected once"""
+        doc = TextDocument(self.TEXT)
+        
+        assert doc.word_count == len(self.TEXT.split())
+        assert "don't" in doc.words
+        assert "quickly," not in doc.words
+        assert doc.headers == [(1, 'Guide to AI'), (2, 'Why it matters'), (2, 'Next steps')]
+        assert doc.headers_at(2) == ['Why it matters', 'Next steps']
+        assert doc.count('ai') == 3  # substring match, includes 'wait'
+        assert doc.ngrams(2)[('adopt', 'ai')] == 1
+    
+    def test_analysis_is_shared_between_tools(self):
+        """Test the same text is analyzed once and tools accept the document"""
+        doc = analyze_text(self.TEXT)
+        
+        assert analyze_text(self.TEXT) is doc
+        assert TextDocument.of(self.TEXT) is doc
+        assert TextDocument.of(doc) is doc
+        assert SEOAnalyzer.analyze_headers(doc, "AI") == SEOAnalyzer.analyze_headers(self.TEXT, "AI")
+        assert ContentValidator.validate_blog_post(doc)['has_headers']
+        assert BrandVoiceMatcher.analyze_sentence_structure(doc, {})['total_sentences'] == len(doc.sentences)
+    
+    def test_sections_split_at_sentence_boundaries(self):
+        """Test sections cover the text and keep headers with their paragraphs"""
+        sections = split_sections(self.TEXT)
+        
+        assert ''.join(sections) == self.TEXT
+        assert sections[0].startswith("# Guide to AI") and "We don't wait." in sections[0]
+        assert sections[1].startswith("## Next steps")
+    
+    def test_edit_reanalyzes_only_changed_sections(self):
+        """Test an edited document reuses unchanged sections and matches a fresh analysis"""
+        original = TextDocument(self.TEXT)
+        edited_text = self.TEXT.replace("Start small.", "Start small and measure results.")
+        edited = TextDocument(edited_text)
+        
+        assert edited.sections[0] is original.sections[0]
+        assert edited.section_keys[0] == original.section_keys[0]
+        assert edited.section_keys[1] != original.section_keys[1]
+        assert (edited.word_count, edited.sentence_count, edited.syllable_count) == (
+            len(edited_text.split()), 4, sum(section.syllable_count for section in edited.sections)
+        )
+        assert edited.word_spans[1][-1] == edited_text.lower().rindex('results')
+    
+    def test_readability_formulas_use_document_counts(self, monkeypatch):
+        """Test indices are computed from the cached syllable and word counts"""
+        monkeypatch.setattr('src.tools.text_analysis.count_syllables', lambda word: 3 if len(word) > 6 else 1)
+        monkeypatch.setattr('src.tools.text_analysis.easy_words', lambda: frozenset())
+        doc = TextDocument("The cat sat on the mat today. Everyone enjoyed a wonderful afternoon outside.")
+        
+        scores = ReadabilityScorer.calculate_scores(doc)
+        stats = ReadabilityScorer.calculate_statistics(doc)
+        
+        # 13 words, 2 sentences, 5 polysyllabic words -> 23 syllables
+        assert (stats['word_count'], stats['sentence_count'], stats['syllable_count']) == (13, 2, 23)
+        assert scores['flesch_reading_ease'] == round(206.835 - 1.015 * 6.5 - 84.6 * 23 / 13, 2)
+        assert scores['smog_index'] == round(1.043 * (30 * 5 / 2) ** 0.5 + 3.1291, 2)
+        assert scores['gunning_fog'] == round(0.4 * (6.5 + 100 * 5 / 13), 2)
+
+
+class TestReadabilityEngine:
+    """Test the memoized syllable counter and vectorized formulas"""
+    
+    def test_syllable_counts(self):
+        """Test the syllable counter on common words"""
+        expected = {
+            'cat': 1, 'table': 2, 'created': 3, 'wonderful': 3, 'beautiful': 3,
+            'technology': 4, 'organization': 5, 'strategies': 3, 'walked': 1, "don't": 1
+        }
+        assert {word: count_syllables(word) for word in expected} == expected
+        assert count_syllables('') == 0
+    
+    def test_syllable_counts_are_memoized(self):
+        """Test repeated words hit the cache"""
+        count_syllables('readability')
+        hits = count_syllables.cache_info().hits
+        count_syllables('readability')
+        assert count_syllables.cache_info().hits == hits + 1
+    
+    def test_vectorized_indices_match_scalar(self):
+        """Test batch scoring matches one-at-a-time scoring, including empty text"""
+        counts = [(13, 2, 23, 5, 5, 60, 13), (0, 0, 0, 0, 0, 0, 0), (120, 9, 180, 14, 20, 560, 122)]
+        batch = readability_indices(*(np.array(column) for column in zip(*counts)))
+        
+        for i, row in enumerate(counts):
+            scalar = readability_indices(*row)
+            for name, value in scalar.items():
+                assert batch[name][i] == pytest.approx(value)
+        assert readability_indices(*counts[1])['flesch_reading_ease'] == 0.0
+
+
+class TestBatchScoring:
+    """Test the columnar batch scoring entry points"""
+    
+    TEXTS = [
+        "# AI at work\n\n## Why\nTeams adopt AI tools quickly. Results arrive within weeks, not months.",
+        "Short note. Nothing else to add here today.",
+        ""
+    ]
+    
+    def test_readability_batch_matches_single_documents(self):
+        """Test each row equals the per-document scores and statistics"""
+        frame = ReadabilityScorer.calculate_scores_batch(self.TEXTS)
+        
+        assert len(frame) == len(self.TEXTS)
+        for i, text in enumerate(self.TEXTS):
+            expected = {**ReadabilityScorer.calculate_scores(text), **ReadabilityScorer.calculate_statistics(text)}
+            for column, value in expected.items():
+                assert frame[column][i] == pytest.approx(value)
+    
+    def test_tool_batches_flatten_results(self):
+        """Test SEO, brand voice and validation batches return one flat row per document"""
+        seo = SEOAnalyzer.calculate_overall_seo_score_batch(self.TEXTS, ["AI at work"] * 3, [""] * 3, "AI")
+        voice = BrandVoiceMatcher.calculate_overall_match_batch(self.TEXTS, {'tone': 'professional'})
+        blogs = ContentValidator.validate_batch(self.TEXTS, 'blog')
+        tweets = ContentValidator.validate_batch(self.TEXTS, 'twitter')
+        
+        assert list(seo['keyword_analysis.occurrences']) == [2, 0, 0]
+        assert seo['overall_score'][0] == SEOAnalyzer.calculate_overall_seo_score(
+            self.TEXTS[0], "AI at work", "", "AI")['overall_score']
+        assert list(voice['structure_analysis.total_sentences']) == [2, 2, 0]
+        assert list(blogs['has_title']) == [True, False, False]
+        assert list(tweets['char_count']) == [len(text) for text in self.TEXTS]
+    
+    def test_large_batches_use_process_pool(self, monkeypatch):
+        """Test pooled scoring returns the same rows in order"""
+        monkeypatch.setattr('src.tools.batch.MIN_PARALLEL_BATCH', 2)
+        texts = self.TEXTS * 4
+        
+        pooled = ReadabilityScorer.calculate_scores_batch(texts, workers=2)
+        serial = ReadabilityScorer.calculate_scores_batch(texts)
+        
+        assert pooled.equals(serial)
\ No newline at end of file
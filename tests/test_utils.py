@@ -0,0 +1,550 @@
+"""
+Test cases for utility modules
+"""
+
+import pytest
+import asyncio
+import time
+from src.utils.metrics import MetricsCollector
+from src.utils.histogram import LogHistogram
+from src.utils import tracing
+from src.utils.metrics import metric_key, parse_metric_key
+from src.utils.prometheus import PrometheusExporter, counter_ratio, render_metrics
+import urllib.request
+import io
+import logging
+import logging.handlers
+import queue
+from src.utils.loop_monitor import LoopMonitor
+from src.utils.cpu_executor import CPUExecutor
+from src.utils.profiling import PackageProfile, should_profile
+from src.utils.logger import (
+    ContextFilter, JsonFormatter, _QueueHandler, get_log_context, log_context, setup_logger, shutdown_logging
+)
+from unittest.mock import Mock
+import json
+
+
+class TestMetricsCollector:
+    """Test MetricsCollector functionality"""
+    
+    def test_timer_records_metric(self):
+        """Test start/stop timer records elapsed time"""
+        metrics = MetricsCollector()
+        metrics.start_timer('stage')
+        elapsed = metrics.stop_timer('stage')
+        
+        assert elapsed >= 0
+        assert metrics.get_metric_stats('stage')['count'] == 1
+    
+    def test_timer_context_manager_and_decorator(self):
+        """Test timer helper works with `with` and as a decorator"""
+        metrics = MetricsCollector()
+        
+        with metrics.timer('block'):
+            pass
+        
+        @metrics.timer('call')
+        def work():
+            return 42
+        
+        assert work() == 42
+        assert metrics.get_metric_stats('block')['count'] == 1
+        assert metrics.get_metric_stats('call')['count'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_scopes_are_isolated(self):
+        """Test concurrent packages keep separate timers and roll up"""
+        metrics = MetricsCollector()
+        
+        async def package(name, delay):
+            with metrics.scope(name) as scoped:
+                metrics.start_timer('research')
+                await asyncio.sleep(delay)
+                metrics.stop_timer('research')
+                metrics.increment_counter('model_calls')
+                
+                @metrics.timer('seo')
+                async def seo():
+                    await asyncio.sleep(0)
+                
+                await seo()
+                return scoped
+        
+        fast, slow = await asyncio.gather(package('fast', 0.01), package('slow', 0.05))
+        
+        assert fast.get_metric_stats('research')['count'] == 1
+        assert slow.get_metric_stats('research')['count'] == 1
+        assert fast.get_metric_stats('research')['max'] < slow.get_metric_stats('research')['max']
+        assert fast.get_counter('model_calls') == 1
+        assert metrics.get_metric_stats('research')['count'] == 2
+        assert metrics.get_metric_stats('seo')['count'] == 2
+        assert metrics.get_counter('model_calls') == 2
+    
+    def test_get_all_timings_shape(self):
+        """Test timing summary fields"""
+        metrics = MetricsCollector()
+        metrics.record_metric('stage', 1.5)
+        metrics.record_metric('stage', 2.5)
+        
+        timings = metrics.get_all_timings()['stage']
+        assert timings['avg_seconds'] == 2.0
+        assert timings['total_seconds'] == 4.0
+        assert timings['count'] == 2
+    
+    def test_percentiles_reported(self):
+        """Test timings include tail percentiles"""
+        metrics = MetricsCollector()
+        for i in range(1, 101):
+            metrics.record_metric('stage', i / 10)
+        
+        stats = metrics.get_metric_stats('stage')
+        timings = metrics.get_all_timings()['stage']
+        
+        assert stats['count'] == 100
+        assert abs(stats['p50'] - 5.0) <= 0.15
+        assert abs(stats['p99'] - 9.9) <= 0.15
+        assert timings['p90_seconds'] == pytest.approx(9.0, abs=0.15)
+    
+    def test_snapshot_merge(self):
+        """Test snapshots from separate workers combine"""
+        worker_a = MetricsCollector()
+        worker_b = MetricsCollector()
+        worker_a.record_metric('stage', 1.0)
+        worker_b.record_metric('stage', 3.0)
+        worker_b.increment_counter('model_calls', 2)
+        
+        combined = MetricsCollector()
+        combined.merge_snapshot(worker_a.snapshot())
+        combined.merge_snapshot(worker_b.snapshot())
+        
+        stats = combined.get_metric_stats('stage')
+        assert stats['count'] == 2
+        assert stats['total'] == 4.0
+        assert stats['max'] == 3.0
+        assert combined.get_counter('model_calls') == 2
+    
+    def test_labeled_keys_roundtrip(self):
+        """Test label encoding and that labeled series stay out of timings"""
+        key = metric_key('model_calls', status='429', model='gemini "pro"')
+        assert parse_metric_key(key) == ('model_calls', {'model': 'gemini "pro"', 'status': '429'})
+        
+        metrics = MetricsCollector()
+        metrics.record_metric('seo', 1.0)
+        metrics.record_metric(metric_key('model_call_seconds', model='x'), 0.5)
+        assert list(metrics.get_all_timings()) == ['seo']
+
+
+class TestLogHistogram:
+    """Test LogHistogram functionality"""
+    
+    def test_relative_accuracy(self):
+        """Test percentiles stay within the configured error"""
+        histogram = LogHistogram(relative_accuracy=0.01)
+        values = [0.001 * (1.1 ** i) for i in range(150)]
+        for value in values:
+            histogram.add(value)
+        
+        expected = sorted(values)[int(0.9 * (len(values) - 1))]
+        assert abs(histogram.percentile(90) - expected) / expected <= 0.011
+    
+    def test_memory_is_bounded(self):
+        """Test bucket count never exceeds the cap"""
+        histogram = LogHistogram(max_buckets=32)
+        for i in range(1, 5000):
+            histogram.add(i * 0.37)
+        
+        assert len(histogram._buckets) <= 32
+        assert histogram.count == 4999
+        assert histogram.percentile(100) == histogram.max
+    
+    def test_roundtrip(self):
+        """Test snapshot serialization"""
+        histogram = LogHistogram()
+        histogram.add(2.5)
+        histogram.add(0)
+        
+        restored = LogHistogram.from_dict(histogram.to_dict())
+        assert restored.summary() == histogram.summary()
+    
+    def test_negative_values(self):
+        """Test negative values keep their sign and order in percentiles"""
+        histogram = LogHistogram(relative_accuracy=0.01)
+        values = [-40.0, -25.0, -10.0, 0.0, 15.0, 30.0]
+        for value in values:
+            histogram.add(value)
+        
+        assert abs(histogram.percentile(0) + 40) <= 0.4
+        assert abs(histogram.percentile(20) + 25) <= 0.25
+        assert abs(histogram.percentile(40) + 10) <= 0.1
+        assert histogram.percentile(60) == 0.0
+        assert abs(histogram.percentile(100) - 30) <= 0.3
+        
+        restored = LogHistogram.from_dict(histogram.to_dict())
+        assert restored.summary() == histogram.summary()
+
+
+class TestTracing:
+    """Test tracing helpers"""
+    
+    def test_model_call_span_exported(self, tmp_path):
+        """Test model-call spans carry stage, token and payload attributes"""
+        trace_file = tmp_path / 'traces.jsonl'
+        assert tracing.setup_tracing(exporter='file', path=str(trace_file))
+        
+        response = Mock()
+        response.text = 'generated text'
+        response.usage_metadata = Mock(
+            prompt_token_count=12,
+            candidates_token_count=5,
+            total_token_count=17,
+            cached_content_token_count=8
+        )
+        client = Mock()
+        client.models.generate_content.return_value = response
+        traced = tracing.TracedClient(client)
+        
+        with tracing.span('content_package'):
+            with tracing.stage_span('research'):
+                assert traced.models.generate_content(model='gemini-test', contents='abcd') is response
+        tracing.flush_tracing()
+        
+        spans = {s['name']: s for s in map(json.loads, trace_file.read_text().splitlines())}
+        call = spans['gen_ai.generate_content']
+        
+        assert call['parent_id'] == spans['stage.research']['span_id']
+        assert spans['stage.research']['parent_id'] == spans['content_package']['span_id']
+        assert call['attributes']['gen_ai.request.model'] == 'gemini-test'
+        assert call['attributes']['content_factory.stage'] == 'research'
+        assert call['attributes']['gen_ai.request.chars'] == 4
+        assert call['attributes']['gen_ai.response.chars'] == len('generated text')
+        assert call['attributes']['gen_ai.usage.input_tokens'] == 12
+        assert call['attributes']['gen_ai.cache_hit'] is True
+    
+    def test_disabled_tracing_is_passthrough(self):
+        """Test spans are harmless when no exporter is configured"""
+        assert tracing.setup_tracing(exporter='none') is False
+        
+        with tracing.stage_span('seo') as current:
+            current.set_attribute('retry.attempts', 1)
+            assert tracing.get_current_stage() == 'seo'
+        assert tracing.get_current_stage() is None
+    
+    def test_model_call_metrics(self):
+        """Test traced calls are counted by status"""
+        metrics = MetricsCollector()
+        client = Mock()
+        client.models.generate_content.side_effect = [Mock(text='ok', usage_metadata=None), Exception('429 RESOURCE_EXHAUSTED')]
+        traced = tracing.TracedClient(client, metrics=metrics)
+        
+        traced.models.generate_content(model='m', contents='a')
+        with pytest.raises(Exception):
+            traced.models.generate_content(model='m', contents='a')
+        
+        assert metrics.get_counter(metric_key('model_calls', model='m', status='ok')) == 1
+        assert metrics.get_counter(metric_key('model_calls', model='m', status='429')) == 1
+        assert metrics.get_metric_stats(metric_key('model_call_seconds', model='m'))['count'] == 2
+
+
+class TestPrometheus:
+    """Test Prometheus exposition"""
+    
+    def _collector(self):
+        metrics = MetricsCollector()
+        metrics.record_metric('research', 2.0)
+        metrics.record_metric(metric_key('model_call_seconds', model='flash'), 0.4)
+        metrics.increment_counter(metric_key('model_calls', model='flash', status='ok'), 3)
+        metrics.increment_counter(metric_key('model_calls', model='flash', status='429'))
+        metrics.increment_counter(metric_key('model_cache_hits', model='flash'), 2)
+        metrics.adjust_gauge('packages_in_flight', 2)
+        return metrics
+    
+    def test_render_format(self):
+        """Test summaries, counters and gauges are rendered"""
+        metrics = self._collector()
+        text = render_metrics(metrics, gauges={
+            'active_sessions': lambda: 5,
+            'cache_hit_ratio': counter_ratio(metrics, 'model_cache_hits', 'model_calls')
+        })
+        
+        assert '# TYPE content_factory_stage_seconds summary' in text
+        assert 'content_factory_stage_seconds_count{stage="research"} 1' in text
+        assert 'content_factory_model_call_seconds_sum{model="flash"} 0.4' in text
+        assert 'content_factory_model_calls_total{model="flash",status="429"} 1' in text
+        assert 'content_factory_packages_in_flight 2' in text
+        assert 'content_factory_active_sessions 5' in text
+        assert 'content_factory_cache_hit_ratio 0.5' in text
+    
+    def test_http_and_textfile(self, tmp_path):
+        """Test the /metrics endpoint and textfile writer"""
+        exporter = PrometheusExporter(self._collector())
+        port = exporter.start_http_server(0, addr='127.0.0.1')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+                body = response.read().decode()
+                assert response.headers['Content-Type'].startswith('text/plain')
+        finally:
+            exporter.stop()
+        
+        path = tmp_path / 'content_factory.prom'
+        exporter.write_textfile(str(path))
+        assert body == path.read_text()
+    
+    def test_http_server_shared_per_port(self):
+        """Test a second exporter on a served port takes the server over instead of failing"""
+        first = PrometheusExporter(self._collector())
+        port = first.start_http_server(0, addr='127.0.0.1')
+        collector = MetricsCollector()
+        collector.adjust_gauge('packages_in_flight', 7)
+        second = PrometheusExporter(collector)
+        try:
+            assert second.start_http_server(port, addr='127.0.0.1') == port
+            first.stop()
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+                assert 'content_factory_packages_in_flight 7' in response.read().decode()
+        finally:
+            second.stop()
+    
+    def test_unlabeled_metrics_keep_their_name(self):
+        """Test only pipeline stage timers are folded into stage_seconds"""
+        metrics = MetricsCollector()
+        metrics.record_metric('research', 1.0)
+        metrics.record_metric('history_write', 0.2)
+        text = render_metrics(metrics)
+        
+        assert 'content_factory_stage_seconds_count{stage="research"} 1' in text
+        assert 'content_factory_history_write_count 1' in text
+        assert 'stage="history_write"' not in text
+
+
+class TestLogger:
+    """Test queue-based structured logging"""
+    
+    def _logger(self, name, formatter):
+        records = queue.SimpleQueue()
+        handler = _QueueHandler(records)
+        handler.addFilter(ContextFilter())
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        
+        output = io.StringIO()
+        stream = logging.StreamHandler(output)
+        stream.setFormatter(formatter)
+        listener = logging.handlers.QueueListener(records, stream)
+        return logger, listener, output
+    
+    def test_json_lines_carry_context(self):
+        """Test JSON output includes bound context and extra fields"""
+        logger, listener, output = self._logger('test.json', JsonFormatter())
+        listener.start()
+        
+        with log_context(session_id='abc', stage='research'):
+            with log_context(model='gemini-test'):
+                logger.info('call done %s', 'ok', extra={'elapsed_ms': 12.5})
+            assert get_log_context() == {'session_id': 'abc', 'stage': 'research'}
+        logger.info('outside')
+        listener.stop()
+        
+        first, second = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert first['message'] == 'call done ok'
+        assert first['session_id'] == 'abc'
+        assert first['stage'] == 'research'
+        assert first['model'] == 'gemini-test'
+        assert first['elapsed_ms'] == 12.5
+        assert 'session_id' not in second
+    
+    def test_exceptions_survive_queue(self):
+        """Test tracebacks are rendered before crossing the queue"""
+        logger, listener, output = self._logger('test.exc', JsonFormatter())
+        listener.start()
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.error('failed', exc_info=True)
+        listener.stop()
+        
+        entry = json.loads(output.getvalue())
+        assert 'ValueError: boom' in entry['exception']
+    
+    def test_setup_after_shutdown_restarts_listener(self, tmp_path, monkeypatch):
+        """Test loggers set up before a shutdown write through a fresh listener afterwards"""
+        monkeypatch.setenv('LOG_DIR', str(tmp_path))
+        shutdown_logging()
+        try:
+            logger = setup_logger('test.restart')
+            shutdown_logging()
+            assert not logger.handlers
+            
+            setup_logger('test.restart.other')
+            logger.warning('after restart')
+            shutdown_logging()
+            
+            assert 'after restart' in (tmp_path / 'content_factory.log').read_text(encoding='utf-8')
+        finally:
+            monkeypatch.undo()
+            setup_logger('test.restart')
+
+
+def _busy_loop(seconds):
+    """Burn CPU for a while"""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+class TestProfiling:
+    """Test opt-in package profiling"""
+    
+    def test_package_profile(self, tmp_path):
+        """Test CPU samples and allocations are captured and written"""
+        profile = PackageProfile('pkg', interval=0.002, memory=True)
+        profile.start()
+        _busy_loop(0.2)
+        retained = [bytearray(1024) for _ in range(500)]
+        profile.stop()
+        
+        summary = profile.summary()
+        functions = [entry['function'] for entry in summary['cpu']['top_functions']]
+        
+        assert summary['cpu']['samples'] > 10
+        assert any(name.endswith(':_busy_loop') for name in functions)
+        assert summary['memory']['peak_bytes'] >= 500 * 1024
+        
+        collapsed_path, summary_path = profile.write(str(tmp_path), 'profile_pkg')
+        assert '_busy_loop' in open(collapsed_path).read()
+        assert json.load(open(summary_path))['label'] == 'pkg'
+        assert len(retained) == 500
+    
+    def test_memory_profiling_opt_in_and_overlap(self):
+        """Test allocations are off by default and overlapping packages are marked"""
+        assert 'memory' not in PackageProfile('cpu-only').summary()
+        
+        first = PackageProfile('first', memory=True)
+        second = PackageProfile('second', memory=True)
+        first.start()
+        second.start()
+        second.stop()
+        first.stop()
+        
+        assert first.summary()['memory']['peak_overlapped']
+        assert second.summary()['memory']['peak_overlapped']
+        
+        alone = PackageProfile('alone', memory=True)
+        alone.start()
+        alone.stop()
+        assert not alone.summary()['memory']['peak_overlapped']
+    
+    def test_should_profile(self, monkeypatch):
+        """Test explicit flag, env toggle and sampling rate"""
+        monkeypatch.delenv('PROFILE_PACKAGES', raising=False)
+        monkeypatch.setenv('PROFILE_RATE', '0')
+        assert should_profile() is False
+        assert should_profile(True) is True
+        
+        monkeypatch.setenv('PROFILE_RATE', '1')
+        assert should_profile() is True
+        assert should_profile(False) is False
+
+
+def _blocking_call(seconds):
+    """Hold the event loop with a synchronous sleep"""
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """Test event-loop lag monitoring"""
+    
+    @pytest.mark.asyncio
+    async def test_detects_blocking_call(self):
+        """Test a blocking call is reported with its stack"""
+        metrics = MetricsCollector()
+        monitor = LoopMonitor(metrics, interval=0.02, block_threshold=0.15)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+            _blocking_call(0.4)
+            await asyncio.sleep(0.1)
+        finally:
+            monitor.stop()
+        
+        reports = monitor.get_reports()
+        assert len(reports) == 1
+        assert reports[0]['blocked_seconds'] >= 0.3
+        assert any('_blocking_call' in frame for frame in reports[0]['stack'])
+        assert metrics.get_counter(metric_key('event_loop_blocks', loop='main')) == 1
+        assert monitor.get_stats()['samples'] > 3
+    
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_no_blocks(self):
+        """Test a responsive loop produces no reports"""
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.2)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        monitor.stop()
+        
+        assert monitor.get_stats()['blocks'] == 0
+        assert monitor.get_stats()['max_lag_seconds'] < 0.2
+    
+    def test_watchdog_ends_with_its_loop(self):
+        """Test a monitor never stopped does not outlive the loop it watched"""
+        monitor = LoopMonitor(interval=0.01)
+        
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.05)
+        
+        asyncio.run(run())
+        monitor._watchdog.join(timeout=1)
+        
+        assert not monitor._watchdog.is_alive()
+
+
+class TestCPUExecutor:
+    """Test offloading CPU-bound work from the event loop"""
+    
+    @pytest.mark.asyncio
+    async def test_thread_mode_keeps_loop_responsive(self):
+        """Test blocking work in the pool does not register as a loop block"""
+        metrics = MetricsCollector()
+        executor = CPUExecutor('thread', max_workers=2, metrics=metrics)
+        monitor = LoopMonitor(interval=0.02, block_threshold=0.15)
+        monitor.start()
+        try:
+            await executor.run(_blocking_call, 0.4)
+            await executor.run_light(_blocking_call, 0.2)
+        finally:
+            monitor.stop()
+            executor.shutdown()
+        
+        assert monitor.get_stats()['blocks'] == 0
+        assert metrics.get_counter(metric_key('cpu_tasks', pool='thread')) == 2
+    
+    @pytest.mark.asyncio
+    async def test_process_mode_runs_in_worker(self):
+        """Test heavy work goes to a process pool and light work stays in threads"""
+        metrics = MetricsCollector()
+        executor = CPUExecutor('process', max_workers=1, metrics=metrics)
+        try:
+            assert await executor.run(sum, [1, 2, 3]) == 6
+            assert await executor.run_light(len, 'abc') == 3
+        finally:
+            executor.shutdown()
+        
+        assert metrics.get_counter(metric_key('cpu_tasks', pool='process')) == 1
+        assert metrics.get_counter(metric_key('cpu_tasks', pool='thread')) == 1
+    
+    @pytest.mark.asyncio
+    async def test_inline_mode_and_env(self, monkeypatch):
+        """Test inline mode runs on the loop and modes come from the environment"""
+        monkeypatch.setenv('CPU_EXECUTOR', 'inline')
+        monkeypatch.setenv('CPU_WORKERS', '3')
+        executor = CPUExecutor.from_env()
+        
+        assert (executor.mode, executor.max_workers) == ('inline', 3)
+        assert await executor.run(max, 2, 5) == 5
+        with pytest.raises(ValueError):
+            CPUExecutor('gpu')
\ No newline at end of file